@@ -0,0 +1,44 @@
+"""
+Compare the memory held by an inventory of asset dicts with the same inventory as Asset records.
+
+    python -m benchmarks.bench_asset --count 1000000
+"""
+import argparse
+import pickle
+import time
+import tracemalloc
+
+from discovr.asset import compact
+from discovr.risk import RiskAssessor
+from discovr.tagger import Tagger
+from benchmarks.bench_tagger import synthetic_assets
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    inventory = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return inventory, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asset record memory benchmark")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    # Enrich once, outside the measurements; each side then rebuilds its own objects from the pickle
+    blob = pickle.dumps(RiskAssessor.add_risks(Tagger.tag_assets(synthetic_assets(args.count)), batch=False))
+    dicts, dict_size, _ = measure(lambda: pickle.loads(blob))
+    del dicts
+    records, record_size, elapsed = measure(lambda: compact(pickle.loads(blob)))
+
+    print(f"[+] {args.count} asset dicts:   {dict_size / 2**20:,.1f} MiB")
+    print(f"[+] {args.count} Asset records: {record_size / 2**20:,.1f} MiB "
+          f"({record_size / dict_size:.0%}, built in {elapsed:.2f} seconds)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Diff two synthetic scans written as JSON exports (1% changed, 1% new, 1% removed).
+
+    python -m benchmarks.bench_diff --count 1000000
+    python -m benchmarks.bench_diff --count 200000 --memory   # peak memory of the diff (slower)
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_tagger import synthetic_assets
+from discovr.diff import diff_reports
+from discovr.sinks import JSONArraySink
+
+
+def write_scan(path, assets):
+    sink = JSONArraySink(path)
+    for asset in assets:
+        sink.write(asset)
+    sink.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan-to-scan diff benchmark")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--memory", action="store_true", help="Trace peak memory allocated by the diff")
+    args = parser.parse_args()
+
+    old = synthetic_assets(args.count)
+    new = [dict(a) for a in old[args.count // 100:]]
+    for asset in new[::100]:
+        asset["Ports"] = (asset.get("Ports") or "22") + ",3389"
+        asset["Risk"] = "Critical"
+    for i in range(args.count, args.count + args.count // 100):
+        new.append({"IP": f"11.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}", "Hostname": f"new{i}", "Ports": "22"})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path, new_path = os.path.join(tmp, "old.json"), os.path.join(tmp, "new.json")
+        write_scan(old_path, old)
+        write_scan(new_path, new)
+        del old, new
+
+        if args.memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        report = diff_reports(old_path, new_path)
+        elapsed = time.perf_counter() - start
+        if args.memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    print(f"[+] Diffed {report.old_count} -> {report.new_count} assets in {elapsed:.2f} seconds "
+          f"({(report.old_count * 2 + report.new_count) / elapsed:,.0f} records/sec read)")
+    print(f"[+] {len(report.new)} new, {len(report.removed)} removed, {len(report.changed)} changed")
+    if args.memory:
+        print(f"[+] Peak traced memory: {peak / 2**20:,.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
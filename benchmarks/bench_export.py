@@ -0,0 +1,53 @@
+"""
+Export a synthetic inventory in every format, then time loading each file back into pandas.
+
+    python -m benchmarks.bench_export --count 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from discovr.core import Exporter
+from discovr.risk import RiskAssessor
+from discovr.tagger import Tagger
+from benchmarks.bench_tagger import synthetic_assets
+
+LOADERS = {
+    "csv": pd.read_csv,
+    "json": pd.read_json,
+    "jsonl": lambda path: pd.read_json(path, lines=True),
+    "jsonl.zst": lambda path: pd.read_json(path, lines=True, compression="zstd"),
+    "parquet": pd.read_parquet,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export format benchmark")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--formats", nargs="+", default=list(LOADERS))
+    args = parser.parse_args()
+
+    assets = RiskAssessor.add_risks(Tagger.tag_assets(synthetic_assets(args.count)))
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats:
+            path = Path(tmp) / f"discovr_bench.{fmt}"
+            sink = Exporter.SINKS[fmt](path)
+            start = time.perf_counter()
+            for asset in assets:
+                sink.write(asset)
+            sink.close()
+            written = time.perf_counter() - start
+
+            start = time.perf_counter()
+            frame = LOADERS[fmt](path)
+            loaded = time.perf_counter() - start
+            print(f"[+] {fmt:<10} {os.path.getsize(path) / 2**20:8.1f} MiB | write {written:6.2f}s "
+                  f"| pandas load {loaded:6.2f}s ({len(frame)} rows)")
+
+
+if __name__ == "__main__":
+    main()
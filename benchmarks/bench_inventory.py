@@ -0,0 +1,44 @@
+"""
+Record repeated synthetic scans in the SQLite inventory and time typical lookups.
+
+    python -m benchmarks.bench_inventory --count 200000 --scans 5
+"""
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from discovr.inventory import InventoryStore, parse_since
+from discovr.risk import RiskAssessor
+from discovr.tagger import Tagger
+from benchmarks.bench_tagger import synthetic_assets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory store benchmark")
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--scans", type=int, default=5)
+    args = parser.parse_args()
+
+    assets = RiskAssessor.add_risks(Tagger.tag_assets(synthetic_assets(args.count)))
+    with tempfile.TemporaryDirectory() as tmp:
+        store = InventoryStore(Path(tmp) / "inventory.db")
+        first = datetime(2025, 1, 1)
+        for i in range(args.scans):
+            start = time.perf_counter()
+            store.record_scan(assets, "network", first + timedelta(days=i))
+            print(f"[+] Scan {i + 1}: {args.count} assets recorded in {time.perf_counter() - start:.2f} seconds")
+
+        since = parse_since("2d", now=first + timedelta(days=args.scans))
+        for label, criteria in [("ip", {"ip": "10.1.2.3"}), ("hostname", {"hostname": "srv000123.corp.local"}),
+                                ("port 3389 since 2d", {"port": 3389, "since": since}),
+                                ("risk=Critical", {"risk": "Critical", "limit": 100})]:
+            start = time.perf_counter()
+            rows = store.query(**criteria)
+            print(f"[+] Query {label}: {len(rows)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
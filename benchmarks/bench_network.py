@@ -0,0 +1,47 @@
+"""
+Scan a simulated subnet with NetworkDiscovery (no nmap, no network) and report hosts/sec and
+correctness for each worker count.
+
+    python -m benchmarks.bench_network --range 10.99.0.0/20 --hosts 1000 --latency 0.05 --parallel 1 8 32
+    python -m benchmarks.bench_network --loss 0.05 --ports 22,80,443
+    python -m benchmarks.bench_network --recording scan.xml --range 192.168.1.0/24   # replay a real nmap -oX file
+"""
+import argparse
+import time
+
+from discovr.network import NetworkDiscovery
+from discovr.simnet import SimulatedNetwork
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetworkDiscovery throughput on a simulated network")
+    parser.add_argument("--range", default="10.99.0.0/22")
+    parser.add_argument("--hosts", type=int, default=300, help="Live hosts in the range")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per nmap run")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--loss", type=float, default=0.0, help="Probability a live host is missed")
+    parser.add_argument("--ports", help="Port spec passed to NetworkDiscovery (default: OS detection scan)")
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--recording", help="Replay this nmap XML instead of simulating hosts")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    net = SimulatedNetwork(args.range, hosts=args.hosts, latency=args.latency, jitter=args.jitter,
+                           loss=args.loss, seed=args.seed)
+    factory = SimulatedNetwork.replay(args.recording) if args.recording else net.scanner
+
+    for parallel in args.parallel:
+        scanner = NetworkDiscovery(args.range, ports=args.ports, parallel=parallel, scanner_factory=factory)
+        start = time.perf_counter()
+        assets = list(scanner.iter_assets())
+        elapsed = time.perf_counter() - start
+        line = (f"[+] parallel={parallel:<4} {scanner.total_hosts} addresses in {elapsed:.2f} seconds "
+                f"({scanner.total_hosts / elapsed:,.0f} hosts/sec) | {len(assets)} assets")
+        if not args.recording:
+            result = net.check(assets, args.ports)
+            line += f" | missing {result['missing']}, unexpected {result['unexpected']}, wrong {result['wrong']}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
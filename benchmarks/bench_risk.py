@@ -0,0 +1,35 @@
+"""
+Compare per-asset RiskAssessor.assess() with the vectorized RiskAssessor.assess_batch().
+
+    python -m benchmarks.bench_risk --count 1000000
+"""
+import argparse
+import time
+
+from benchmarks.bench_tagger import synthetic_assets
+from discovr.risk import RiskAssessor
+from discovr.tagger import Tagger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RiskAssessor scalar vs batch benchmark")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    assets = Tagger.tag_assets(synthetic_assets(args.count))
+
+    start = time.perf_counter()
+    scalar = [RiskAssessor.assess(a) for a in assets]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = RiskAssessor.assess_batch(assets)
+    batch_time = time.perf_counter() - start
+
+    print(f"[+] assess():       {scalar_time:.2f} seconds ({args.count / scalar_time:,.0f} assets/sec)")
+    print(f"[+] assess_batch(): {batch_time:.2f} seconds ({args.count / batch_time:,.0f} assets/sec)")
+    print(f"[+] Speedup: {scalar_time / batch_time:.1f}x | Identical results: {scalar == batch}")
+
+
+if __name__ == "__main__":
+    main()
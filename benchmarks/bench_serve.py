@@ -0,0 +1,97 @@
+"""
+Load-test the REST scan service: many concurrent clients each submit a small scan of a simulated
+network (no nmap) and stream its assets back. Reports requests/sec, latency percentiles and how
+many requests the result cache answered.
+
+    python -m benchmarks.bench_serve --clients 32 --requests 500 --workers 4
+    python -m benchmarks.bench_serve --distinct 500 --cache 0      # every request runs a scan
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import uvicorn
+
+from discovr.network import NetworkDiscovery
+from discovr.serve import ScanService, create_app
+from discovr.simnet import SimulatedNetwork
+
+
+def simulated_mode(net):
+    @contextmanager
+    def mode(service, params):
+        yield NetworkDiscovery(params["range"], params.get("ports"), int(params.get("parallel", 4)),
+                               scanner_factory=net.scanner)
+    return mode
+
+
+def request(base, path, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(base + path, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        return resp.read()
+
+
+def client_request(base, target, retries=50):
+    """Submit one scan and read its streamed assets; retried while the queue is full"""
+    start = time.perf_counter()
+    for _ in range(retries):
+        try:
+            job = json.loads(request(base, "/scans", {"mode": "sim", "params": {"range": target}}))
+            break
+        except urllib.error.HTTPError as e:
+            if e.code != 429:
+                raise
+            time.sleep(0.05)
+    else:
+        raise RuntimeError("queue stayed full")
+    lines = request(base, f"/scans/{job['id']}/assets").splitlines()
+    return time.perf_counter() - start, len(lines), job["cached"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan service load test")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent HTTP clients")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--distinct", type=int, default=50, help="Distinct /28 targets requested (repeats can hit the cache)")
+    parser.add_argument("--workers", type=int, default=4, help="Service worker threads")
+    parser.add_argument("--cache", type=int, default=300, help="Service result cache TTL (0 = off)")
+    parser.add_argument("--latency", type=float, default=0.01, help="Simulated seconds per nmap run")
+    args = parser.parse_args()
+
+    net = SimulatedNetwork("10.99.0.0/16", hosts=6000, latency=args.latency)
+    service = ScanService(workers=args.workers, max_queue=args.clients * 2, cache_ttl=args.cache,
+                          modes={"sim": simulated_mode(net)})
+    server = uvicorn.Server(uvicorn.Config(create_app(service), host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+
+    targets = [f"10.99.{i // 16}.{(i % 16) * 16}/28" for i in range(args.requests)]
+    targets = [targets[i % args.distinct] for i in range(args.requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        results = list(pool.map(lambda t: client_request(base, t), targets))
+    elapsed = time.perf_counter() - start
+    server.should_exit = True
+    thread.join()
+
+    latencies = sorted(r[0] for r in results)
+    cached = sum(1 for r in results if r[2])
+    print(f"[+] {args.requests} requests from {args.clients} clients in {elapsed:.2f} seconds "
+          f"({args.requests / elapsed:,.1f} requests/sec, {sum(r[1] for r in results)} assets streamed)")
+    print(f"[+] Latency p50 {latencies[len(latencies) // 2] * 1000:.0f} ms | "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.0f} ms | max {latencies[-1] * 1000:.0f} ms")
+    print(f"[+] Cache answered {cached} requests ({cached / args.requests:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Time a cold start of the CLI and of each discovery plugin in a fresh interpreter.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+from discovr.plugins import DISCOVERY_PLUGINS
+
+TIMER = (
+    "import time; start = time.perf_counter(); import discovr.cli; {load}"
+    "print(time.perf_counter() - start)"
+)
+
+
+def cold_start(load, runs):
+    times = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", TIMER.format(load=load)], capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        times.append(float(result.stdout))
+    return statistics.median(times), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup / plugin import-time benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    targets = [("cli only", "")] + [
+        (name, f"from discovr import plugins; plugins.load({name!r}); ") for name in DISCOVERY_PLUGINS
+    ]
+    for label, load in targets:
+        elapsed, error = cold_start(load, args.runs)
+        if error:
+            print(f"[!] {label:<10} unavailable: {error}")
+        else:
+            print(f"[+] {label:<10} {elapsed * 1000:8.1f} ms (median of {args.runs})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Benchmark the processing hot paths on synthetic inputs and write the results as JSON
+(throughput and peak traced memory per benchmark), optionally compared with an earlier run.
+
+    python -m benchmarks.suite --count 100000 --output bench.json
+    python -m benchmarks.suite --count 100000 --repeat 3 --baseline bench.json   # exit status 1 on a regression
+    python -m benchmarks.suite --only tag risk --count 1000000 --no-memory
+
+Benchmarks: tag (Tagger.tag_assets), risk (RiskAssessor.add_risks), export (Exporter.save_results),
+report (Reporter.print_results, console output discarded) and passive (PassiveDiscovery._process_packet
+over a synthetic pcap). Inputs are generated before the clock starts and classification caches are
+cleared before every run.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks import synthetic
+from discovr.cache import CLASSIFIER_CACHE
+from discovr.core import Exporter, Reporter
+from discovr.risk import RiskAssessor, _cached_port_flags
+from discovr.tagger import Tagger
+
+
+# ---- Benchmarks: prepare(args) -> input, run(input) -> items processed ----
+def prepare_inventory(args):
+    return synthetic.inventory(args.count, args.shapes, args.seed)
+
+
+def prepare_tagged(args):
+    return Tagger.tag_assets(prepare_inventory(args))
+
+
+def prepare_enriched(args):
+    return RiskAssessor.add_risks(prepare_tagged(args))
+
+
+def run_tag(assets):
+    Tagger.tag_assets(assets)
+    return len(assets)
+
+
+def run_risk(assets):
+    RiskAssessor.add_risks(assets)
+    return len(assets)
+
+
+def make_export(formats):
+    def run_export(assets):
+        available = [f for f in formats if Exporter.SINKS[f].available]
+        Exporter.save_results(assets, available, "bench", datetime.now().strftime("%Y%m%d_%H%M%S"))
+        return len(assets)
+    return run_export
+
+
+def run_report(assets):
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        Reporter.print_results(assets, len(assets))
+    return len(assets)
+
+
+_packets = {}
+
+
+def prepare_packets(args):
+    """Dissected capture; built once per run, since _process_packet does not modify packets"""
+    key = (args.pcap, args.packets, args.seed)
+    if key not in _packets:
+        if args.pcap:
+            _packets[key] = synthetic.read_pcap(args.pcap)
+        else:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = synthetic.write_pcap(Path(tmp) / "passive.pcap", args.packets, seed=args.seed)
+                _packets[key] = synthetic.read_pcap(path)
+    return _packets[key]
+
+
+def run_passive(packets):
+    from discovr.passive import PassiveDiscovery
+    sniffer = PassiveDiscovery(iface="bench")
+    for packet in packets:
+        sniffer._process_packet(packet)
+    return sniffer.packets
+
+
+BENCHMARKS = {
+    "tag": (prepare_inventory, lambda args: run_tag, "assets"),
+    "risk": (prepare_tagged, lambda args: run_risk, "assets"),
+    "export": (prepare_enriched, lambda args: make_export(args.formats), "assets"),
+    "report": (prepare_enriched, lambda args: run_report, "assets"),
+    "passive": (prepare_packets, lambda args: run_passive, "packets"),
+}
+
+
+# ---- Measurement ----
+def _reset_caches():
+    CLASSIFIER_CACHE.clear()
+    _cached_port_flags.cache_clear()
+    gc.collect()
+
+
+def measure(name, args):
+    """
+    Time one benchmark (best of --repeat runs on fresh inputs), then (unless --no-memory) run it once
+    more under tracemalloc for its peak memory.
+    """
+    prepare, runner, unit = BENCHMARKS[name]
+    run = runner(args)
+
+    seconds = None
+    for _ in range(args.repeat):
+        data = prepare(args)
+        _reset_caches()
+        start = time.perf_counter()
+        items = run(data)
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+    result = {"items": items, "unit": unit, "seconds": round(seconds, 4),
+              "per_second": round(items / seconds, 1) if seconds else None}
+
+    if not args.no_memory:
+        data = prepare(args)
+        _reset_caches()
+        tracemalloc.start()
+        run(data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_mib"] = round(peak / 2**20, 2)
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """
+    Add a "baseline" entry (throughput and memory ratios) to each result also in the baseline run.
+    :return: names of benchmarks whose throughput dropped by more than tolerance
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before.get("per_second") or not result.get("per_second"):
+            continue
+        entry = {"per_second": before["per_second"], "speedup": round(result["per_second"] / before["per_second"], 3)}
+        if before.get("peak_mib") and result.get("peak_mib"):
+            entry["memory_ratio"] = round(result["peak_mib"] / before["peak_mib"], 3)
+        entry["regression"] = entry["speedup"] < 1 - tolerance
+        if entry["regression"]:
+            regressions.append(name)
+        result["baseline"] = entry
+    return regressions
+
+
+def describe(name, result):
+    line = f"{name:<8} {result['per_second'] or 0:>14,.0f} {result['unit']}/sec ({result['items']} in {result['seconds']:.2f}s)"
+    if "peak_mib" in result:
+        line += f" | peak {result['peak_mib']:,.1f} MiB"
+    entry = result.get("baseline")
+    if entry:
+        line += f" | {entry['speedup'] - 1:+.1%} vs baseline"
+        if "memory_ratio" in entry:
+            line += f", memory x{entry['memory_ratio']:.2f}"
+    return ("[!] " if entry and entry["regression"] else "[+] ") + line
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discovr benchmark suite")
+    parser.add_argument("--count", type=int, default=100_000, help="Assets per inventory benchmark")
+    parser.add_argument("--shapes", nargs="+", choices=synthetic.SHAPES, default=list(synthetic.SHAPES),
+                        help="Inventory shapes, mixed in equal parts")
+    parser.add_argument("--packets", type=int, default=20_000, help="Packets in the synthetic pcap")
+    parser.add_argument("--pcap", help="Replay this capture instead of a synthetic one")
+    parser.add_argument("--formats", nargs="+", default=["json", "jsonl", "csv"], choices=list(Exporter.SINKS))
+    parser.add_argument("--report", choices=Reporter.MODES, default="table", help="Reporter mode to benchmark")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per benchmark; the fastest is kept")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass (halves the run time)")
+    parser.add_argument("--output", help="Write the results JSON here (default: print it)")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Throughput drop that counts as a regression")
+    args = parser.parse_args()
+
+    Tagger.get_rules()
+    Reporter.configure(mode=args.report)
+    results = {}
+    # Exports land under ~/Documents/discovr_reports; point HOME at a scratch directory
+    with tempfile.TemporaryDirectory() as home:
+        saved = {var: os.environ.get(var) for var in ("HOME", "USERPROFILE")}
+        os.environ.update(dict.fromkeys(saved, home))
+        try:
+            # Keep stdout for the results JSON; export messages go to stderr
+            with contextlib.redirect_stdout(sys.stderr):
+                for name in args.only:
+                    results[name] = measure(name, args)
+        finally:
+            for var, value in saved.items():
+                if value is None:
+                    os.environ.pop(var, None)
+                else:
+                    os.environ[var] = value
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+
+    for name, result in results.items():
+        print(describe(name, result), file=sys.stderr)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"count": args.count, "shapes": args.shapes, "packets": args.packets, "pcap": args.pcap,
+                   "formats": args.formats, "report": args.report, "seed": args.seed, "repeat": args.repeat},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        print(f"[+] Results saved: {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=4))
+
+    if regressions:
+        print(f"[!] Throughput regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Synthetic inputs for the benchmarks: inventories shaped like network, AD and Azure scans, NSG rule
+sets, and captures of the ARP/DHCP/DNS/mDNS traffic the passive sniffer looks for.
+Every generator is deterministic for a given seed.
+"""
+import random
+
+from benchmarks.bench_tagger import HOST_PREFIXES, synthetic_assets
+
+SHAPES = ("network", "ad", "azure")
+
+AD_OS = ["Windows 10 Enterprise 10.0 (19045)", "Windows 11 Enterprise 10.0 (22631)",
+         "Windows Server 2019 Datacenter 10.0 (17763)", "Windows Server 2022 Standard 10.0 (20348)",
+         "Windows 7 Professional 6.1 (7601)", "Windows Server 2012 R2 Standard 6.3 (9600)", ""]
+VM_SIZES = ["Standard_B2s", "Standard_D2s_v5", "Standard_D4s_v5", "Standard_E8s_v5", "Standard_F4s_v2"]
+LOCATIONS = ["westeurope", "northeurope", "eastus", "eastus2", "australiaeast"]
+RULE_PORTS = ["22", "80", "443", "3389", "445", "1433", "5985-5986", "8000-8100", "*", "1024-65535"]
+RULE_SOURCES = ["*", "Internet", "VirtualNetwork", "10.0.0.0/8", "AzureLoadBalancer", "192.168.10.0/24"]
+MDNS_SERVICES = ["_ipp._tcp.local", "_airplay._tcp.local", "_googlecast._tcp.local", "_hap._tcp.local"]
+DNS_NAMES = ["login.microsoftonline.com", "update.corp.local", "fileserver.corp.local", "api.github.com"]
+
+
+def _ip(i, first=10):
+    return f"{first}.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+def _mac(i):
+    return "02:" + ":".join(f"{(i >> shift) & 255:02x}" for shift in (32, 24, 16, 8, 0))
+
+
+# ---- Inventories ----
+def network_assets(count, seed=42):
+    """Assets as NetworkDiscovery reports them (IP, Hostname, OS guess, open ports)"""
+    return synthetic_assets(count, seed)
+
+
+def ad_assets(count, seed=42):
+    """Computer objects as ADDiscovery reports them (DNS host name, OS + version, no ports)"""
+    rnd = random.Random(seed)
+    return [
+        {
+            "IP": _ip(i, first=172) if rnd.random() < 0.9 else "Unresolved",
+            "Hostname": f"{rnd.choice(HOST_PREFIXES)}{i:06d}.corp.local",
+            "OS": rnd.choice(AD_OS) or "Unknown",
+            "Ports": "N/A",
+        }
+        for i in range(count)
+    ]
+
+
+def nsg_rules(count, seed=42):
+    """One NSG's security rules, in the dict form AzureDiscovery emits"""
+    rnd = random.Random(seed)
+    rules = []
+    for i in range(count):
+        ports = rnd.sample(RULE_PORTS, rnd.choice((1, 1, 1, 2, 3)))
+        rules.append({
+            "Name": f"rule-{i:03d}",
+            "Priority": 100 + i * 10,
+            "Direction": rnd.choice(("Inbound", "Inbound", "Outbound")),
+            "Access": rnd.choice(("Allow", "Allow", "Deny")),
+            "Protocol": rnd.choice(("Tcp", "Udp", "*")),
+            "Source": rnd.choice(RULE_SOURCES),
+            "Destination": "*",
+            "Ports": ",".join(ports),
+            "PortRanges": ports,
+        })
+    return rules
+
+
+def azure_assets(count, seed=42, rules_per_nsg=(2, 40)):
+    """
+    Resources as AzureDiscovery reports them: per resource group one RG record, a VNet and an NSG,
+    and VMs (about 85% of the records) wired to them.
+    :param rules_per_nsg: (min, max) security rules per NSG
+    """
+    rnd = random.Random(seed)
+    assets, rg, vnet, nsg = [], None, None, None
+    for i in range(count):
+        if rg is None or rnd.random() < 0.05:
+            rg, vnet, nsg = f"rg-app{i:06d}", f"vnet-{i:06d}", f"nsg-{i:06d}"
+            location = rnd.choice(LOCATIONS)
+            assets.append({"Type": "ResourceGroup", "Name": rg, "Location": location,
+                           "Tags": {"env": rnd.choice(("prod", "dev", "test"))}})
+            continue
+        kind = rnd.random()
+        if kind < 0.05:
+            assets.append({
+                "Type": "VirtualNetwork", "Name": vnet, "ResourceGroup": rg, "Location": location,
+                "AddressSpace": [f"10.{i & 255}.0.0/16"], "Subnets": [{"Name": "default", "Prefix": f"10.{i & 255}.0.0/24"}],
+                "DNS": [],
+            })
+        elif kind < 0.10:
+            assets.append({
+                "Type": "NetworkSecurityGroup", "Name": nsg, "ResourceGroup": rg, "Location": location,
+                "SecurityRules": nsg_rules(rnd.randint(*rules_per_nsg), seed=rnd.random()),
+                "AssociatedSubnets": ["default"], "AssociatedNICs": [],
+            })
+        else:
+            windows = rnd.random() < 0.6
+            assets.append({
+                "Type": "VirtualMachine", "Name": f"vm-{i:06d}", "ResourceGroup": rg, "Location": location,
+                "OS": "Windows" if windows else "Linux", "Size": rnd.choice(VM_SIZES),
+                "PowerState": rnd.choice(("running", "running", "running", "deallocated")),
+                "AgentCompatible": True, "AgentVersion": "2.10.0",
+                "Networking": {"NIC": f"nic-{i:06d}", "PrivateIP": _ip(i),
+                               "PublicIP": _ip(i, first=20) if rnd.random() < 0.2 else "N/A",
+                               "VNet": vnet, "Subnet": "default"},
+                "NSG": nsg,
+                "OpenPorts": rnd.choice((["3389"], ["22"], ["80", "443"], [], ["22", "3389", "445"])),
+                "Tags": {"owner": f"team{i % 17}"},
+            })
+    return assets
+
+
+GENERATORS = {"network": network_assets, "ad": ad_assets, "azure": azure_assets}
+
+
+def inventory(count, shapes=SHAPES, seed=42):
+    """count assets split evenly across the given shapes"""
+    assets = []
+    for n, shape in enumerate(shapes):
+        share = count // len(shapes) + (1 if n < count % len(shapes) else 0)
+        assets.extend(GENERATORS[shape](share, seed + n))
+    return assets
+
+
+# ---- Packets ----
+def _frame(kind, h, name):
+    from scapy.all import ARP, BOOTP, DHCP, DNS, DNSQR, IP, UDP, Ether
+
+    mac, ip = _mac(h), _ip(h, first=192)
+    if kind == "arp":
+        pkt = Ether(src=mac, dst="ff:ff:ff:ff:ff:ff") / ARP(hwsrc=mac, psrc=ip, pdst="192.0.0.1")
+    elif kind == "dhcp":
+        pkt = (Ether(src=mac, dst="ff:ff:ff:ff:ff:ff") / IP(src="0.0.0.0", dst="255.255.255.255")
+               / UDP(sport=68, dport=67) / BOOTP(chaddr=bytes.fromhex(mac.replace(":", "")), yiaddr=ip)
+               / DHCP(options=[("message-type", "request"), "end"]))
+    elif kind == "dns":
+        pkt = (Ether(src=mac) / IP(src=ip, dst="192.0.0.53") / UDP(sport=40000 + h % 20000, dport=53)
+               / DNS(rd=1, qd=DNSQR(qname=f"{h}.{name}")))
+    else:
+        pkt = (Ether(src=mac, dst="01:00:5e:00:00:fb") / IP(src=ip, dst="224.0.0.251") / UDP(sport=5353, dport=5353)
+               / DNS(qd=DNSQR(qname=f"device-{h}.{name}")))
+    return bytes(pkt)
+
+
+def frames(count, hosts=None, seed=42):
+    """
+    Raw Ethernet frames for passive discovery: ARP who-has, DHCP requests, DNS queries and mDNS service
+    queries from a pool of hosts (default count // 10), so most frames repeat an already seen device.
+    Repeated frames are built once (scapy packet assembly is slow).
+    """
+    rnd = random.Random(seed)
+    hosts = hosts or max(1, count // 10)
+    built, out = {}, []
+    for _ in range(count):
+        h, kind = rnd.randrange(hosts), rnd.random()
+        if kind < 0.4:
+            key = ("arp", h, None)
+        elif kind < 0.55:
+            key = ("dhcp", h, None)
+        elif kind < 0.85:
+            key = ("dns", h, rnd.choice(DNS_NAMES))
+        else:
+            key = ("mdns", h, rnd.choice(MDNS_SERVICES))
+        frame = built.get(key)
+        if frame is None:
+            frame = built[key] = _frame(*key)
+        out.append(frame)
+    return out
+
+
+def write_pcap(path, count, hosts=None, seed=42):
+    """Write frames(count, hosts, seed) as a pcap file"""
+    from scapy.all import PcapWriter
+    with PcapWriter(str(path), linktype=1, sync=False) as writer:
+        for frame in frames(count, hosts, seed):
+            writer.write(frame)
+    return path
+
+
+def read_pcap(path):
+    """Dissect a pcap the way a live capture hands packets to the sniffer callback"""
+    from scapy.all import rdpcap
+    return list(rdpcap(str(path)))
@@ -5,8 +5,12 @@ a = Analysis(
     ['discovr\\cli.py'],
     pathex=[],
     binaries=[],
-    datas=[],
-    hiddenimports=[],
+    datas=[('discovr\\rules\\tag_rules.json', 'discovr\\rules')],
+    # Discovery modes are imported by name through discovr.plugins, which PyInstaller cannot follow
+    hiddenimports=[
+        'discovr.network', 'discovr.cloud', 'discovr.azure', 'discovr.gcp',
+        'discovr.active_directory', 'discovr.ad_sync', 'discovr.passive',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
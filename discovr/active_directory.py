@@ -1,5 +1,9 @@
+import ipaddress
 import logging
-import socket
+
+from discovr.logs import asset_log
+from discovr.metrics import METRICS
+from discovr.resolver import DNSResolver
 
 try:
     from ldap3 import Server, Connection, ALL
@@ -7,51 +11,181 @@ try:
 except ImportError:
     ad_available = False
 
+# Simple Paged Results control (RFC 2696)
+PAGED_RESULTS_OID = "1.2.840.113556.1.4.319"
+
+
+def _attr(entry, name):
+    """Return a single-valued attribute from a raw ldap3 response entry (or None)"""
+    value = entry.get("attributes", {}).get(name)
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    if value in (None, ""):
+        return None
+    return str(value)
+
+
+def _usable_ip(value):
+    """Return value if it is a routable-looking IPv4/IPv6 address, else None"""
+    try:
+        ip = ipaddress.ip_address(str(value).strip())
+    except ValueError:
+        return None
+    if ip.is_loopback or ip.is_unspecified:
+        return None
+    return str(ip)
+
 
 class ADDiscovery:
-    def __init__(self, domain, username, password):
+    ATTRIBUTES = ["cn", "dNSHostName", "operatingSystem", "operatingSystemVersion"]
+    # Attributes that may already carry the host address (skips the DNS lookup)
+    ADDRESS_ATTRIBUTES = ["ipHostNumber", "networkAddress"]
+
+    def __init__(self, domain, username, password, page_size=1000, resolver=None, keep_bound=False,
+                 raise_errors=False):
+        """
+        :param domain: AD domain (e.g. mydomain.local)
+        :param username: Bind user
+        :param password: Bind password
+        :param page_size: Objects requested per LDAP page (Simple Paged Results)
+        :param resolver: DNSResolver used for hostname lookups (default: 32 workers, 2s timeout)
+        :param keep_bound: Reuse one LDAP bind across runs until close() (long-lived callers)
+        :param raise_errors: Re-raise bind and search errors after logging them, instead of ending the
+            run early (callers that must tell a failed run from an empty directory)
+        """
         self.domain = domain
         self.username = username
         self.password = password
+        self.page_size = max(1, page_size)
+        self.resolver = resolver or DNSResolver()
+        self.keep_bound = keep_bound
+        self.raise_errors = raise_errors
+        self._conn = None
 
-    def run(self):
-        if not ad_available:
-            logging.error("[!] ldap3 not installed. Run: pip install ldap3")
-            return []
+    @property
+    def search_base(self):
+        return f"DC={self.domain.replace('.', ',DC=')}"
 
-        assets = []
-        try:
-            server = Server(self.domain, get_info=ALL)
+    def _connect(self):
+        if self._conn is not None and self._conn.bound:
+            return self._conn
+        server = Server(self.domain, get_info=ALL)
+        with METRICS.timer("discovr_api_call_seconds", provider="ldap", call="bind"):
             conn = Connection(server, user=self.username, password=self.password, auto_bind=True)
-            logging.info(f"[+] Connected to AD domain: {self.domain}")
+        logging.info(f"[+] Connected to AD domain: {self.domain}")
+        if self.keep_bound:
+            self._conn = conn
+        return conn
 
-            conn.search(
-                search_base=f"DC={self.domain.replace('.', ',DC=')}",
-                search_filter="(objectClass=computer)",
-                attributes=["cn", "dNSHostName", "operatingSystem", "operatingSystemVersion"]
+    def close(self):
+        """Unbind a connection kept by keep_bound"""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            try:
+                conn.unbind()
+            except Exception:
+                pass    # already dropped by the server
+
+    def _paged_search(self, conn, search_filter, attributes, controls=None):
+        """
+        Run a paged search and yield one list of raw entries per page.
+        The server's size limit no longer caps the result set, and only one page is held in memory.
+        """
+        cookie = None
+        while True:
+            with METRICS.timer("discovr_api_call_seconds", provider="ldap", call="search_page"):
+                conn.search(
+                    search_base=self.search_base,
+                    search_filter=search_filter,
+                    attributes=attributes,
+                    paged_size=self.page_size,
+                    paged_cookie=cookie,
+                    controls=controls,
+                )
+            yield [e for e in (conn.response or []) if e.get("type") == "searchResEntry"]
+
+            cookie = (
+                (conn.result or {}).get("controls", {})
+                .get(PAGED_RESULTS_OID, {})
+                .get("value", {})
+                .get("cookie")
             )
+            if not cookie:
+                break
 
-            for entry in conn.entries:
-                fqdn = str(entry.dNSHostName) if entry.dNSHostName else str(entry.cn)
-                os_name = str(entry.operatingSystem) if entry.operatingSystem else "Unknown"
-                os_version = str(entry.operatingSystemVersion) if entry.operatingSystemVersion else ""
+    def _entry_to_asset(self, entry):
+        fqdn = _attr(entry, "dNSHostName") or _attr(entry, "cn") or "Unknown"
+        os_name = _attr(entry, "operatingSystem") or "Unknown"
+        os_version = _attr(entry, "operatingSystemVersion") or ""
 
-                try:
-                    ip = socket.gethostbyname(fqdn)
-                except Exception:
-                    ip = "N/A"
-
-                asset = {
-                    "IP": ip,
-                    "Hostname": fqdn,
-                    "OS": f"{os_name} {os_version}".strip(),
-                    "Ports": "N/A"
-                }
-                logging.info(f"    [+] AD Computer: {asset['IP']} ({asset['Hostname']}) | OS: {asset['OS']}")
-                assets.append(asset)
-
-            conn.unbind()
+        ip = None
+        for name in self.ADDRESS_ATTRIBUTES:
+            ip = _usable_ip(_attr(entry, name))
+            if ip:
+                break
+
+        return {
+            "IP": ip,
+            "Hostname": fqdn,
+            "OS": f"{os_name} {os_version}".strip(),
+            "Ports": "N/A"
+        }
+
+    def iter_pages(self):
+        """Yield discovered AD computers page by page (list of asset dicts per page)"""
+        if not ad_available:
+            logging.error("[!] ldap3 not installed. Run: pip install ldap3")
+            if self.raise_errors:
+                raise RuntimeError("ldap3 not installed")
+            return
+
+        conn = None
+        total = 0
+        self.resolver.reset_stats()     # the resolver (and its cache) outlives the run; its stats do not
+        try:
+            conn = self._connect()
+            pages = self._paged_search(conn, "(objectClass=computer)", self.ATTRIBUTES + self.ADDRESS_ATTRIBUTES)
+            for page_no, entries in enumerate(pages, start=1):
+                page = [self._entry_to_asset(entry) for entry in entries]
+                self._resolve(page)
+                for asset in page:
+                    asset_log.info("    [+] AD Computer: %s (%s) | OS: %s", asset["IP"], asset["Hostname"], asset["OS"])
+                total += len(page)
+                logging.info("[+] AD page %d: %d computers (%d total)", page_no, len(page), total)
+                yield page
         except Exception as e:
+            METRICS.inc("discovr_api_errors_total", provider="ldap")
             logging.error(f"[!] Active Directory discovery failed: {e}")
+            # A kept connection may look bound after the server dropped it; bind again next run
+            self._conn = None
+            if self.raise_errors:
+                raise
+        finally:
+            if conn is not None and conn is not self._conn:
+                try:
+                    conn.unbind()
+                except Exception:
+                    pass    # already dropped by the server
+            self.resolver.close()
+            stats = self.resolver.stats
+            logging.info(
+                f"[+] DNS resolution time: {stats['elapsed']:.2f} seconds "
+                f"({stats['lookups']} lookups, {stats['cache_hits']} cached, "
+                f"{stats['negative_hits']} negative cached, {stats['timeouts']} timed out)"
+            )
 
-        return assets
\ No newline at end of file
+    def _resolve(self, page):
+        """Fill in IPs for a page of assets that did not carry an address attribute"""
+        names = [a["Hostname"] for a in page if not a["IP"]]
+        resolved = self.resolver.resolve_many(names) if names else {}
+        for asset in page:
+            if not asset["IP"]:
+                asset["IP"] = resolved.get(asset["Hostname"]) or "N/A"
+
+    def iter_assets(self):
+        """Yield discovered AD computers one at a time"""
+        for page in self.iter_pages():
+            yield from page
+
+    def run(self):
+        return list(self.iter_assets())
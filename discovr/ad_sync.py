@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from discovr import active_directory
+from discovr.active_directory import _attr
+
+# LDAP_SERVER_SHOW_DELETED_OID: return tombstones from CN=Deleted Objects
+SHOW_DELETED_OID = "1.2.840.113556.1.4.417"
+
+
+class ADInventoryStore:
+    def __init__(self, path):
+        """
+        Locally stored AD inventory: the last known computer objects plus per-DC sync watermarks.
+        :param path: JSON state file
+        """
+        self.path = Path(path)
+        self.dcs = {}
+        self.objects = {}
+        self.load()
+
+    @staticmethod
+    def default_path(domain):
+        return Path.home() / "Documents" / "discovr_reports" / "ad_state" / f"{domain.lower()}.json"
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.dcs = data.get("dcs", {})
+            self.objects = data.get("objects", {})
+        except Exception as e:
+            logging.error(f"[!] Failed to load AD inventory {self.path}: {e}")
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dcs": self.dcs, "objects": self.objects}, f)
+        os.replace(tmp, self.path)
+
+
+class ADIncrementalSync:
+    SYNC_ATTRIBUTES = ["objectGUID", "uSNChanged"]
+
+    def __init__(self, discovery, store=None, full_sync_interval=24 * 3600):
+        """
+        Delta sync of AD computers using the per-DC uSNChanged watermark.
+        :param discovery: Configured ADDiscovery (connection, paging, DNS resolver)
+        :param store: ADInventoryStore (default: ~/Documents/discovr_reports/ad_state/<domain>.json)
+        :param full_sync_interval: Seconds between full reconciles (deletions missed by tombstones)
+        """
+        self.discovery = discovery
+        self.store = store or ADInventoryStore(ADInventoryStore.default_path(discovery.domain))
+        self.full_sync_interval = full_sync_interval
+        self.changes = {"mode": None, "added": 0, "updated": 0, "deleted": 0}
+
+    @staticmethod
+    def _dc_state(conn):
+        """Return (DC name, highestCommittedUSN) from the rootDSE of the bound server"""
+        info = getattr(conn.server, "info", None)
+        other = getattr(info, "other", None) or {}
+
+        def first(key):
+            value = other.get(key)
+            if isinstance(value, (list, tuple)):
+                value = value[0] if value else None
+            return value
+
+        dc_name = first("dnsHostName") or getattr(conn.server, "host", "unknown")
+        usn = first("highestCommittedUSN")
+        return str(dc_name).lower(), int(usn) if usn is not None else None
+
+    def _computers(self, conn, search_filter):
+        """Yield (guid, usn, asset) for computers matching search_filter, resolved page by page"""
+        d = self.discovery
+        attributes = d.ATTRIBUTES + d.ADDRESS_ATTRIBUTES + self.SYNC_ATTRIBUTES
+        for entries in d._paged_search(conn, search_filter, attributes):
+            page = [(e, d._entry_to_asset(e)) for e in entries]
+            d._resolve([asset for _, asset in page])
+            for entry, asset in page:
+                guid = _guid(entry)
+                if guid:
+                    yield guid, _usn(entry), asset
+
+    def _tombstones(self, conn, since):
+        d = self.discovery
+        search_filter = f"(&(objectClass=computer)(isDeleted=TRUE)(uSNChanged>={since}))"
+        controls = [(SHOW_DELETED_OID, True, None)]
+        for entries in d._paged_search(conn, search_filter, self.SYNC_ATTRIBUTES, controls=controls):
+            for entry in entries:
+                guid = _guid(entry)
+                if guid:
+                    yield guid
+
+    def run(self):
+        """
+        Sync the local AD inventory and return the full merged list of computers.
+        A full enumeration runs on first contact with a DC or when the reconcile interval has elapsed;
+        otherwise only objects with uSNChanged above the stored watermark are fetched.
+        """
+        if not active_directory.ad_available:
+            logging.error("[!] ldap3 not installed. Run: pip install ldap3")
+            return []
+
+        conn = self.discovery._connect()
+        try:
+            dc_name, committed_usn = self._dc_state(conn)
+            dc = self.store.dcs.get(dc_name)
+            now = time.time()
+            full = dc is None or now - dc.get("last_full_sync", 0) >= self.full_sync_interval
+            highest = dc["highest_usn"] if dc else 0
+
+            if full:
+                self.changes["mode"] = "full"
+                logging.info(f"[+] AD full reconcile against {dc_name}")
+                seen = set()
+                for guid, usn, asset in self._computers(conn, "(objectClass=computer)"):
+                    self._upsert(guid, asset)
+                    seen.add(guid)
+                    highest = max(highest, usn)
+                for guid in [g for g in self.store.objects if g not in seen]:
+                    del self.store.objects[guid]
+                    self.changes["deleted"] += 1
+                last_full_sync = now
+            else:
+                self.changes["mode"] = "incremental"
+                since = dc["highest_usn"] + 1
+                logging.info(f"[+] AD incremental sync against {dc_name} (uSNChanged >= {since})")
+                for guid, usn, asset in self._computers(conn, f"(&(objectClass=computer)(uSNChanged>={since}))"):
+                    self._upsert(guid, asset)
+                    highest = max(highest, usn)
+                for guid in self._tombstones(conn, since):
+                    if self.store.objects.pop(guid, None) is not None:
+                        self.changes["deleted"] += 1
+                last_full_sync = dc.get("last_full_sync", 0)
+
+            # Objects changed while the search was running carry a USN above the one read beforehand,
+            # so the pre-search highestCommittedUSN is the safe watermark (re-fetching is harmless)
+            if committed_usn is not None:
+                highest = committed_usn
+            self.store.dcs[dc_name] = {"highest_usn": highest, "last_full_sync": last_full_sync, "last_sync": now}
+            self.store.save()
+        finally:
+            conn.unbind()
+            self.discovery.resolver.close()
+
+        logging.info(
+            f"[+] AD sync ({self.changes['mode']}): {self.changes['added']} added, "
+            f"{self.changes['updated']} updated, {self.changes['deleted']} deleted, "
+            f"{len(self.store.objects)} computers in inventory"
+        )
+        return list(self.store.objects.values())
+
+    def _upsert(self, guid, asset):
+        previous = self.store.objects.get(guid)
+        if previous is None:
+            self.changes["added"] += 1
+        elif previous != asset:
+            self.changes["updated"] += 1
+        self.store.objects[guid] = asset
+
+
+def _guid(entry):
+    return _attr(entry, "objectGUID")
+
+
+def _usn(entry):
+    try:
+        return int(_attr(entry, "uSNChanged"))
+    except (TypeError, ValueError):
+        return 0
@@ -0,0 +1,73 @@
+from collections import Counter
+
+HIGH_RISK = ("High", "Critical")
+
+# Asset Type -> ResourceGroupBucket list attribute
+TYPE_LISTS = {
+    "VirtualMachine": "vms",
+    "VirtualNetwork": "vnets",
+    "NetworkSecurityGroup": "nsgs",
+}
+
+
+class ResourceGroupBucket:
+    def __init__(self, key):
+        """Assets of one resource group, split by type, with risk counters"""
+        self.key = key
+        self.info = None            # the ResourceGroup asset itself, if it was discovered
+        self.vms = []
+        self.vnets = []
+        self.nsgs = []
+        self.others = []
+        self.high_risk_vms = 0
+        self.high_risk_nsgs = 0
+
+    @property
+    def name(self):
+        return self.info.get("Name") if self.info else self.key
+
+
+class Aggregation:
+    def __init__(self, assets, normalize=False):
+        """
+        Group assets by resource group and type in a single pass.
+        :param normalize: Lowercase each asset's ResourceGroup in place (as shown in reports)
+        """
+        self.groups = {}            # lowercased RG name -> ResourceGroupBucket, in first-seen order
+        self.by_type = {"ResourceGroup": [], "VirtualMachine": [], "VirtualNetwork": [], "NetworkSecurityGroup": []}
+        self.risks = Counter()
+        self.total = 0
+
+        for asset in assets:
+            self.total += 1
+            asset_type = asset.get("Type")
+            risk = asset.get("Risk")
+            self.risks[risk] += 1
+            if asset_type in self.by_type:
+                self.by_type[asset_type].append(asset)
+
+            rg = asset.get("ResourceGroup")
+            if rg and normalize:
+                rg = asset["ResourceGroup"] = rg.lower()
+            if "ResourceGroup" not in asset:
+                rg = asset.get("Name")
+            key = str(rg or "unknownrg").lower()
+
+            bucket = self.groups.get(key)
+            if bucket is None:
+                bucket = self.groups[key] = ResourceGroupBucket(key)
+            if asset_type == "ResourceGroup":
+                bucket.info = bucket.info or asset
+            elif asset_type in TYPE_LISTS:
+                getattr(bucket, TYPE_LISTS[asset_type]).append(asset)
+                if risk in HIGH_RISK:
+                    if asset_type == "VirtualMachine":
+                        bucket.high_risk_vms += 1
+                    elif asset_type == "NetworkSecurityGroup":
+                        bucket.high_risk_nsgs += 1
+            else:
+                bucket.others.append(asset)
+
+    def resource_groups(self):
+        """Buckets of the discovered ResourceGroup assets, in discovery order"""
+        return [self.groups[str(rg.get("Name") or "unknownrg").lower()] for rg in self.by_type["ResourceGroup"]]
@@ -0,0 +1,224 @@
+import ipaddress
+import socket
+import sys
+
+from discovr.cache import ENRICHED_KEY
+from discovr.ports import MIN_PORT, MAX_PORT, parse_port_spec, PortIntervalIndex
+
+# Dict keys held in dedicated slots; everything else (cloud Type/Name/Networking, ...) goes to Asset.extra
+SLOT_KEYS = {"Hostname": "hostname", "OS": "os", "Tag": "tag", "Risk": "risk"}
+PORT_KEYS = ("Ports", "OpenPorts")
+
+# Ports render forms; any other value of _port_form is the literal sentinel ("None", "N/A", None, ...)
+PORTS_STR = 0       # "80,443,3000-4000"
+PORTS_LIST = 1      # ["80", "443", "3000-4000"]
+
+# Port-interval tuples and key layouts repeat across most assets, so one shared copy of each is kept
+_SHARED_LIMIT = 100_000
+_shared = {}
+_parsed_ports = {}      # Ports string -> (intervals, form, renders back unchanged)
+
+
+def _share(value):
+    if len(_shared) >= _SHARED_LIMIT:
+        _shared.clear()
+    return _shared.setdefault(value, value)
+
+
+def _intern(value):
+    return sys.intern(value) if value.__class__ is str else value
+
+
+def _port_token(low, high):
+    if low == MIN_PORT and high == MAX_PORT:
+        return "*"
+    return str(low) if low == high else f"{low}-{high}"
+
+
+class Asset:
+    __slots__ = ("_keys", "_ip", "hostname", "os", "_ports", "_port_form", "tag", "risk", "enriched", "extra")
+
+    def __init__(self):
+        """
+        Compact asset record. Use Asset.from_dict(); to_dict() returns the original dict unchanged.
+        IPs are kept packed, ports as parsed (low, high) intervals, repeated strings interned,
+        and source-specific fields (Type, Networking, SecurityRules, ...) in the extra dict.
+        """
+        self._keys = ()
+        self._ip = None
+        self.hostname = None
+        self.os = None
+        self._ports = ()
+        self._port_form = None
+        self.tag = None
+        self.risk = None
+        self.enriched = False
+        self.extra = None
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, Asset):
+            return data
+        asset = cls()
+        asset._keys = _share(tuple(data))
+        for key, value in data.items():
+            asset._store(key, value)
+        return asset
+
+    def to_dict(self):
+        return {key: self[key] for key in self._keys}
+
+    # ---- Parsed fields ----
+    @property
+    def ip(self):
+        """IP as an ipaddress object (None when the source had no usable address)"""
+        return ipaddress.ip_address(self._ip) if self._ip.__class__ is bytes else None
+
+    @property
+    def intervals(self):
+        """Open ports as a tuple of (low, high) intervals, parsed once at construction"""
+        return self._ports
+
+    def port_index(self):
+        return PortIntervalIndex(self._ports)
+
+    # ---- Field storage ----
+    def _set_ip(self, value):
+        if value.__class__ is str:
+            family = socket.AF_INET6 if ":" in value else socket.AF_INET
+            try:
+                packed = socket.inet_pton(family, value)
+            except (OSError, ValueError):
+                packed = None
+            if packed is not None and socket.inet_ntop(family, packed) == value:
+                self._ip = packed
+                return
+            self._ip = _intern(value)
+        elif value is None:
+            self._ip = None
+        else:
+            self._set_extra("IP", value)
+
+    def _get_ip(self):
+        ip = self._ip
+        if ip.__class__ is bytes:
+            return socket.inet_ntop(socket.AF_INET if len(ip) == 4 else socket.AF_INET6, ip)
+        return ip
+
+    def _set_ports(self, key, value):
+        parsed = _parsed_ports.get(value) if value.__class__ is str else None
+        if parsed is None:
+            intervals = parse_port_spec(value) if value is not None else []
+            if value.__class__ is str:
+                form = PORTS_STR if intervals else _intern(value)
+            elif value.__class__ is list and intervals:
+                form = PORTS_LIST
+            elif value is None:
+                form = None
+            else:
+                form = PORTS_LIST if intervals else PORTS_STR
+            self._ports, self._port_form = _share(tuple(intervals)), form
+            parsed = (self._ports, form, self._render_ports() == value)
+            if value.__class__ is str:
+                if len(_parsed_ports) >= _SHARED_LIMIT:
+                    _parsed_ports.clear()
+                _parsed_ports[value] = parsed
+        self._ports, self._port_form, canonical = parsed
+        if not canonical:
+            # Not in canonical form (spacing, ints in a list, "Any", ...): keep the original for to_dict()
+            self._set_extra(key, value)
+
+    def _render_ports(self):
+        form = self._port_form
+        if form.__class__ is not int:
+            return form
+        tokens = [_port_token(low, high) for low, high in self._ports]
+        return ",".join(tokens) if form == PORTS_STR else tokens
+
+    def _set_extra(self, key, value):
+        if self.extra is None:
+            self.extra = {}
+        self.extra[key] = value
+
+    # ---- Mapping interface (drop-in for the dicts consumed by Tagger/RiskAssessor/Exporter) ----
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        extra = self.extra
+        if extra and key in extra:
+            return extra[key]
+        if key in SLOT_KEYS:
+            return getattr(self, SLOT_KEYS[key])
+        if key == "IP":
+            return self._get_ip()
+        if key in PORT_KEYS:
+            return self._render_ports()
+        if key == ENRICHED_KEY:
+            return self.enriched
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self._keys:
+            self._keys = _share(self._keys + (key,))
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        self._store(key, value)
+
+    def _store(self, key, value):
+        if key == "Hostname":
+            self.hostname = value               # mostly unique: not worth interning
+        elif key in SLOT_KEYS:
+            setattr(self, SLOT_KEYS[key], _intern(value))
+        elif key == "IP":
+            self._set_ip(value)
+        elif key in PORT_KEYS:
+            owner = next(k for k in self._keys if k in PORT_KEYS)
+            if key == owner:
+                self._set_ports(key, value)
+            else:
+                self._set_extra(key, value)     # both present: the first one keeps the interval slot
+        elif key == ENRICHED_KEY and value.__class__ is bool:
+            self.enriched = value
+        else:
+            self._set_extra(key, value)
+
+    def get(self, key, default=None):
+        return self[key] if key in self._keys else default
+
+    def setdefault(self, key, default=None):
+        if key not in self._keys:
+            self[key] = default
+        return self[key]
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def keys(self):
+        return list(self._keys)
+
+    def values(self):
+        return [self[key] for key in self._keys]
+
+    def items(self):
+        return [(key, self[key]) for key in self._keys]
+
+    def __eq__(self, other):
+        if isinstance(other, (Asset, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Asset({self.to_dict()!r})"
+
+
+def compact(assets):
+    """Convert a list of asset dicts to Assets"""
+    return [Asset.from_dict(a) for a in assets]
@@ -3,28 +3,69 @@ from azure.mgmt.compute import ComputeManagementClient
 from azure.mgmt.resource import ResourceManagementClient
 from azure.mgmt.network import NetworkManagementClient
 
+from discovr.metrics import METRICS
+from discovr.ports import NSGRuleIndex
+
+
+def _rule_to_dict(rule):
+    """Normalize an Azure security rule; multi-range rules keep every range"""
+    port_ranges = list(rule.destination_port_ranges or [])
+    if rule.destination_port_range:
+        port_ranges.insert(0, rule.destination_port_range)
+    sources = list(rule.source_address_prefixes or [])
+    if rule.source_address_prefix:
+        sources.insert(0, rule.source_address_prefix)
+    return {
+        "Name": rule.name,
+        "Priority": rule.priority,
+        "Direction": rule.direction,
+        "Access": rule.access,
+        "Protocol": rule.protocol,
+        "Source": ",".join(sources) or None,
+        "Destination": rule.destination_address_prefix,
+        "Ports": ",".join(port_ranges) or None,
+        "PortRanges": port_ranges,
+    }
+
 
 class AzureDiscovery:
     def __init__(self, subscription_id: str):
         self.subscription_id = subscription_id
         self.credential = DefaultAzureCredential()
         self.network_client = NetworkManagementClient(self.credential, self.subscription_id)
+        self._nsg_indexes = {}
+
+    def _nsg_index(self, nsg_id):
+        """Fetch an NSG once and keep its parsed rule index (shared by every NIC that uses it)"""
+        index = self._nsg_indexes.get(nsg_id)
+        if index is None:
+            parts = nsg_id.split("/")
+            with METRICS.timer("discovr_api_call_seconds", provider="azure", call="network_security_groups.get"):
+                nsg = self.network_client.network_security_groups.get(parts[4], parts[-1])
+            index = NSGRuleIndex([_rule_to_dict(r) for r in nsg.security_rules or []])
+            self._nsg_indexes[nsg_id] = index
+        return index
 
     def run(self):
-        assets = []
+        return list(self.iter_assets())
 
+    def iter_assets(self):
+        """Yield Azure assets (RGs, VMs, VNets, NSGs) as they are collected"""
+        # NSG rules are cached for this run only: a reused instance must see rule changes
+        self._nsg_indexes = {}
         # --------------------
         # Resource Groups
         # --------------------
         print("[+] Collecting Resource Groups...")
         resource_client = ResourceManagementClient(self.credential, self.subscription_id)
-        for rg in resource_client.resource_groups.list():
-            assets.append({
+        for rg in METRICS.timed_iter(resource_client.resource_groups.list(), "discovr_api_call_seconds",
+                                     provider="azure", call="resource_groups.list"):
+            yield {
                 "Type": "ResourceGroup",
                 "Name": rg.name,
                 "Location": rg.location,
                 "Tags": rg.tags,
-            })
+            }
             print(f"    [+] RG: {rg.name} | Location: {rg.location}")
 
         # --------------------
@@ -32,11 +73,13 @@ class AzureDiscovery:
         # --------------------
         print("[+] Collecting Virtual Machines...")
         compute_client = ComputeManagementClient(self.credential, self.subscription_id)
-        for vm in compute_client.virtual_machines.list_all():
+        for vm in METRICS.timed_iter(compute_client.virtual_machines.list_all(), "discovr_api_call_seconds",
+                                     provider="azure", call="virtual_machines.list_all"):
             rg_name = vm.id.split("/")[4]
 
             # Instance view (for PowerState + Agent)
-            vm_details = compute_client.virtual_machines.instance_view(rg_name, vm.name)
+            with METRICS.timer("discovr_api_call_seconds", provider="azure", call="virtual_machines.instance_view"):
+                vm_details = compute_client.virtual_machines.instance_view(rg_name, vm.name)
             os_type = vm.storage_profile.os_disk.os_type if vm.storage_profile else "Unknown"
             power_state = [
                 s.code for s in vm_details.statuses if "PowerState" in s.code
@@ -56,7 +99,8 @@ class AzureDiscovery:
             if vm.network_profile and vm.network_profile.network_interfaces:
                 for nic_ref in vm.network_profile.network_interfaces:
                     nic_name = nic_ref.id.split("/")[-1]
-                    nic = self.network_client.network_interfaces.get(rg_name, nic_name)
+                    with METRICS.timer("discovr_api_call_seconds", provider="azure", call="network_interfaces.get"):
+                        nic = self.network_client.network_interfaces.get(rg_name, nic_name)
                     private_ip = None
                     public_ip = None
                     subnet_name = None
@@ -69,7 +113,9 @@ class AzureDiscovery:
                             pub_id = ipconf.public_ip_address.id
                             pub_name = pub_id.split("/")[-1]
                             pub_rg = pub_id.split("/")[4]
-                            pub_ip_obj = self.network_client.public_ip_addresses.get(pub_rg, pub_name)
+                            with METRICS.timer("discovr_api_call_seconds", provider="azure",
+                                               call="public_ip_addresses.get"):
+                                pub_ip_obj = self.network_client.public_ip_addresses.get(pub_rg, pub_name)
                             public_ip = pub_ip_obj.ip_address
                         if ipconf.subnet:
                             subnet_name = ipconf.subnet.id.split("/")[-1]
@@ -77,12 +123,7 @@ class AzureDiscovery:
 
                         if nic.network_security_group:
                             nsg_name = nic.network_security_group.id.split("/")[-1]
-                            nsg_rg = nic.network_security_group.id.split("/")[4]
-                            nsg = self.network_client.network_security_groups.get(nsg_rg, nsg_name)
-                            for rule in nsg.security_rules:
-                                if rule.direction.lower() == "inbound" and rule.access.lower() == "allow":
-                                    if rule.destination_port_range:
-                                        open_ports.add(str(rule.destination_port_range))
+                            open_ports.update(self._nsg_index(nic.network_security_group.id).ports)
 
                     nic_info = {
                         "NIC": nic_name,
@@ -92,9 +133,11 @@ class AzureDiscovery:
                         "Subnet": subnet_name,
                     }
 
-            assets.append({
+            open_ports = sorted(open_ports)
+            yield {
                 "Type": "VirtualMachine",
                 "Name": vm.name,
+                "ResourceId": vm.id,
                 "ResourceGroup": rg_name,
                 "Location": vm.location,
                 "OS": os_type,
@@ -108,9 +151,9 @@ class AzureDiscovery:
                 },
                 "Networking": nic_info,
                 "NSG": nsg_name,
-                "OpenPorts": sorted(list(open_ports)),
+                "OpenPorts": open_ports,
                 "Tags": vm.tags,
-            })
+            }
 
             print(
                 f"    [+] VM: {vm.name} | OS: {os_type} | Size: {vm.hardware_profile.vm_size} "
@@ -123,10 +166,11 @@ class AzureDiscovery:
         # Virtual Networks
         # --------------------
         print("[+] Collecting Virtual Networks...")
-        for vnet in self.network_client.virtual_networks.list_all():
+        for vnet in METRICS.timed_iter(self.network_client.virtual_networks.list_all(), "discovr_api_call_seconds",
+                                       provider="azure", call="virtual_networks.list_all"):
             rg_name = vnet.id.split("/")[4]
             subnets = [subnet.name for subnet in vnet.subnets] if vnet.subnets else []
-            assets.append({
+            yield {
                 "Type": "VirtualNetwork",
                 "Name": vnet.name,
                 "ResourceGroup": rg_name,
@@ -134,29 +178,19 @@ class AzureDiscovery:
                 "AddressSpace": vnet.address_space.address_prefixes,
                 "Subnets": subnets,
                 "DNS": vnet.dhcp_options.dns_servers if vnet.dhcp_options else [],
-            })
+            }
             print(f"    [+] VNet: {vnet.name} | Subnets: {subnets}")
 
         # --------------------
         # Network Security Groups
         # --------------------
         print("[+] Collecting Network Security Groups...")
-        for nsg in self.network_client.network_security_groups.list_all():
+        for nsg in METRICS.timed_iter(self.network_client.network_security_groups.list_all(), "discovr_api_call_seconds",
+                                      provider="azure", call="network_security_groups.list_all"):
             rg_name = nsg.id.split("/")[4]
-            rules = []
-            for rule in nsg.security_rules:
-                rules.append({
-                    "Name": rule.name,
-                    "Priority": rule.priority,
-                    "Direction": rule.direction,
-                    "Access": rule.access,
-                    "Protocol": rule.protocol,
-                    "Source": rule.source_address_prefix,
-                    "Destination": rule.destination_address_prefix,
-                    "Ports": rule.destination_port_range,
-                })
-
-            assets.append({
+            rules = [_rule_to_dict(rule) for rule in nsg.security_rules or []]
+
+            yield {
                 "Type": "NetworkSecurityGroup",
                 "Name": nsg.name,
                 "ResourceGroup": rg_name,
@@ -164,7 +198,6 @@ class AzureDiscovery:
                 "SecurityRules": rules,
                 "AssociatedSubnets": [s.id.split("/")[-1] for s in nsg.subnets] if nsg.subnets else [],
                 "AssociatedNICs": [nic.id.split("/")[-1] for nic in nsg.network_interfaces] if nsg.network_interfaces else [],
-            })
+            }
             print(f"    [+] NSG: {nsg.name} | Group: {rg_name} | Rules: {len(rules)}")
 
-        return assets
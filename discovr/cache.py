@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from threading import Lock
+
+# Marker set on assets that already carry Tag and Risk; later enrichment stages skip them
+ENRICHED_KEY = "_enriched"
+
+
+class LRUCache:
+    def __init__(self, maxsize=65536):
+        """
+        Bounded least-recently-used cache with hit/miss statistics.
+        :param maxsize: Maximum number of entries kept
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared by Tagger and RiskAssessor; keys are ("tag", rule set id, signature) / ("risk", signature)
+CLASSIFIER_CACHE = LRUCache()
+
+
+def is_enriched(asset):
+    return bool(asset.get(ENRICHED_KEY))
+
+
+def mark_enriched(asset):
+    asset[ENRICHED_KEY] = True
+
+
+def public_view(asset):
+    """Asset without internal (underscore-prefixed) keys, for export"""
+    if hasattr(asset, "to_dict"):
+        asset = asset.to_dict()
+    if not any(isinstance(k, str) and k.startswith("_") for k in asset):
+        return asset
+    return {k: v for k, v in asset.items() if not (isinstance(k, str) and k.startswith("_"))}
@@ -1,4 +1,5 @@
 import argparse
+import contextlib
 import sys
 import time
 import ipaddress
@@ -7,6 +8,7 @@ import os
 import ctypes
 import warnings
 import logging
+from pathlib import Path
 
 # --------------------------
 # Suppress noisy warnings/logs
@@ -21,12 +23,18 @@ logging.getLogger("scapy.runtime").setLevel(logging.ERROR)
 if platform.system() == "Windows":
     import msvcrt
 
+from tabulate import tabulate
+
 from discovr.core import Logger, Exporter, Reporter
-from discovr.network import NetworkDiscovery
-from discovr.cloud import CloudDiscovery
-from discovr.active_directory import ADDiscovery
-from discovr.passive import PassiveDiscovery
-from discovr.gcp import GCPDiscovery
+from discovr.sinks import JSONLSink
+from discovr import plugins, profiling
+from discovr.resolver import DNSResolver
+from discovr.tagger import Tagger
+from discovr.correlate import correlate_reports
+from discovr.diff import diff_reports, previous_report, find_reports, DiffReport
+from discovr.inventory import InventoryStore, parse_port, parse_since
+from discovr.pipeline import run_pipeline, ConsoleStage, CollectSink, TopSink
+from discovr.orchestrator import DiscoveryJob, Orchestrator
 
 
 def is_admin_windows():
@@ -71,6 +79,19 @@ def show_privilege_hint(system, assets):
             print("[!] Please try running again as Administrator on Windows for OS detection and full functionality.")
 
 
+EXPORT_FORMATS = {"csv": ["csv"], "json": ["json"], "jsonl": ["jsonl"], "jsonl.zst": ["jsonl.zst"],
+                  "parquet": ["parquet"], "both": ["csv", "json"]}
+
+
+def upfront_export_formats(args):
+    """Export formats when saving needs no prompt (so files can be written during discovery), else None"""
+    if args.save == "no":
+        return None
+    if platform.system() == "Windows" and args.save != "yes":
+        return None
+    return EXPORT_FORMATS[args.format or "both"]
+
+
 def handle_export(assets, feature, timestamp, args):
     """Handle saving results across platforms"""
     if not assets:
@@ -91,12 +112,7 @@ def handle_export(assets, feature, timestamp, args):
             fmt = "both"
 
         if choice in ["yes", "y"]:
-            if fmt == "csv":
-                Exporter.save_results(assets, ["csv"], feature, timestamp)
-            elif fmt == "json":
-                Exporter.save_results(assets, ["json"], feature, timestamp)
-            else:
-                Exporter.save_results(assets, ["csv", "json"], feature, timestamp)
+            Exporter.save_results(assets, EXPORT_FORMATS[fmt], feature, timestamp)
         else:
             print("[+] Results not saved.")
         return
@@ -108,12 +124,7 @@ def handle_export(assets, feature, timestamp, args):
             return
         elif args.save == "yes":
             fmt = args.format if args.format else "both"
-            if fmt == "csv":
-                Exporter.save_results(assets, ["csv"], feature, timestamp)
-            elif fmt == "json":
-                Exporter.save_results(assets, ["json"], feature, timestamp)
-            else:
-                Exporter.save_results(assets, ["csv", "json"], feature, timestamp)
+            Exporter.save_results(assets, EXPORT_FORMATS[fmt], feature, timestamp)
             return
 
         # Interactive + timeout
@@ -155,16 +166,242 @@ def handle_export(assets, feature, timestamp, args):
         choice = buffer.strip().lower()
         if choice in ["yes", "y"]:
             fmt = args.format if args.format else "both"
-            if fmt == "csv":
-                Exporter.save_results(assets, ["csv"], feature, timestamp)
-            elif fmt == "json":
-                Exporter.save_results(assets, ["json"], feature, timestamp)
-            else:
-                Exporter.save_results(assets, ["csv", "json"], feature, timestamp)
+            Exporter.save_results(assets, EXPORT_FORMATS[fmt], feature, timestamp)
         else:
             print("[+] Results not saved.")
 
 
+QUERY_FILTERS = ("ip", "mac", "hostname", "risk", "tag", "port", "since")
+
+
+def run_query(filters, db_path=None):
+    """Answer --query key=value lookups from the SQLite inventory"""
+    criteria = {}
+    for item in filters:
+        key, sep, value = item.partition("=")
+        key = key.strip().lower()
+        if not sep or key not in QUERY_FILTERS:
+            print(f"[!] Invalid query filter '{item}'. Use key=value with key in: {', '.join(QUERY_FILTERS)}")
+            sys.exit(1)
+        criteria[key] = value.strip()
+    try:
+        if "since" in criteria:
+            criteria["since"] = parse_since(criteria["since"])
+        if "port" in criteria:
+            criteria["port"] = parse_port(criteria["port"])
+    except ValueError as e:
+        print(f"[!] Invalid query filter: {e}")
+        sys.exit(1)
+
+    store = InventoryStore(db_path)
+    try:
+        start = time.time()
+        rows = store.query(**criteria)
+        elapsed = (time.time() - start) * 1000
+        if not rows:
+            print(f"[!] No matching assets in {store.path}")
+            return
+        headers = ["IP", "MAC", "Hostname", "OS", "Tag", "Risk", "Ports", "FirstSeen", "LastSeen"]
+        keys = ["ip", "mac", "hostname", "os", "tag", "risk", "ports", "first_seen", "last_seen"]
+        if "port" in criteria:
+            headers.append(f"Port {criteria['port']} FirstSeen")
+            keys.append("port_first_seen")
+        print(tabulate([[row.get(k) or "-" for k in keys] for row in rows], headers=headers, tablefmt="grid"))
+        print(f"[+] {len(rows)} assets matched in {elapsed:.1f} ms")
+
+        if len(rows) == 1:
+            history = store.history(rows[0]["id"])
+            print("\nScan history")
+            print(tabulate([list(h.values()) for h in history], headers=[k for k in history[0]], tablefmt="grid"))
+    finally:
+        store.close()
+
+
+def run_schedule(args):
+    """Run the --schedule file's scan jobs until interrupted, exporting every run"""
+    from discovr.scheduler import Scheduler
+    try:
+        scheduler = Scheduler.load(args.schedule, max_concurrent=args.schedule_concurrency,
+                                   formats=EXPORT_FORMATS[args.format] if args.format else None,
+                                   inventory=args.inventory)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"[!] Invalid schedule {args.schedule}: {e}")
+        sys.exit(1)
+    Logger.setup("schedule")
+    scheduler.run()
+    scheduler.print_summary()
+
+
+def run_diff(old, new, timestamp, label=None):
+    """Print what changed between two scans and save every difference as JSON Lines"""
+    try:
+        report = diff_reports(old, new)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"[!] Diff failed: {e}")
+        return None
+
+    total = len(report.new) + len(report.removed) + len(report.changed)
+    print("\n" + "-" * 70)
+    print(f"[+] Diff {old} -> {label or new}")
+    print(f"[+] {len(report.new)} new, {len(report.removed)} removed, {len(report.changed)} changed, "
+          f"{report.unchanged} unchanged ({report.old_count} -> {report.new_count} assets, {report.elapsed:.2f}s)")
+    if report.ports_opened:
+        print(f"- Ports opened on {report.ports_opened} assets")
+    if report.risk_escalations:
+        print(f"- Risk escalated on {report.risk_escalations} assets")
+    print("-" * 70)
+    if not total:
+        return report
+
+    limit = Reporter.max_rows or total
+    rows = []
+    for record in report.records():
+        if len(rows) >= limit:
+            break
+        rows.append([record["Change"], record["Key"], DiffReport.describe(record.get("Fields", {}))])
+    print(tabulate(rows, headers=["Change", "Asset", "Details"], tablefmt="grid"))
+    if total > len(rows):
+        print(f"[!] {total - len(rows)} more differences not shown; see the diff report")
+
+    sink = JSONLSink(Exporter.output_path("jsonl", "diff", timestamp))
+    try:
+        for record in report.records():
+            sink.write(record)
+    finally:
+        sink.close()
+    return report
+
+
+def diff_against(target, assets, feature, timestamp):
+    """--diff-against: compare this scan with the last report of the same feature, or with a given report"""
+    old = previous_report(feature, timestamp) if target == "last" else target
+    if old is None:
+        print(f"[!] No earlier {feature} report to diff against")
+        return
+    if assets:
+        new, label = assets, "this scan"
+    else:
+        # Streamed straight to the export files: read the report this run just wrote
+        current = [path for ts, path in find_reports(feature) if ts == timestamp]
+        if not current:
+            print("[!] Nothing to diff: the scan was neither kept in memory nor saved")
+            return
+        new, label = current[0], current[0]
+    run_diff(old, new, timestamp, label)
+
+
+def stream_results(source, context, args, feature, timestamp, cloud=False):
+    """
+    Enrich and print assets as discovery yields them. When saving needs no prompt, export files are
+    written during discovery as well; assets are only kept in memory if something still needs them.
+    :return: (collected assets, whether the export was already written)
+    """
+    formats = upfront_export_formats(args)
+    sinks = Exporter.open_sinks(formats, feature, timestamp) if formats else []
+    azure_csv = bool(formats) and "csv" in formats and feature == "cloud"
+    collector = None
+    if not formats or azure_csv or args.inventory is not None:
+        collector = CollectSink()
+        sinks.append(collector)
+
+    # Rows are printed as they arrive, up to --max-rows; "top" keeps a bounded heap for the end
+    console = top = None
+    if args.report == "top":
+        top = TopSink(args.top)
+        sinks.append(top)
+    elif args.report != "summary":
+        console = ConsoleStage(cloud=cloud, max_rows=args.max_rows or None)
+
+    summary = run_pipeline(source, sinks=sinks, console=console)
+    if top:
+        print(f"\nTop {len(top.assets())} {context} by risk")
+        ConsoleStage(cloud=cloud).write_all(top.assets())
+    summary.print(context)
+    assets = collector.assets if collector else []
+    if azure_csv:
+        Exporter.save_azure_csv(assets, timestamp)
+    return assets, bool(formats)
+
+
+COMBINABLE_MODULES = ("network", "cloud", "ad", "passive")
+
+
+def selected_modules(args):
+    """Discovery modules requested on the command line, in COMBINABLE_MODULES order"""
+    chosen = {"network": args.scan_network or args.autoipaddr, "cloud": args.cloud,
+              "ad": args.ad, "passive": args.passive}
+    return [name for name in COMBINABLE_MODULES if chosen[name]]
+
+
+def discovery_jobs(args, modules):
+    """Build the DiscoveryJobs of a combined run (exits on missing options, like the single-mode runs)"""
+    jobs = []
+    isolated = set(args.processes or ())
+    for module in modules:
+        if module == "network":
+            network = detect_local_subnet() if args.autoipaddr else args.scan_network
+            print(f"[+] Network: scanning {network} with {args.parallel} parallel workers")
+            job = DiscoveryJob("network", "network", (network, args.ports, args.parallel))
+        elif module == "cloud":
+            if args.cloud == "aws":
+                print("[!] AWS discovery not yet implemented")
+                continue
+            if args.cloud == "gcp" and not (args.project and args.zone):
+                print("[!] GCP requires --project and --zone")
+                sys.exit(1)
+            kwargs = {"subscription": args.subscription} if args.cloud == "azure" else \
+                {"project": args.project, "zone": args.zone}
+            print(f"[+] Cloud: discovering {args.cloud} assets")
+            job = DiscoveryJob(args.cloud, "cloud", (args.cloud,), kwargs)
+        elif module == "ad":
+            if not (args.domain and args.username and args.password):
+                print("[!] AD discovery requires --domain, --username, --password")
+                sys.exit(1)
+            print(f"[+] Active Directory: discovering assets in {args.domain}")
+            kwargs = {"page_size": args.page_size,
+                      "resolver": DNSResolver(workers=args.dns_workers, timeout=args.dns_timeout,
+                                              cache_file=DNSResolver.default_cache_file() if args.dns_cache else None)}
+            job = DiscoveryJob("ad", "ad", (args.domain, args.username, args.password), kwargs)
+            if args.ad_incremental:
+                scanner = job.create()
+                job = DiscoveryJob("ad", "ad_sync", (scanner,), {"full_sync_interval": args.ad_full_sync_hours * 3600},
+                                   method="run")
+        else:
+            if not args.iface:
+                print("[!] Passive discovery in a combined run requires --iface")
+                sys.exit(1)
+            print(f"[+] Passive: listening on {args.iface} for {args.timeout} seconds")
+            job = DiscoveryJob("passive", "passive", kwargs={"iface": args.iface, "timeout": args.timeout})
+        job.process = job.plugin in isolated or job.name in isolated
+        jobs.append(job)
+    return jobs
+
+
+def run_combined(jobs, args, feature, timestamp):
+    """
+    Run the selected modules concurrently. Streamed: assets go through one enrichment/export pipeline
+    as they arrive, each with its Sources. Otherwise the modules' assets are correlated first.
+    :return: (assets, whether the export was already written)
+    """
+    orchestrator = Orchestrator(jobs)
+    assets, exported = [], False
+    try:
+        if args.stream:
+            def source():
+                for name, asset in orchestrator.iter_assets():
+                    asset["Sources"] = [name]
+                    yield asset
+            assets, exported = stream_results(source(), "assets", args, feature, timestamp)
+            orchestrator.print_summary()
+        else:
+            assets = orchestrator.run()
+            orchestrator.print_summary()
+            Reporter.print_results(assets, len(assets), "correlated assets")
+    except KeyboardInterrupt:
+        print("\n[+] Stopping combined discovery...")
+    return assets, exported
+
+
 def main():
     parser = argparse.ArgumentParser(description="Discovr - Asset Discovery Tool")
 
@@ -185,58 +422,176 @@ def main():
     parser.add_argument("--domain", help="AD domain")
     parser.add_argument("--username", help="AD username")
     parser.add_argument("--password", help="AD password")
+    parser.add_argument("--page-size", type=int, default=1000, help="AD LDAP page size (default=1000)")
+    parser.add_argument("--dns-workers", type=int, default=32, help="Concurrent DNS lookups for AD computers")
+    parser.add_argument("--dns-timeout", type=float, default=2.0, help="Per-lookup DNS timeout (seconds)")
+    parser.add_argument("--dns-cache", action="store_true", help="Persist resolved AD hostnames between runs")
+    parser.add_argument("--ad-incremental", action="store_true", help="Only fetch AD objects changed since the last sync")
+    parser.add_argument("--ad-full-sync-hours", type=float, default=24, help="Hours between full AD reconciles (default=24)")
 
     # Passive
     parser.add_argument("--passive", action="store_true", help="Passive discovery")
     parser.add_argument("--iface", help="Network interface")
     parser.add_argument("--timeout", type=int, default=180, help="Passive timeout (seconds)")
 
+    # Combined runs (two or more of --scan-network/--autoipaddr, --cloud, --ad, --passive)
+    parser.add_argument("--processes", nargs="+", metavar="MODULE",
+                        choices=["network", "cloud", "azure", "gcp", "ad", "passive"],
+                        help="In a combined run, run these modules in worker processes instead of threads")
+
+    # Scan service
+    parser.add_argument("--serve", nargs="?", const="127.0.0.1:8080", metavar="HOST:PORT",
+                        help="Run as a long-lived REST scan service (default 127.0.0.1:8080)")
+    parser.add_argument("--serve-workers", type=int, default=4, help="Scan jobs the service runs at once (default=4)")
+    parser.add_argument("--serve-queue", type=int, default=100, help="Jobs that may wait for a worker (default=100)")
+    parser.add_argument("--serve-cache", type=int, default=300,
+                        help="Seconds a finished scan answers identical requests (default=300, 0 = off)")
+    parser.add_argument("--serve-token", metavar="TOKEN",
+                        help="Bearer token clients must send (or DISCOVR_SERVE_TOKEN); required off loopback")
+
+    # Scheduler
+    parser.add_argument("--schedule", metavar="FILE",
+                        help="Run the scan jobs of a JSON schedule file on their intervals until interrupted")
+    parser.add_argument("--schedule-concurrency", type=int, metavar="N",
+                        help="Scheduled scans run at once (overrides the file's max_concurrent)")
+
+    # Correlation
+    parser.add_argument("--correlate", nargs="+", metavar="REPORT",
+                        help="Merge exported JSON reports (path or source=path) into unified assets")
+
+    # Inventory
+    parser.add_argument("--inventory", nargs="?", const="", metavar="DB",
+                        help="Record the scan in the SQLite inventory (default: discovr_reports/inventory.db)")
+    parser.add_argument("--query", nargs="+", metavar="FILTER",
+                        help="Query the inventory: ip=, mac=, hostname=, risk=, tag=, port=, since= (e.g. 7d)")
+
+    # Diff
+    parser.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"),
+                        help="Report new, removed and changed assets between two exported reports")
+    parser.add_argument("--diff-against", metavar="REPORT",
+                        help="After the scan, diff it against \"last\" (previous report of the same scan) or a report")
+
+    # Enrichment
+    parser.add_argument("--tag-rules", help="JSON file with custom tag rules (default: bundled rules)")
+
+    # Output
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream assets through tagging, risk and console output as they are discovered")
+    parser.add_argument("--report", choices=Reporter.MODES, default="full",
+                        help="Console report: full tables, summary counters, top N by risk, or capped rows (table)")
+    parser.add_argument("--top", type=int, default=20, help="Assets listed by --report top (default=20)")
+    parser.add_argument("--log-json", action="store_true", help="Write the log file as JSON Lines")
+    parser.add_argument("--log-rate", type=int, default=20,
+                        help="Per-asset console log lines per second; the rest are summarized (0 = none)")
+    parser.add_argument("--max-rows", type=int, default=1000,
+                        help="Hard cap on console rows; larger results are only in the export files (0 = no cap)")
+
     # Export
     parser.add_argument("--save", choices=["yes", "no"], help="Auto-save results")
-    parser.add_argument("--format", choices=["csv", "json", "both"], help="Export format")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile each phase; writes .pstats and collapsed-stack files next to the logs")
+    parser.add_argument("--profile-top", type=int, default=10, help="Hot functions listed per phase (default=10)")
+    parser.add_argument("--metrics-dir", metavar="DIR",
+                        help="Also write the run's Prometheus metrics here (node_exporter textfile collector directory)")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), help="Export format")
 
     args = parser.parse_args()
+    Reporter.configure(mode=args.report, top=args.top, max_rows=args.max_rows)
+    Logger.configure(json_logs=args.log_json, console_rate=args.log_rate)
+    run_start = time.perf_counter()
+
+    if args.query:
+        run_query(args.query, args.inventory or None)
+        return
+
+    if args.serve is not None:
+        from discovr.serve import serve
+        Logger.setup("serve")
+        try:
+            serve(args.serve, workers=args.serve_workers, max_queue=args.serve_queue, cache_ttl=args.serve_cache,
+                  token=args.serve_token or os.environ.get("DISCOVR_SERVE_TOKEN"))
+        except ValueError as e:
+            print(f"[!] {e}")
+            sys.exit(1)
+        return
+
+    if args.schedule:
+        run_schedule(args)
+        return
+
+    if args.diff:
+        _, timestamp = Logger.setup("diff")
+        run_diff(*args.diff, timestamp)
+        return
 
     assets, feature, timestamp = [], None, None
+    exported = False
+    if args.profile:
+        profiling.enable()
+    # Everything until export is the discovery phase, minus the tag/risk/report phases nested in it
+    discovery = contextlib.ExitStack()
+    discovery.enter_context(profiling.phase("discovery"))
 
     try:
-        if args.autoipaddr:
+        if args.tag_rules:
+            Tagger.load_rules(args.tag_rules)
+
+        modules = selected_modules(args)
+        if len(modules) > 1:
+            feature = "combined"
+            log_file, timestamp = Logger.setup(feature)
+            print(f"[+] Running {', '.join(modules)} discovery concurrently")
+            assets, exported = run_combined(discovery_jobs(args, modules), args, feature, timestamp)
+
+        elif args.autoipaddr:
             feature = "network"
             log_file, timestamp = Logger.setup(feature)
             network = detect_local_subnet()
             print(f"[+] Auto-detected local subnet: {network}")
             start = time.time()
-            scanner = NetworkDiscovery(network, args.ports, args.parallel)
-            assets, total_hosts, _ = scanner.run()
-            print(f"[+] Total execution time: {time.time() - start:.2f} seconds")
-            Reporter.print_results(assets, total_hosts, "active assets")
+            scanner = plugins.load("network")(network, args.ports, args.parallel)
+            if args.stream:
+                assets, exported = stream_results(scanner.iter_assets(), "active assets", args, feature, timestamp)
+                print(f"[+] Total execution time: {time.time() - start:.2f} seconds")
+            else:
+                assets, total_hosts, _ = scanner.run()
+                print(f"[+] Total execution time: {time.time() - start:.2f} seconds")
+                Reporter.print_results(assets, total_hosts, "active assets")
 
         elif args.scan_network:
             feature = "network"
             log_file, timestamp = Logger.setup(feature)
             start = time.time()
-            scanner = NetworkDiscovery(args.scan_network, args.ports, args.parallel)
-            assets, total_hosts, _ = scanner.run()
-            print(f"[+] Total execution time: {time.time() - start:.2f} seconds")
-            Reporter.print_results(assets, total_hosts, "active assets")
+            scanner = plugins.load("network")(args.scan_network, args.ports, args.parallel)
+            if args.stream:
+                assets, exported = stream_results(scanner.iter_assets(), "active assets", args, feature, timestamp)
+                print(f"[+] Total execution time: {time.time() - start:.2f} seconds")
+            else:
+                assets, total_hosts, _ = scanner.run()
+                print(f"[+] Total execution time: {time.time() - start:.2f} seconds")
+                Reporter.print_results(assets, total_hosts, "active assets")
 
         elif args.cloud:
             feature = "cloud"
             log_file, timestamp = Logger.setup(feature)
             if args.cloud == "azure":
                 print(f"[+] Discovering Azure assets in subscription {args.subscription}")
-                scanner = CloudDiscovery("azure", subscription=args.subscription)
-                assets = scanner.run()
+                scanner = plugins.load("cloud")("azure", subscription=args.subscription)
             elif args.cloud == "gcp":
                 if not args.project or not args.zone:
                     print("[!] GCP requires --project and --zone")
                     sys.exit(1)
                 print(f"[+] Discovering GCP assets in project {args.project}, zone {args.zone}")
-                scanner = CloudDiscovery("gcp", project=args.project, zone=args.zone)
-                assets = scanner.run()
+                scanner = plugins.load("cloud")("gcp", project=args.project, zone=args.zone)
             elif args.cloud == "aws":
                 print("[!] AWS discovery not yet implemented")
-            Reporter.print_results(assets, len(assets), "cloud assets")
+                scanner = None
+
+            if scanner and args.stream:
+                assets, exported = stream_results(scanner.iter_assets(), "cloud assets", args, feature, timestamp, cloud=True)
+            else:
+                assets = scanner.run() if scanner else []
+                Reporter.print_results(assets, len(assets), "cloud assets")
 
         elif args.ad:
             feature = "ad"
@@ -245,17 +600,43 @@ def main():
                 print("[!] AD discovery requires --domain, --username, --password")
                 sys.exit(1)
             print(f"[+] Discovering Active Directory assets in {args.domain}")
-            scanner = ADDiscovery(args.domain, args.username, args.password)
-            assets = scanner.run()
-            Reporter.print_results(assets, len(assets), "AD assets")
+            resolver = DNSResolver(
+                workers=args.dns_workers,
+                timeout=args.dns_timeout,
+                cache_file=DNSResolver.default_cache_file() if args.dns_cache else None,
+            )
+            scanner = plugins.load("ad")(args.domain, args.username, args.password,
+                                  page_size=args.page_size, resolver=resolver)
+            if args.ad_incremental:
+                sync = plugins.load("ad_sync")(scanner, full_sync_interval=args.ad_full_sync_hours * 3600)
+                assets = sync.run()
+                print(f"[+] AD {sync.changes['mode']} sync: {sync.changes['added']} added, "
+                      f"{sync.changes['updated']} updated, {sync.changes['deleted']} deleted")
+                Reporter.print_results(assets, len(assets), "AD assets")
+            elif args.stream:
+                assets, exported = stream_results(scanner.iter_assets(), "AD assets", args, feature, timestamp)
+            else:
+                assets = scanner.run()
+                Reporter.print_results(assets, len(assets), "AD assets")
 
         elif args.passive:
             feature = "passive"
             log_file, timestamp = Logger.setup(feature)
             print("[+] Running passive discovery")
-            scanner = PassiveDiscovery(iface=args.iface, timeout=args.timeout)
-            assets, total_assets = scanner.run()
-            Reporter.print_results(assets, len(assets), "passive assets")
+            scanner = plugins.load("passive")(iface=args.iface, timeout=args.timeout)
+            if args.stream:
+                assets, exported = stream_results(scanner.iter_assets(), "passive assets", args, feature, timestamp)
+            else:
+                assets, total_assets = scanner.run()
+                Reporter.print_results(assets, len(assets), "passive assets")
+
+        elif args.correlate:
+            feature = "correlated"
+            log_file, timestamp = Logger.setup(feature)
+            start = time.time()
+            assets = correlate_reports(args.correlate)
+            print(f"[+] Correlation time: {time.time() - start:.2f} seconds")
+            Reporter.print_results(assets, len(assets), "correlated assets")
 
         else:
             parser.print_help()
@@ -264,9 +645,20 @@ def main():
     except Exception as e:
         print(f"[!] Fatal error: {e}")
         sys.exit(1)
+    finally:
+        discovery.close()
 
     if feature and timestamp:
-        handle_export(assets, feature, timestamp, args)
+        if args.inventory is not None and assets:
+            Exporter.save_inventory(assets, feature, timestamp, args.inventory or None)
+        if not exported:
+            handle_export(assets, feature, timestamp, args)
+        if args.diff_against:
+            diff_against(args.diff_against, assets, feature, timestamp)
+        Exporter.save_metrics(feature, timestamp, time.perf_counter() - run_start, args.metrics_dir)
+        if args.profile:
+            profile_dir = Path.home() / "Documents" / "discovr_reports" / "logs" / f"profile_{feature}_{timestamp}"
+            profiling.finish(profile_dir, f"discovr_{feature}", top=args.profile_top)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,5 @@
-from discovr.azure import AzureDiscovery
-from discovr.gcp import GCPDiscovery
-# from discovr.aws import AWSDiscovery  # Placeholder if AWS logic is split into its own module
+from discovr import plugins
+# AWS would be registered as a plugin too once its logic is split into its own module
 
 
 class CloudDiscovery:
@@ -25,17 +24,22 @@ class CloudDiscovery:
         """
         Dispatch to the correct cloud provider discovery.
         """
+        return self._scanner().run()
+
+    def iter_assets(self):
+        """Stream assets from the selected provider as they are collected"""
+        return self._scanner().iter_assets()
+
+    def _scanner(self):
         if self.provider == "azure":
             if not self.subscription:
                 raise Exception("Azure discovery requires --subscription <id>")
-            azure_scanner = AzureDiscovery(self.subscription)
-            return azure_scanner.run()
+            return plugins.load("azure")(self.subscription)
 
         elif self.provider == "gcp":
             if not self.project or not self.zone:
                 raise Exception("GCP discovery requires --project and --zone")
-            gcp_scanner = GCPDiscovery(self.project, self.zone)
-            return gcp_scanner.run()
+            return plugins.load("gcp")(self.project, self.zone)
 
         elif self.provider == "aws":
             # Future expansion: move AWS-specific discovery here
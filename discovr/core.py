@@ -1,209 +1,296 @@
 from pathlib import Path
 import logging
 import csv
-import json
+import time
 from datetime import datetime
 from tabulate import tabulate
+from discovr import logs, profiling
 from discovr.tagger import Tagger
 from discovr.risk import RiskAssessor
+from discovr.aggregate import Aggregation
+from discovr.cache import CLASSIFIER_CACHE, public_view
+from discovr.inventory import InventoryStore
+from discovr.metrics import METRICS
+from discovr.pipeline import Summary, ConsoleStage, TopSink
+from discovr.sinks import CSVSink, JSONArraySink, JSONLSink, ZstdJSONLSink, ParquetSink
 
 
 class Logger:
+    # Set from the CLI through configure()
+    json_logs = False
+    console_rate = 20       # per-asset console lines per second
+
+    @classmethod
+    def configure(cls, json_logs=None, console_rate=None):
+        if json_logs is not None:
+            cls.json_logs = json_logs
+        if console_rate is not None:
+            cls.console_rate = console_rate
+
     @staticmethod
     def setup(feature: str):
+        """
+        Log to a file and the console through a background writer thread (see discovr.logs).
+        :return: (log file, run timestamp)
+        """
         docs_path = Path.home() / "Documents" / "discovr_reports" / "logs"
         docs_path.mkdir(parents=True, exist_ok=True)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = docs_path / f"discovr_{feature}_log_{timestamp}.log"
-
-        logging.basicConfig(
-            filename=str(log_file),
-            level=logging.INFO,
-            format="%(asctime)s [%(levelname)s] %(message)s",
-            force=True,
-        )
-        console = logging.StreamHandler()
-        console.setLevel(logging.INFO)
-        console.setFormatter(logging.Formatter("%(message)s"))
-        logging.getLogger().addHandler(console)
+        suffix = "jsonl" if Logger.json_logs else "log"
+        log_file = docs_path / f"discovr_{feature}_log_{timestamp}.{suffix}"
+        logs.start(log_file, json_logs=Logger.json_logs, console_rate=Logger.console_rate)
 
         print(f"[+] Logs saved at {log_file}")
         return log_file, timestamp
 
 
 class Exporter:
+    SINKS = {"json": JSONArraySink, "jsonl": JSONLSink, "jsonl.zst": ZstdJSONLSink,
+             "csv": CSVSink, "parquet": ParquetSink}
+
+    @staticmethod
+    def output_path(fmt: str, feature: str, timestamp: str):
+        folder = fmt if fmt in ("csv", "parquet") else "json"
+        out_dir = Path.home() / "Documents" / "discovr_reports" / folder
+        out_dir.mkdir(parents=True, exist_ok=True)
+        return out_dir / f"discovr_{feature}_{timestamp}.{fmt}"
+
     @staticmethod
+    def open_sinks(formats, feature: str, timestamp: str):
+        """
+        Open streaming file sinks (write(asset) / close()) for the given formats.
+        Cloud CSVs are left out: the Azure per-type CSVs need the whole scan (see save_azure_csv).
+        """
+        sinks = []
+        for fmt in formats:
+            sink_class = Exporter.SINKS.get(fmt)
+            if sink_class is None or (fmt == "csv" and feature == "cloud"):
+                continue
+            if not sink_class.available:
+                print(f"[!] {sink_class.missing_hint}")
+                continue
+            sinks.append(sink_class(Exporter.output_path(fmt, feature, timestamp)))
+        return sinks
+
+    @staticmethod
+    @profiling.profiled("export")
     def save_results(assets, formats, feature: str, timestamp: str):
         """
-        Save assets in JSON and/or CSV.
+        Save assets in JSON, JSON Lines (optionally zstd), CSV and/or Parquet, written asset by asset.
         Special case: Azure cloud scan exports 4 optimized CSVs inside azure_<timestamp> folder.
         """
-        base_path = Path.home() / "Documents" / "discovr_reports"
-        csv_dir = base_path / "csv"
-        json_dir = base_path / "json"
-        csv_dir.mkdir(parents=True, exist_ok=True)
-        json_dir.mkdir(parents=True, exist_ok=True)
-
-        # JSON Export
-        if "json" in formats:
-            json_file = json_dir / f"discovr_{feature}_{timestamp}.json"
-            with open(json_file, "w", encoding="utf-8") as f:
-                json.dump(assets, f, indent=4, default=str)
-            print(f"[+] JSON saved: {json_file}")
-
-        # CSV Export
-        if "csv" in formats:
-            # Special case: Azure Cloud Scan
-            if feature == "cloud":
-                azure_dir = csv_dir / f"azure_{timestamp}"
-                azure_dir.mkdir(parents=True, exist_ok=True)
-
-                vms = [a for a in assets if a.get("Type") == "VirtualMachine"]
-                vnets = [a for a in assets if a.get("Type") == "VirtualNetwork"]
-                nsgs = [a for a in assets if a.get("Type") == "NetworkSecurityGroup"]
-                rgs = [a for a in assets if a.get("Type") == "ResourceGroup"]
-
-                # VMs CSV
-                vm_file = azure_dir / f"azure_vms_{timestamp}.csv"
-                with open(vm_file, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    writer.writerow([
-                        "ResourceGroup", "Name", "OS", "Size", "PowerState",
-                        "Risk", "OpenPorts", "PrivateIP", "PublicIP",
-                        "NIC", "Subnet", "VNet", "AgentCompatible", "AgentVersion", "Tags"
-                    ])
-                    for vm in vms:
-                        net = vm.get("Networking", {})
-                        tags = vm.get("Tags") or {}
-                        tags_str = ";".join([f"{k}={v}" for k, v in tags.items()]) if isinstance(tags, dict) else ""
-                        writer.writerow([
-                            vm.get("ResourceGroup", ""),
-                            vm.get("Name", ""),
-                            vm.get("OS", ""),
-                            vm.get("Size", ""),
-                            vm.get("PowerState", ""),
-                            vm.get("Risk", ""),
-                            ";".join(vm.get("OpenPorts", [])) if vm.get("OpenPorts") else "",
-                            net.get("PrivateIP", ""),
-                            net.get("PublicIP", ""),
-                            net.get("NIC", ""),
-                            net.get("Subnet", ""),
-                            net.get("VNet", ""),
-                            "Yes" if vm.get("AgentCompatible") else "No",
-                            vm.get("AgentVersion", ""),
-                            tags_str,
-                        ])
-                print(f"[+] Azure VMs CSV saved: {vm_file}")
-
-                # VNets CSV
-                vnet_file = azure_dir / f"azure_vnets_{timestamp}.csv"
-                with open(vnet_file, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["ResourceGroup", "Name", "AddressSpace", "Subnets", "DNS", "Risk"])
-                    for vn in vnets:
-                        writer.writerow([
-                            vn.get("ResourceGroup", ""),
-                            vn.get("Name", ""),
-                            ";".join(vn.get("AddressSpace", [])),
-                            ";".join(vn.get("Subnets", [])),
-                            ";".join(vn.get("DNS", [])) if vn.get("DNS") else "",
-                            vn.get("Risk", "Low"),
-                        ])
-                print(f"[+] Azure VNets CSV saved: {vnet_file}")
-
-                # NSGs CSV
-                nsg_file = azure_dir / f"azure_nsgs_{timestamp}.csv"
-                with open(nsg_file, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["ResourceGroup", "Name", "Risk", "RuleCount", "RuleSummary", "AssociatedSubnets", "AssociatedNICs"])
-                    for n in nsgs:
-                        summary = []
-                        for rule in n.get("SecurityRules", []):
-                            marker = "✅" if rule["Access"].lower() == "allow" else "❌"
-                            summary.append(f"{marker} {rule['Name']}({rule['Ports']})")
-                        writer.writerow([
-                            n.get("ResourceGroup", ""),
-                            n.get("Name", ""),
-                            n.get("Risk", ""),
-                            len(n.get("SecurityRules", [])),
-                            "; ".join(summary),
-                            ";".join(n.get("AssociatedSubnets", [])),
-                            ";".join(n.get("AssociatedNICs", [])),
-                        ])
-                print(f"[+] Azure NSGs CSV saved: {nsg_file}")
-
-                # Summary CSV
-                summary_file = azure_dir / f"azure_summary_{timestamp}.csv"
-                with open(summary_file, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["ResourceGroup", "VMCount", "VMHighRisk", "VNetCount", "NSGCount", "NSGHighRisk"])
-                    for rg in rgs:
-                        rg_name = rg.get("Name", "")
-                        rg_vms = [v for v in vms if v.get("ResourceGroup") == rg_name]
-                        rg_vnets = [v for v in vnets if v.get("ResourceGroup") == rg_name]
-                        rg_nsgs = [n for n in nsgs if n.get("ResourceGroup") == rg_name]
-                        high_vms = sum(1 for v in rg_vms if v.get("Risk") in ["High", "Critical"])
-                        high_nsgs = sum(1 for n in rg_nsgs if n.get("Risk") in ["High", "Critical"])
-                        writer.writerow([
-                            rg_name, len(rg_vms), high_vms, len(rg_vnets), len(rg_nsgs), high_nsgs
-                        ])
-                print(f"[+] Azure Summary CSV saved: {summary_file}")
-
-            else:
-                # Default flat CSV for other scans
-                csv_file = csv_dir / f"discovr_{feature}_{timestamp}.csv"
-
-                def flatten_dict(d, parent_key="", sep="."):
-                    items = []
-                    for k, v in d.items():
-                        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-                        if isinstance(v, dict):
-                            items.extend(flatten_dict(v, new_key, sep=sep).items())
-                        elif isinstance(v, list):
-                            items.append((new_key, ";".join(map(str, v))))
-                        else:
-                            items.append((new_key, v))
-                    return dict(items)
-
-                flat_assets = [flatten_dict(a) for a in assets]
-
-                if flat_assets:
-                    headers = sorted({key for a in flat_assets for key in a.keys()})
-                    with open(csv_file, "w", newline="", encoding="utf-8") as f:
-                        writer = csv.DictWriter(f, fieldnames=headers)
-                        writer.writeheader()
-                        for a in flat_assets:
-                            writer.writerow(a)
-                    print(f"[+] CSV saved: {csv_file}")
+        sinks = Exporter.open_sinks(formats, feature, timestamp)
+        try:
+            for asset in assets:
+                for sink in sinks:
+                    sink.write(asset)
+        finally:
+            for sink in sinks:
+                sink.close()
+
+        if "csv" in formats and feature == "cloud":
+            Exporter.save_azure_csv(assets, timestamp)
+
+    @staticmethod
+    def save_azure_csv(assets, timestamp: str):
+        """Azure scan: VMs, VNets, NSGs and per-RG summary CSVs inside an azure_<timestamp> folder"""
+        assets = [public_view(a) for a in assets]
+        csv_dir = Path.home() / "Documents" / "discovr_reports" / "csv"
+        azure_dir = csv_dir / f"azure_{timestamp}"
+        azure_dir.mkdir(parents=True, exist_ok=True)
+
+        aggregation = Aggregation(assets)
+        vms = aggregation.by_type["VirtualMachine"]
+        vnets = aggregation.by_type["VirtualNetwork"]
+        nsgs = aggregation.by_type["NetworkSecurityGroup"]
+
+        # VMs CSV
+        vm_file = azure_dir / f"azure_vms_{timestamp}.csv"
+        with open(vm_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow([
+                "ResourceGroup", "Name", "OS", "Size", "PowerState",
+                "Risk", "OpenPorts", "PrivateIP", "PublicIP",
+                "NIC", "Subnet", "VNet", "AgentCompatible", "AgentVersion", "Tags"
+            ])
+            for vm in vms:
+                net = vm.get("Networking", {})
+                tags = vm.get("Tags") or {}
+                tags_str = ";".join([f"{k}={v}" for k, v in tags.items()]) if isinstance(tags, dict) else ""
+                writer.writerow([
+                    vm.get("ResourceGroup", ""),
+                    vm.get("Name", ""),
+                    vm.get("OS", ""),
+                    vm.get("Size", ""),
+                    vm.get("PowerState", ""),
+                    vm.get("Risk", ""),
+                    ";".join(vm.get("OpenPorts", [])) if vm.get("OpenPorts") else "",
+                    net.get("PrivateIP", ""),
+                    net.get("PublicIP", ""),
+                    net.get("NIC", ""),
+                    net.get("Subnet", ""),
+                    net.get("VNet", ""),
+                    "Yes" if vm.get("AgentCompatible") else "No",
+                    vm.get("AgentVersion", ""),
+                    tags_str,
+                ])
+        print(f"[+] Azure VMs CSV saved: {vm_file}")
+
+        # VNets CSV
+        vnet_file = azure_dir / f"azure_vnets_{timestamp}.csv"
+        with open(vnet_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["ResourceGroup", "Name", "AddressSpace", "Subnets", "DNS", "Risk"])
+            for vn in vnets:
+                writer.writerow([
+                    vn.get("ResourceGroup", ""),
+                    vn.get("Name", ""),
+                    ";".join(vn.get("AddressSpace", [])),
+                    ";".join(vn.get("Subnets", [])),
+                    ";".join(vn.get("DNS", [])) if vn.get("DNS") else "",
+                    vn.get("Risk", "Low"),
+                ])
+        print(f"[+] Azure VNets CSV saved: {vnet_file}")
+
+        # NSGs CSV
+        nsg_file = azure_dir / f"azure_nsgs_{timestamp}.csv"
+        with open(nsg_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["ResourceGroup", "Name", "Risk", "RuleCount", "RuleSummary", "AssociatedSubnets", "AssociatedNICs"])
+            for n in nsgs:
+                summary = []
+                for rule in n.get("SecurityRules", []):
+                    marker = "✅" if rule["Access"].lower() == "allow" else "❌"
+                    summary.append(f"{marker} {rule['Name']}({rule['Ports']})")
+                writer.writerow([
+                    n.get("ResourceGroup", ""),
+                    n.get("Name", ""),
+                    n.get("Risk", ""),
+                    len(n.get("SecurityRules", [])),
+                    "; ".join(summary),
+                    ";".join(n.get("AssociatedSubnets", [])),
+                    ";".join(n.get("AssociatedNICs", [])),
+                ])
+        print(f"[+] Azure NSGs CSV saved: {nsg_file}")
+
+        # Summary CSV
+        summary_file = azure_dir / f"azure_summary_{timestamp}.csv"
+        with open(summary_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["ResourceGroup", "VMCount", "VMHighRisk", "VNetCount", "NSGCount", "NSGHighRisk"])
+            for rg in aggregation.resource_groups():
+                writer.writerow([
+                    rg.name or "", len(rg.vms), rg.high_risk_vms, len(rg.vnets), len(rg.nsgs), rg.high_risk_nsgs
+                ])
+        print(f"[+] Azure Summary CSV saved: {summary_file}")
+
+    @staticmethod
+    def save_metrics(feature: str, timestamp: str, run_seconds: float, textfile_dir=None):
+        """
+        Write the run's metrics as JSON (one file per run) and as a Prometheus textfile.
+        :param textfile_dir: node_exporter textfile collector directory (default: discovr_reports/metrics)
+        """
+        METRICS.set("discovr_run_seconds", round(run_seconds, 3))
+        out_dir = Path.home() / "Documents" / "discovr_reports" / "metrics"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        json_path = out_dir / f"discovr_{feature}_metrics_{timestamp}.json"
+        METRICS.write_json(json_path, feature=feature, timestamp=timestamp)
+
+        prom_dir = Path(textfile_dir) if textfile_dir else out_dir
+        prom_dir.mkdir(parents=True, exist_ok=True)
+        prom_path = prom_dir / f"discovr_{feature}.prom"
+        METRICS.write_prometheus(prom_path, feature=feature)
+        print(f"[+] Metrics saved: {json_path} and {prom_path}")
+        return json_path, prom_path
+
+    @staticmethod
+    @profiling.profiled("export")
+    def save_inventory(assets, feature: str, timestamp: str, path=None):
+        """Record the scan in the SQLite inventory (batched upserts + history rows)"""
+        store = InventoryStore(path)
+        try:
+            scan_id = store.record_scan(assets, feature, timestamp)
+        finally:
+            store.close()
+        print(f"[+] Inventory updated: {store.path} (scan {scan_id})")
+        return scan_id
 
 
 class Reporter:
+    # Console report modes: full grid tables, summary counters only, top N by risk, capped fixed-width rows
+    MODES = ("full", "summary", "top", "table")
+    # Set from the CLI through configure()
+    mode = "full"
+    top = 20
+    max_rows = 1000     # hard cap on rendered rows; 0 disables it
+
+    @classmethod
+    def configure(cls, mode=None, top=None, max_rows=None):
+        if mode is not None:
+            cls.mode = mode
+        if top is not None:
+            cls.top = top
+        if max_rows is not None:
+            cls.max_rows = max_rows
+
     @staticmethod
+    @profiling.profiled("report")
     def print_results(assets, total_hosts, context="assets"):
         if not assets:
             print("\n[!] No assets discovered.")
             return
 
-        tagged_assets = Tagger.tag_assets(assets)
-        risked_assets = RiskAssessor.add_risks(tagged_assets)
+        # Assets already enriched upstream (CLI, tests) are skipped by both stages
+        start = time.perf_counter()
+        with profiling.phase("tag"):
+            tagged_assets = Tagger.tag_assets(assets)
+        tagged = time.perf_counter()
+        with profiling.phase("risk"):
+            risked_assets = RiskAssessor.add_risks(tagged_assets)
+        METRICS.inc("discovr_stage_seconds_total", tagged - start, stage="tag")
+        METRICS.inc("discovr_stage_seconds_total", time.perf_counter() - tagged, stage="risk")
+        METRICS.inc("discovr_assets_total", len(risked_assets))
+        stats = CLASSIFIER_CACHE.stats()
+        logging.info(
+            f"[+] Classification cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate, {stats['size']}/{stats['maxsize']} entries)"
+        )
+
+        mode, max_rows = Reporter.mode, Reporter.max_rows or None
+        if mode == "full" and max_rows and len(risked_assets) > max_rows:
+            # Grid tables size every column over the whole result set; fall back to a bounded view
+            print(f"\n[!] {len(risked_assets)} assets exceed the {max_rows} row console limit; "
+                  f"showing the top {Reporter.top} by risk (all assets are in the export files)")
+            mode = "top"
 
-        # Normalize RG names
-        for a in risked_assets:
-            if a.get("ResourceGroup"):
-                a["ResourceGroup"] = a["ResourceGroup"].lower()
+        if mode == "full":
+            # One pass: normalize RG names and bucket assets per RG and type
+            aggregation = Aggregation(risked_assets, normalize=True)
+            for bucket in aggregation.groups.values():
+                Reporter._print_resource_group(bucket)
+            return
 
-        groups = {}
-        for a in risked_assets:
-            rg = a.get("ResourceGroup", a.get("Name", "unknownrg")).lower()
-            groups.setdefault(rg, []).append(a)
+        summary = Summary()
+        top = TopSink(min(Reporter.top, max_rows or Reporter.top)) if mode == "top" else None
+        for asset in risked_assets:
+            summary.update(asset)
+            if top:
+                top.write(asset)
 
-        for rg, items in groups.items():
-            Reporter._print_resource_group(rg, items)
+        cloud = any(asset.get("Type") for asset in risked_assets[:1])
+        if mode == "top":
+            print(f"\nTop {len(top.assets())} {context} by risk")
+            ConsoleStage(cloud=cloud).write_all(top.assets())
+        elif mode == "table":
+            console = ConsoleStage(cloud=cloud, max_rows=max_rows)
+            console.write_all(risked_assets)
+            console.close()
+        summary.print(context)
 
     @staticmethod
-    def _print_resource_group(rg_name, items):
-        rg_info = next((i for i in items if i.get("Type") == "ResourceGroup"), None)
+    def _print_resource_group(bucket):
+        rg_name, rg_info = bucket.key, bucket.info
         header_line = "═" * 70
         if rg_info:
             print(f"\n{header_line}\nResource Group: {rg_info.get('Name')} "
@@ -211,7 +298,7 @@ class Reporter:
         else:
             print(f"\n{header_line}\nResource Group: {rg_name}\n{header_line}")
 
-        vms = [i for i in items if i.get("Type") == "VirtualMachine"]
+        vms = bucket.vms
         if vms:
             print("\nAssociated Virtual Machines")
             print(tabulate(
@@ -238,7 +325,7 @@ class Reporter:
                 tablefmt="grid"
             ))
 
-        vnets = [i for i in items if i.get("Type") == "VirtualNetwork"]
+        vnets = bucket.vnets
         if vnets:
             print("\nAssociated Virtual Networks")
             print(tabulate(
@@ -256,7 +343,7 @@ class Reporter:
                 tablefmt="grid"
             ))
 
-        nsgs = [i for i in items if i.get("Type") == "NetworkSecurityGroup"]
+        nsgs = bucket.nsgs
         if nsgs:
             print("\nAssociated Network Security Groups")
             for n in nsgs:
@@ -281,14 +368,9 @@ class Reporter:
                 if n.get("AssociatedNICs"):
                     print(f"Associated NICs: {', '.join(n['AssociatedNICs'])}")
 
-        vm_count = len(vms)
-        vnet_count = len(vnets)
-        nsg_count = len(nsgs)
-        high_risk_vms = sum(1 for vm in vms if vm.get("Risk") in ["High", "Critical"])
-        high_risk_nsgs = sum(1 for n in nsgs if n.get("Risk") in ["High", "Critical"])
         print("\n" + "-" * 70)
         print(f"Summary for Resource Group '{rg_name}':")
-        print(f"- {vm_count} Virtual Machines ({high_risk_vms} High/Critical Risk)")
-        print(f"- {vnet_count} Virtual Networks")
-        print(f"- {nsg_count} Network Security Groups ({high_risk_nsgs} High/Critical Risk)")
+        print(f"- {len(vms)} Virtual Machines ({bucket.high_risk_vms} High/Critical Risk)")
+        print(f"- {len(vnets)} Virtual Networks")
+        print(f"- {len(nsgs)} Network Security Groups ({bucket.high_risk_nsgs} High/Critical Risk)")
         print("-" * 70)
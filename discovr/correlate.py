@@ -0,0 +1,308 @@
+import json
+import logging
+import re
+import socket
+from pathlib import Path
+
+# Values that carry no information and never win a merge or link two records
+PLACEHOLDERS = {"", "n/a", "none", "unknown", "null", "0.0.0.0"}
+
+# Field precedence when sources disagree (first informative value wins)
+SOURCE_PRIORITY = ("ad", "cloud", "azure", "gcp", "network", "passive")
+
+# Record types that describe infrastructure rather than a machine; never merged
+NON_HOST_TYPES = {"resourcegroup", "virtualnetwork", "networksecuritygroup", "nsg"}
+
+MAC_RE = re.compile(r"^(?:[0-9a-f]{2}[:-]){5}[0-9a-f]{2}$")
+REPORT_NAME = re.compile(r"discovr_([a-z]+)_")
+
+_AMBIGUOUS = -1
+SUBSCRIPTION_RE = re.compile(r"/subscriptions/([^/]+)", re.IGNORECASE)
+
+
+def _informative(value):
+    if value is None:
+        return False
+    if value.__class__ is str:
+        return value.strip().lower() not in PLACEHOLDERS
+    if isinstance(value, (list, dict, tuple)):
+        return bool(value)
+    return str(value).strip().lower() not in PLACEHOLDERS
+
+
+def normalize_mac(value):
+    mac = str(value).strip().lower().replace("-", ":")
+    if len(mac) == 12 and ":" not in mac:
+        mac = ":".join(mac[i:i + 2] for i in range(0, 12, 2))
+    return mac if MAC_RE.match(mac) and mac != "00:00:00:00:00:00" else None
+
+
+def _usable_ip(value):
+    """Canonical text of a routable-looking IP address, else None (placeholders, loopback, 0.0.0.0)"""
+    if value.__class__ is not str:
+        return None
+    value = value.strip()
+    family = socket.AF_INET6 if ":" in value else socket.AF_INET
+    try:
+        packed = socket.inet_pton(family, value)
+    except (OSError, ValueError):
+        return None
+    if family == socket.AF_INET:
+        if packed[0] == 127 or packed == b"\0\0\0\0":
+            return None
+    elif packed[:15] == b"\0" * 15:
+        return None     # :: and ::1
+    return socket.inet_ntop(family, packed)
+
+
+def asset_identity(asset):
+    """
+    Identity keys of an asset: IPs, MAC, hostname (FQDN and/or bare short name) and cloud resource ID.
+    Passive placeholder hostnames (MAC-..., DHCP-...) contribute their MAC instead of a name.
+    Cloud NIC addresses (Networking.PrivateIP / PublicIP) are also listed apart: private IPs are only
+    unique within a virtual network, so they come with a (subscription, VNet) scope.
+    :return: dict with "ips" (every address), "private_ips" ({(scope, ip)}), "public_ips", "macs",
+        "fqdn", "short" and "resource_id"
+    """
+    ips, macs, private_ips, public_ips = set(), set(), set(), set()
+    fqdn = short = None
+    resource_id = asset.get("ResourceId")
+    resource_id = str(resource_id).lower() if _informative(resource_id) else None
+
+    ip = _usable_ip(asset.get("IP"))
+    if ip:
+        ips.add(ip)
+    networking = asset.get("Networking")
+    if isinstance(networking, dict):
+        ip = _usable_ip(networking.get("PrivateIP"))
+        if ip:
+            subscription = SUBSCRIPTION_RE.search(resource_id or "")
+            vnet = networking.get("VNet")
+            private_ips.add(((subscription.group(1) if subscription else None,
+                              str(vnet).lower() if _informative(vnet) else None), ip))
+        ip = _usable_ip(networking.get("PublicIP"))
+        if ip:
+            public_ips.add(ip)
+        ips |= {ip for _, ip in private_ips} | public_ips
+
+    if asset.get("MAC"):
+        mac = normalize_mac(asset["MAC"])
+        if mac:
+            macs.add(mac)
+
+    names = [asset.get("Hostname")]
+    if str(asset.get("Type", "")).lower() == "virtualmachine":
+        names.append(asset.get("Name"))
+    for name in names:
+        if not _informative(name):
+            continue
+        name = str(name).strip().rstrip(".").lower()
+        if name.startswith("mac-"):
+            mac = normalize_mac(name[4:])
+            if mac:
+                macs.add(mac)
+            continue
+        if name.startswith("dhcp-"):
+            mac = normalize_mac(name[5:17])      # chaddr is padded to 16 bytes; the MAC is the first 6
+            if mac:
+                macs.add(mac)
+            continue
+        if (name[0].isdigit() or ":" in name) and _usable_ip(name):
+            continue
+        if "." in name:
+            fqdn = fqdn or name
+            short = short or name.split(".", 1)[0]
+        else:
+            short = short or name
+
+    return {
+        "ips": ips,
+        "private_ips": private_ips,
+        "public_ips": public_ips,
+        "macs": macs,
+        "fqdn": fqdn,
+        "short": short,
+        "resource_id": resource_id,
+    }
+
+
+class Correlator:
+    def __init__(self, priority=SOURCE_PRIORITY):
+        """
+        Merge asset records from several discovery sources into unified assets.
+        Records are linked through hash indexes on IP, MAC, FQDN, short hostname and cloud resource ID
+        (union-find, no pairwise comparisons). A bare short name only links to an FQDN when that
+        short name maps to a single FQDN. Records with different resource IDs are never merged; a
+        cloud private IP links to other sources' records only when a single VNet uses it, and a
+        public IP only when a single resource holds it (not a shared NAT or load-balancer address).
+        :param priority: Source order used to pick a field value when sources disagree
+        """
+        self.priority = {source: i for i, source in enumerate(priority)}
+        self.records = []       # (source, asset)
+        self.parent = []
+        self.macs = {}          # record -> MACs derived from it (only records that have any)
+        self.resource_ids = {}  # union-find root -> resource ID of its component (only when it has one)
+        self.private_scopes = {}    # cloud private IP -> its (subscription, VNet) scope, or _AMBIGUOUS
+        self.public_owners = {}     # cloud public IP -> {resource ID (or record) -> record}
+        self.indexes = {"ip": {}, "mac": {}, "fqdn": {}, "resource_id": {}, "short": {}, "fqdn_short": {},
+                        "private_ip": {}}
+
+    # ---- Union-find ----
+    def _find(self, i):
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def _union(self, a, b):
+        ra, rb = self._find(a), self._find(b)
+        if ra == rb:
+            return
+        rid_a, rid_b = self.resource_ids.get(ra), self.resource_ids.get(rb)
+        if rid_a and rid_b and rid_a != rid_b:
+            return      # two distinct cloud resources that share an address or a name
+        root, child = (ra, rb) if ra < rb else (rb, ra)
+        self.parent[child] = root
+        if rid_a or rid_b:
+            self.resource_ids[root] = rid_a or rid_b
+        self.resource_ids.pop(child, None)
+
+    def _link(self, index, key, i):
+        """Link record i with the first record indexed under key (registering i if it is the first)"""
+        first = self.indexes[index].setdefault(key, i)
+        if first != i:
+            self._union(first, i)
+
+    # ---- Input ----
+    def add(self, assets, source):
+        """Index a list (or stream) of assets from one source ("network", "passive", "ad", "azure", ...)"""
+        count = 0
+        for asset in assets:
+            i = len(self.records)
+            self.records.append((source, asset))
+            self.parent.append(i)
+            count += 1
+            if str(asset.get("Type", "")).lower() in NON_HOST_TYPES:
+                continue
+
+            ident = asset_identity(asset)
+            if ident["resource_id"]:
+                self.resource_ids[i] = ident["resource_id"]
+            cloud_ips = {ip for _, ip in ident["private_ips"]} | ident["public_ips"]
+            for ip in ident["ips"] - cloud_ips:
+                self._link("ip", ip, i)
+            for scope, ip in ident["private_ips"]:
+                self._link("private_ip", (scope, ip), i)
+                if self.private_scopes.setdefault(ip, scope) != scope:
+                    self.private_scopes[ip] = _AMBIGUOUS
+            for ip in ident["public_ips"]:
+                self.public_owners.setdefault(ip, {}).setdefault(ident["resource_id"] or i, i)
+            for mac in ident["macs"]:
+                self._link("mac", mac, i)
+            if ident["macs"]:
+                self.macs[i] = ident["macs"]
+            if ident["resource_id"]:
+                self._link("resource_id", ident["resource_id"], i)
+
+            short = ident["short"]
+            if ident["fqdn"]:
+                self._link("fqdn", ident["fqdn"], i)
+                owner = self.indexes["fqdn_short"].setdefault(short, ident["fqdn"])
+                if owner != ident["fqdn"]:
+                    self.indexes["fqdn_short"][short] = _AMBIGUOUS
+            elif short:
+                self._link("short", short, i)
+        logging.info(f"[+] Correlation: indexed {count} {source} records")
+        return count
+
+    def _link_short_names(self):
+        """Bare short names join the record of the single FQDN sharing that short name"""
+        for short, first in self.indexes["short"].items():
+            fqdn = self.indexes["fqdn_short"].get(short)
+            if fqdn is not None and fqdn != _AMBIGUOUS:
+                self._union(first, self.indexes["fqdn"][fqdn])
+
+    def _link_cloud_ips(self):
+        """Cloud NIC addresses join other sources' records seen at that IP, where the address is unambiguous"""
+        for ip, scope in self.private_scopes.items():
+            first = self.indexes["ip"].get(ip)
+            if first is not None and scope != _AMBIGUOUS:
+                self._union(first, self.indexes["private_ip"][(scope, ip)])
+        for ip, owners in self.public_owners.items():
+            if len(owners) == 1:
+                (owner,) = owners.values()
+                first = self.indexes["ip"].setdefault(ip, owner)
+                if first != owner:
+                    self._union(first, owner)
+
+    # ---- Output ----
+    def _merge(self, members):
+        ranked = sorted(members, key=lambda m: (self.priority.get(m[0], len(self.priority)), m[1]))
+        merged, provenance = {}, {}
+        for source, idx in ranked:
+            asset = self.records[idx][1]
+            for key, value in asset.items():
+                if key in ("Tag", "Risk") or (isinstance(key, str) and key.startswith("_")):
+                    continue        # re-derived from the merged fields
+                if key not in merged or (not _informative(merged[key]) and _informative(value)):
+                    merged[key] = value
+                    provenance[key] = source
+
+        if "MAC" not in merged:
+            macs = set()
+            for source, idx in ranked:
+                if idx in self.macs:
+                    provenance.setdefault("MAC", source)
+                    macs |= self.macs[idx]
+            if macs:
+                merged["MAC"] = ",".join(sorted(macs))
+
+        # A hostname-less record (e.g. passive MAC-xx) should not shadow a real name from another source
+        hostnames = [self.records[idx][1].get("Hostname") for _, idx in ranked]
+        for (source, _), name in zip(ranked, hostnames):
+            if _informative(name) and not str(name).lower().startswith(("mac-", "dhcp-")):
+                merged["Hostname"] = name
+                provenance["Hostname"] = source
+                break
+
+        merged["Sources"] = sorted({source for source, _ in members}, key=lambda s: self.priority.get(s, len(self.priority)))
+        merged["Provenance"] = provenance
+        return merged
+
+    def assets(self):
+        """Unified assets in first-seen order, each with Sources and field-level Provenance"""
+        self._link_cloud_ips()
+        self._link_short_names()
+        groups = {}
+        for i, (source, _) in enumerate(self.records):
+            groups.setdefault(self._find(i), []).append((source, i))
+        merged = [self._merge(members) for members in groups.values()]
+        logging.info(f"[+] Correlation: {len(self.records)} records merged into {len(merged)} assets")
+        return merged
+
+
+def source_from_path(path):
+    """Discovery source of an exported report, from its discovr_<feature>_<timestamp>.json name"""
+    match = REPORT_NAME.search(Path(path).name)
+    return match.group(1) if match else Path(path).stem
+
+
+def correlate_reports(specs):
+    """
+    Correlate exported JSON reports.
+    :param specs: list of "path" or "source=path" strings
+    :return: list of unified assets
+    """
+    correlator = Correlator()
+    for spec in specs:
+        source, sep, path = spec.partition("=")
+        if not sep:
+            source, path = source_from_path(spec), spec
+        with open(path, "r", encoding="utf-8") as f:
+            assets = json.load(f)
+        print(f"[+] Loaded {len(assets)} {source} assets from {path}")
+        correlator.add(assets, source)
+    return correlator.assets()
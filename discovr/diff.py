@@ -0,0 +1,279 @@
+import hashlib
+import importlib.util
+import io
+import json
+import logging
+import re
+import time
+from pathlib import Path
+
+from discovr.inventory import asset_key
+from discovr.pipeline import RISK_RANK
+from discovr.ports import PortIntervalIndex
+
+try:
+    import zstandard
+    zstd_available = True
+except ImportError:
+    zstd_available = False
+
+parquet_available = importlib.util.find_spec("pyarrow") is not None
+
+# Report formats the diff can read, longest suffix first
+REPORT_SUFFIXES = (".jsonl.zst", ".jsonl", ".json", ".parquet")
+# Bookkeeping fields that are not observations of the asset; left out of content hashes
+IGNORED_FIELDS = {"Provenance"}
+PORT_FIELDS = ("Ports", "OpenPorts")
+REPORT_NAME = re.compile(r"^discovr_([a-z]+)_(\d{8}_\d{6})\.")
+
+
+# ---- Streaming readers ----
+def _iter_json_array(f, chunk_size):
+    """Yield the elements of a JSON array one at a time, reading chunk_size characters at a time"""
+    decoder = json.JSONDecoder()
+    buf, pos, eof, started = "", 0, False, False
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                raise ValueError("truncated JSON array")
+            more = f.read(chunk_size)
+            buf, pos, eof = more, 0, not more
+            continue
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("expected a JSON array")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            item, pos = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more = f.read(chunk_size)   # element split across chunks
+            buf, pos, eof = buf[pos:] + more, 0, not more
+            continue
+        yield item
+
+
+def _iter_parquet(path, batch_size):
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+        for row in batch.to_pylist():
+            extra = row.pop("_extra", None)
+            asset = {k: v for k, v in row.items() if v is not None}
+            if extra:
+                asset.update(json.loads(extra))
+            for key, value in asset.items():
+                if isinstance(value, list) and value and isinstance(value[0], tuple):
+                    asset[key] = dict(value)        # map<string, string> columns (Tags, Provenance)
+            yield asset
+
+
+def iter_report(path, chunk_size=1 << 20):
+    """
+    Stream the assets of an exported report (.json, .jsonl, .jsonl.zst or .parquet) without
+    loading the whole file.
+    """
+    name = str(path).lower()
+    if name.endswith(".jsonl.zst"):
+        if not zstd_available:
+            raise RuntimeError("zstandard library not installed. Run: pip install zstandard")
+        with open(path, "rb") as raw:
+            reader = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw), encoding="utf-8")
+            for line in reader:
+                if line.strip():
+                    yield json.loads(line)
+    elif name.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif name.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from _iter_json_array(f, chunk_size)
+    elif name.endswith(".parquet"):
+        if not parquet_available:
+            raise RuntimeError("pyarrow library not installed. Run: pip install pyarrow")
+        yield from _iter_parquet(path, batch_size=10_000)
+    else:
+        raise ValueError(f"unsupported report format: {path} (expected {', '.join(REPORT_SUFFIXES)})")
+
+
+def find_reports(feature, reports_dir=None):
+    """Exported reports of one feature as (timestamp, path), oldest first"""
+    reports_dir = Path(reports_dir) if reports_dir else Path.home() / "Documents" / "discovr_reports"
+    found = []
+    for folder in ("json", "parquet"):
+        for path in (reports_dir / folder).glob(f"discovr_{feature}_*"):
+            match = REPORT_NAME.match(path.name)
+            if match and path.name.endswith(REPORT_SUFFIXES):
+                found.append((match.group(2), path))
+    return sorted(found)
+
+
+def previous_report(feature, timestamp, reports_dir=None):
+    """Newest report of feature written before timestamp (None if there is none)"""
+    older = [(ts, path) for ts, path in find_reports(feature, reports_dir) if ts < timestamp]
+    return older[-1][1] if older else None
+
+
+# ---- Hashing ----
+def canonical(asset):
+    """Exported fields that describe the asset: no internal keys, bookkeeping or empty (None) values"""
+    if hasattr(asset, "to_dict"):
+        asset = asset.to_dict()
+    return {
+        k: v for k, v in asset.items()
+        if v is not None and k not in IGNORED_FIELDS and not (k.__class__ is str and k[:1] == "_")
+    }
+
+
+def content_hash(fields):
+    data = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str)
+    return int.from_bytes(hashlib.blake2b(data.encode("utf-8"), digest_size=16).digest(), "big")
+
+
+def _key_hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def field_changes(old, new):
+    """
+    Field-level differences between two canonical assets.
+    Ports fields report opened/closed port ranges; Risk reports whether it escalated.
+    :return: dict field -> {"old", "new", ...}
+    """
+    changes = {}
+    for field in dict.fromkeys([*old, *new]):
+        before, after = old.get(field), new.get(field)
+        if before == after:
+            continue
+        change = {"old": before, "new": after}
+        if field in PORT_FIELDS:
+            old_ports, new_ports = PortIntervalIndex.from_specs(before), PortIntervalIndex.from_specs(after)
+            opened, closed = new_ports.difference(old_ports), old_ports.difference(new_ports)
+            if not opened and not closed:
+                continue        # same ports, different spelling
+            change["opened"] = opened.to_strings() if opened else []
+            change["closed"] = closed.to_strings() if closed else []
+        elif field == "Risk":
+            unranked = len(RISK_RANK)
+            change["escalated"] = RISK_RANK.get(after, unranked) < RISK_RANK.get(before, unranked)
+        changes[field] = change
+    return changes
+
+
+class DiffReport:
+    def __init__(self):
+        """Result of a scan-to-scan diff"""
+        self.new = []           # (key, asset)
+        self.removed = []       # (key, asset)
+        self.changed = []       # (key, asset, field changes)
+        self.unchanged = 0
+        self.old_count = 0
+        self.new_count = 0
+        self.elapsed = 0.0
+
+    @property
+    def ports_opened(self):
+        return sum(1 for _, _, c in self.changed if any(c[f].get("opened") for f in PORT_FIELDS if f in c))
+
+    @property
+    def risk_escalations(self):
+        return sum(1 for _, _, c in self.changed if c.get("Risk", {}).get("escalated"))
+
+    def records(self):
+        """One JSON-ready dict per difference, for export"""
+        for key, asset in self.new:
+            yield {"Change": "new", "Key": key, "Asset": asset}
+        for key, asset in self.removed:
+            yield {"Change": "removed", "Key": key, "Asset": asset}
+        for key, asset, changes in self.changed:
+            yield {"Change": "changed", "Key": key, "Fields": changes, "Asset": asset}
+
+    @staticmethod
+    def describe(changes):
+        """Short text for a changed asset, e.g. "Ports +3389; Risk Low->Critical" """
+        parts = []
+        for field, change in changes.items():
+            if "opened" in change:
+                ports = [f"+{p}" for p in change["opened"]] + [f"-{p}" for p in change["closed"]]
+                parts.append(f"{field} {','.join(ports)}")
+            else:
+                parts.append(f"{field} {change['old']}->{change['new']}")
+        return "; ".join(parts)
+
+
+def diff_reports(old, new, chunk_size=1 << 20):
+    """
+    Compare two scans in linear time. The old report is streamed twice: first to keep a 64-bit key
+    hash -> 128-bit content hash map (the only per-asset state), then to pick up the records of removed
+    and changed assets by content hash. Only the differences themselves are held in memory.
+    :param old: Path of the earlier export
+    :param new: Path of the later export, or an iterable of assets
+    :return: DiffReport
+    """
+    start = time.time()
+    report = DiffReport()
+    old_hashes = {}
+    for asset in iter_report(old, chunk_size):
+        fields = canonical(asset)
+        old_hashes[_key_hash(asset_key(fields))] = content_hash(fields)
+        report.old_count += 1
+
+    new_assets = iter_report(new, chunk_size) if isinstance(new, (str, Path)) else new
+    seen_new = set()        # key hashes of assets not in the old scan
+    changed = {}            # key hash -> (old content hash, key, new fields)
+    for asset in new_assets:
+        fields = canonical(asset)
+        key = asset_key(fields)
+        kh = _key_hash(key)
+        report.new_count += 1
+        previous = old_hashes.get(kh, False)
+        if previous is False:
+            if kh not in seen_new:
+                seen_new.add(kh)
+                report.new.append((key, fields))
+        elif previous is None:
+            continue            # duplicate of an asset already matched
+        else:
+            old_hashes[kh] = None
+            if previous == content_hash(fields):
+                report.unchanged += 1
+            else:
+                changed[kh] = (previous, key, fields)
+
+    # Old records still wanted, by content hash: removed ones, and the old side of changed ones
+    wanted = {digest: kh for kh, digest in old_hashes.items() if digest is not None}
+    wanted.update((previous, kh) for kh, (previous, _, _) in changed.items())
+    old_hashes = None
+    if wanted:
+        for asset in iter_report(old, chunk_size):
+            fields = canonical(asset)
+            kh = wanted.pop(content_hash(fields), None)
+            if kh is None:
+                continue
+            key = asset_key(fields)
+            if kh in changed:
+                _, _, new_fields = changed.pop(kh)
+                changes = field_changes(fields, new_fields)
+                if changes:
+                    report.changed.append((key, new_fields, changes))
+                else:
+                    report.unchanged += 1
+            else:
+                report.removed.append((key, fields))
+            if not wanted:
+                break
+
+    report.elapsed = time.time() - start
+    logging.info(
+        f"[+] Diff: {report.old_count} -> {report.new_count} assets, {len(report.new)} new, "
+        f"{len(report.removed)} removed, {len(report.changed)} changed in {report.elapsed:.2f}s"
+    )
+    return report
@@ -1,5 +1,8 @@
 import logging
 
+from discovr.logs import asset_log
+from discovr.metrics import METRICS
+
 try:
     from google.cloud import compute_v1
     gcp_available = True
@@ -8,24 +11,34 @@ except ImportError:
 
 
 class GCPDiscovery:
-    def __init__(self, project, zone):
+    def __init__(self, project, zone, raise_errors=False):
+        """
+        :param raise_errors: Re-raise API errors after logging them, instead of ending the run early
+        """
         self.project = project
         self.zone = zone
+        self.raise_errors = raise_errors
 
     def run(self):
+        return list(self.iter_assets())
+
+    def iter_assets(self):
+        """Yield GCP instances as the list pages arrive"""
         if not gcp_available:
             print("[!] google-cloud-compute library not installed. Run: pip install google-cloud-compute")
-            return []
+            if self.raise_errors:
+                raise RuntimeError("google-cloud-compute not installed")
+            return
 
         print(f"[+] Discovering GCP assets in project: {self.project} (zone: {self.zone})")
 
-        assets = []
         try:
             client = compute_v1.InstancesClient()
             request = compute_v1.ListInstancesRequest(project=self.project, zone=self.zone)
-            response = client.list(request=request)
+            with METRICS.timer("discovr_api_call_seconds", provider="gcp", call="instances.list"):
+                response = client.list(request=request)
 
-            for instance in response:
+            for instance in METRICS.timed_iter(response, "discovr_api_call_seconds", provider="gcp", call="instances.pages"):
                 ip = None
                 if instance.network_interfaces:
                     ip = instance.network_interfaces[0].network_i_p
@@ -40,15 +53,14 @@ class GCPDiscovery:
                     "IP": ip or "N/A",
                     "Hostname": hostname,
                     "OS": os_name,
-                    "Ports": "N/A"
+                    "Ports": "N/A",
+                    "ResourceId": instance.self_link or None,
                 }
-                logging.info(
-                    f"    [+] GCP Instance: {asset['IP']} ({asset['Hostname']}) | OS: {asset['OS']}"
-                )
-                assets.append(asset)
+                asset_log.info("    [+] GCP Instance: %s (%s) | OS: %s", asset["IP"], asset["Hostname"], asset["OS"])
+                yield asset
 
         except Exception as e:
+            METRICS.inc("discovr_api_errors_total", provider="gcp")
             logging.error(f"[!] Failed to discover GCP assets: {e}")
-            return []
-
-        return assets
+            if self.raise_errors:
+                raise
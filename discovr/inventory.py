@@ -0,0 +1,303 @@
+import json
+import logging
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from discovr.cache import public_view
+from discovr.correlate import asset_identity
+from discovr.metrics import METRICS
+from discovr.ports import parse_port_spec
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id          INTEGER PRIMARY KEY,
+    feature     TEXT NOT NULL,
+    scanned_at  TEXT NOT NULL,
+    asset_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS assets (
+    id          INTEGER PRIMARY KEY,
+    asset_key   TEXT NOT NULL UNIQUE,
+    type        TEXT,
+    ip          TEXT,
+    mac         TEXT,
+    hostname    TEXT COLLATE NOCASE,
+    os          TEXT,
+    tag         TEXT,
+    risk        TEXT,
+    ports       TEXT,
+    first_seen  TEXT NOT NULL,
+    last_seen   TEXT NOT NULL,
+    first_scan  INTEGER REFERENCES scans(id),
+    last_scan   INTEGER REFERENCES scans(id),
+    data        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_assets_ip ON assets(ip);
+CREATE INDEX IF NOT EXISTS idx_assets_mac ON assets(mac);
+CREATE INDEX IF NOT EXISTS idx_assets_hostname ON assets(hostname);
+CREATE INDEX IF NOT EXISTS idx_assets_risk ON assets(risk);
+CREATE INDEX IF NOT EXISTS idx_assets_tag ON assets(tag);
+CREATE INDEX IF NOT EXISTS idx_assets_last_seen ON assets(last_seen);
+CREATE TABLE IF NOT EXISTS history (
+    scan_id     INTEGER NOT NULL REFERENCES scans(id),
+    asset_id    INTEGER NOT NULL REFERENCES assets(id),
+    ip          TEXT,
+    hostname    TEXT,
+    os          TEXT,
+    tag         TEXT,
+    risk        TEXT,
+    ports       TEXT,
+    PRIMARY KEY (asset_id, scan_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_history_scan ON history(scan_id);
+CREATE TABLE IF NOT EXISTS asset_ports (
+    asset_id    INTEGER NOT NULL REFERENCES assets(id),
+    port_lo     INTEGER NOT NULL,
+    port_hi     INTEGER NOT NULL,
+    first_seen  TEXT NOT NULL,
+    last_seen   TEXT NOT NULL,
+    PRIMARY KEY (asset_id, port_lo, port_hi)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_asset_ports_port ON asset_ports(port_lo, port_hi);
+CREATE INDEX IF NOT EXISTS idx_asset_ports_first_seen ON asset_ports(first_seen);
+"""
+
+UPSERT_ASSET = """
+INSERT INTO assets (asset_key, type, ip, mac, hostname, os, tag, risk, ports,
+                    first_seen, last_seen, first_scan, last_scan, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(asset_key) DO UPDATE SET
+    type = excluded.type, ip = excluded.ip, mac = COALESCE(excluded.mac, assets.mac),
+    hostname = excluded.hostname, os = excluded.os, tag = excluded.tag, risk = excluded.risk,
+    ports = excluded.ports, last_seen = excluded.last_seen, last_scan = excluded.last_scan,
+    data = excluded.data
+"""
+
+UPSERT_PORT = """
+INSERT INTO asset_ports (asset_id, port_lo, port_hi, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(asset_id, port_lo, port_hi) DO UPDATE SET last_seen = excluded.last_seen
+"""
+
+SINCE_RE = re.compile(r"^(\d+)([hdw])$")
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _primary_ip(asset, ident):
+    """The asset's own IP field when usable, else its first NIC address"""
+    ip = asset.get("IP")
+    if ip in ident["ips"]:
+        return ip
+    return min(ident["ips"]) if ident["ips"] else None
+
+
+def asset_key(asset, ident=None):
+    """
+    Stable inventory key: cloud resource ID, else IP, else MAC, else hostname, else Type/Name.
+    """
+    ident = ident or asset_identity(asset)
+    if ident["resource_id"]:
+        return f"rid:{ident['resource_id']}"
+    if ident["ips"]:
+        return f"ip:{_primary_ip(asset, ident)}"
+    if ident["macs"]:
+        return f"mac:{min(ident['macs'])}"
+    if ident["fqdn"] or ident["short"]:
+        return f"host:{ident['fqdn'] or ident['short']}"
+    parts = [asset.get("Type"), asset.get("ResourceGroup"), asset.get("Name") or asset.get("Hostname")]
+    return "obj:" + "/".join(str(p).lower() for p in parts if p)
+
+
+def parse_since(value, now=None):
+    """Turn "24h", "7d", "2w" or an ISO date into a stored timestamp string"""
+    now = now or datetime.now()
+    match = SINCE_RE.match(value.strip().lower())
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        delta = {"h": timedelta(hours=amount), "d": timedelta(days=amount), "w": timedelta(weeks=amount)}[unit]
+        return (now - delta).strftime(TIME_FORMAT)
+    try:
+        return datetime.fromisoformat(value.strip()).strftime(TIME_FORMAT)
+    except ValueError:
+        raise ValueError(f"invalid since '{value}' (e.g. 24h, 7d, 2w or 2025-01-31)") from None
+
+
+def parse_port(value):
+    """Port number from a query filter"""
+    try:
+        port = int(str(value).strip())
+    except ValueError:
+        port = -1
+    if not 0 <= port <= 65535:
+        raise ValueError(f"invalid port '{value}' (0-65535)")
+    return port
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return ",".join(map(str, value))
+    return str(value)
+
+
+class InventoryStore:
+    # Assets per executemany() batch inside the scan transaction
+    BATCH_SIZE = 5000
+    # Keep IN (...) lists below SQLite's bound-parameter limit
+    LOOKUP_CHUNK = 900
+
+    def __init__(self, path=None):
+        """
+        SQLite inventory of every asset ever seen, with per-scan history and open-port first/last seen.
+        :param path: Database file (default: ~/Documents/discovr_reports/inventory.db)
+        """
+        self.path = Path(path) if path else self.default_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    @staticmethod
+    def default_path():
+        return Path.home() / "Documents" / "discovr_reports" / "inventory.db"
+
+    def close(self):
+        self.conn.close()
+
+    # ---- Writing ----
+    def record_scan(self, assets, feature, scanned_at=None):
+        """
+        Upsert a scan's assets in batches inside one transaction and add a history row per asset.
+        :param scanned_at: datetime or "%Y%m%d_%H%M%S" timestamp (default: now)
+        :return: scan id
+        """
+        if isinstance(scanned_at, str):
+            scanned_at = datetime.strptime(scanned_at, "%Y%m%d_%H%M%S")
+        seen = (scanned_at or datetime.now()).strftime(TIME_FORMAT)
+        start = time.time()
+
+        with self.conn:
+            scan_id = self.conn.execute(
+                "INSERT INTO scans (feature, scanned_at) VALUES (?, ?)", (feature, seen)
+            ).lastrowid
+            count, batch = 0, []
+            for asset in assets:
+                batch.append(public_view(asset))
+                if len(batch) >= self.BATCH_SIZE:
+                    count += self._write_batch(batch, scan_id, seen)
+                    batch = []
+            if batch:
+                count += self._write_batch(batch, scan_id, seen)
+            self.conn.execute("UPDATE scans SET asset_count = ? WHERE id = ?", (count, scan_id))
+
+        elapsed = time.time() - start
+        METRICS.inc("discovr_stage_seconds_total", elapsed, stage="inventory")
+        logging.info(f"[+] Inventory: recorded {count} {feature} assets (scan {scan_id}) in {elapsed:.2f}s")
+        return scan_id
+
+    def _write_batch(self, assets, scan_id, seen):
+        rows = {}
+        for asset in assets:
+            ident = asset_identity(asset)
+            ports = asset.get("Ports") or asset.get("OpenPorts")
+            rows[asset_key(asset, ident)] = (asset, (
+                _text(asset.get("Type")) or "Host",
+                _primary_ip(asset, ident),
+                min(ident["macs"]) if ident["macs"] else None,
+                _text(asset.get("Hostname") or asset.get("Name")),
+                _text(asset.get("OS")),
+                _text(asset.get("Tag")),
+                _text(asset.get("Risk")),
+                _text(ports),
+            ))
+
+        self.conn.executemany(UPSERT_ASSET, [
+            (key, *fields, seen, seen, scan_id, scan_id, json.dumps(asset, default=str))
+            for key, (asset, fields) in rows.items()
+        ])
+        ids = self._asset_ids(list(rows))
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO history (scan_id, asset_id, ip, hostname, os, tag, risk, ports) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(scan_id, ids[key], fields[1], fields[3], fields[4], fields[5], fields[6], fields[7])
+             for key, (_, fields) in rows.items()],
+        )
+        port_rows = []
+        for key, (asset, _) in rows.items():
+            for low, high in set(parse_port_spec(asset.get("Ports") or asset.get("OpenPorts"))):
+                port_rows.append((ids[key], low, high, seen, seen))
+        self.conn.executemany(UPSERT_PORT, port_rows)
+        return len(rows)
+
+    def _asset_ids(self, keys):
+        ids = {}
+        for i in range(0, len(keys), self.LOOKUP_CHUNK):
+            chunk = keys[i:i + self.LOOKUP_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for row in self.conn.execute(f"SELECT asset_key, id FROM assets WHERE asset_key IN ({marks})", chunk):
+                ids[row[0]] = row[1]
+        return ids
+
+    # ---- Queries ----
+    def query(self, ip=None, mac=None, hostname=None, risk=None, tag=None, port=None, since=None, limit=1000):
+        """
+        Look up assets. Hostnames match case-insensitively ("*" wildcards allowed).
+        :param port: Only assets that exposed this port; with since, only those where it first appeared after since
+        :param since: Timestamp string (see parse_since); without port, assets seen since then
+        :return: list of row dicts
+        """
+        where, params = [], []
+        select = "SELECT a.id, a.ip, a.mac, a.hostname, a.os, a.tag, a.risk, a.ports, a.first_seen, a.last_seen"
+        source = "FROM assets a"
+        if ip:
+            where.append("a.ip = ?")
+            params.append(ip)
+        if mac:
+            where.append("a.mac = ?")
+            params.append(mac.lower().replace("-", ":"))
+        if hostname:
+            if "*" in hostname:
+                where.append("a.hostname LIKE ?")
+                params.append(hostname.replace("*", "%"))
+            else:
+                where.append("a.hostname = ?")
+                params.append(hostname)
+        if risk:
+            where.append("a.risk = ?")
+            params.append(risk.capitalize())
+        if tag:
+            where.append("a.tag = ?")
+            params.append(tag if tag.startswith("[") else f"[{tag}]")
+        if port is not None:
+            port = parse_port(port)
+            select += ", p.first_seen AS port_first_seen, p.last_seen AS port_last_seen"
+            source += " JOIN asset_ports p ON p.asset_id = a.id"
+            where.append("p.port_lo <= ? AND p.port_hi >= ?")
+            params.extend([port, port])
+            if since:
+                where.append("p.first_seen >= ?")
+                params.append(since)
+        elif since:
+            where.append("a.last_seen >= ?")
+            params.append(since)
+
+        sql = f"{select} {source}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY a.last_seen DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def history(self, asset_id):
+        """Per-scan observations of one asset, oldest first"""
+        return [dict(row) for row in self.conn.execute(
+            "SELECT s.scanned_at, s.feature, h.ip, h.hostname, h.os, h.tag, h.risk, h.ports "
+            "FROM history h JOIN scans s ON s.id = h.scan_id WHERE h.asset_id = ? ORDER BY s.scanned_at",
+            (asset_id,),
+        )]
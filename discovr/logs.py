@@ -0,0 +1,124 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from datetime import datetime
+
+# Per-asset "Found: ..." messages go through this logger so the console can rate-limit them
+ASSET_LOGGER = "discovr.assets"
+asset_log = logging.getLogger(ASSET_LOGGER)
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+_listener = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves %-formatting to the listener thread: the logging call only builds a
+    LogRecord and puts it on an unbounded queue, so discovery threads never wait on log I/O.
+    Callers pass the message arguments separately (lazy % style), as plain values.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, thread, message (and exception text)"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitedConsoleHandler(logging.StreamHandler):
+    def __init__(self, stream=None, per_second=20):
+        """
+        Console handler that prints at most per_second per-asset records each second and
+        summarizes the rest ("... 1234 more assets found"); other records always print.
+        :param per_second: 0 hides per-asset records entirely (they still reach the log file)
+        """
+        super().__init__(stream or sys.stdout)
+        self.per_second = per_second
+        self.window = 0
+        self.shown = 0
+        self.suppressed = 0
+
+    def _summarize(self):
+        if self.suppressed:
+            self.stream.write(f"    [+] ... {self.suppressed} more assets found (see the log file)\n")
+            self.suppressed = 0
+
+    def emit(self, record):
+        if record.name == ASSET_LOGGER:
+            window = int(time.monotonic())
+            if window != self.window:
+                self._summarize()
+                self.window, self.shown = window, 0
+            if self.shown >= self.per_second:
+                self.suppressed += 1
+                return
+            self.shown += 1
+        super().emit(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            self._summarize()
+            self.flush()
+        finally:
+            self.release()
+        super().close()
+
+
+def start(log_file, json_logs=False, console_rate=20, level=logging.INFO):
+    """
+    Route the root logger through a queue to a background listener that writes the log file
+    and the (rate-limited) console. Replaces any previous setup.
+    :param json_logs: Write the log file as JSON Lines instead of text
+    :param console_rate: Per-asset console lines per second (0 = none)
+    """
+    stop()
+    file_handler = logging.FileHandler(str(log_file), encoding="utf-8")
+    file_handler.setFormatter(JSONFormatter() if json_logs else logging.Formatter(TEXT_FORMAT))
+    console = RateLimitedConsoleHandler(per_second=console_rate)
+    console.setFormatter(logging.Formatter("%(message)s"))
+
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, console, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(level)
+    return _listener
+
+
+def stop():
+    """Drain the queue, then flush and close the file and console handlers"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+atexit.register(stop)
@@ -0,0 +1,216 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets (seconds) shared by every histogram: sub-ms API cache hits up to multi-minute nmap -O runs
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Metric name -> (type, help)
+DESCRIPTIONS = {
+    "discovr_run_seconds": ("gauge", "Wall time of the discovery run"),
+    "discovr_assets_total": ("counter", "Assets discovered"),
+    "discovr_hosts_probed_total": ("counter", "Hosts handed to nmap"),
+    "discovr_nmap_processes_total": ("counter", "nmap processes started"),
+    "discovr_nmap_failures_total": ("counter", "nmap scans that raised an error"),
+    "discovr_nmap_scan_seconds": ("histogram", "Latency of one nmap scan"),
+    "discovr_api_call_seconds": ("histogram", "Latency of a cloud or directory API call (lists: total paging time)"),
+    "discovr_api_errors_total": ("counter", "Cloud or directory API calls that raised an error"),
+    "discovr_packets_total": ("counter", "Packets seen by the passive sniffer"),
+    "discovr_packets_dropped_total": ("counter", "Packets the capture reported as dropped"),
+    "discovr_stage_seconds_total": ("counter", "Time spent per processing stage (tag, risk, export)"),
+    "discovr_serve_jobs_total": ("counter", "Scan jobs queued by the scan service"),
+    "discovr_serve_job_seconds": ("histogram", "Run time of a scan service job"),
+    "discovr_serve_cache_hits_total": ("counter", "Scan requests answered from a recent identical job"),
+    "discovr_serve_rejected_total": ("counter", "Scan requests refused because the job queue was full"),
+    "discovr_serve_client_reuse_total": ("counter", "Jobs that reused a warm discovery client"),
+    "discovr_serve_queue_depth": ("gauge", "Jobs waiting for a worker"),
+    "discovr_serve_busy_workers": ("gauge", "Workers running a job"),
+    "discovr_schedule_runs_total": ("counter", "Scheduled scan runs, by job and status"),
+    "discovr_schedule_run_seconds": ("histogram", "Run time of a scheduled scan"),
+    "discovr_schedule_skipped_total": ("counter", "Scheduled runs dropped because the previous run was still going"),
+    "discovr_schedule_delayed_total": ("counter", "Scheduled runs held back by a concurrency or rate budget"),
+    "discovr_schedule_running": ("gauge", "Scheduled scans running"),
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        total, out = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+
+class Metrics:
+    def __init__(self):
+        """
+        Process-wide counters, gauges and latency histograms, keyed by name and labels.
+        Updates take a lock, so discovery worker threads can report directly.
+        """
+        self._lock = threading.Lock()
+        self.counters = {}      # (name, labels) -> value
+        self.gauges = {}
+        self.histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the duration of the with-block into a histogram (errors count too)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed_iter(self, iterable, name, **labels):
+        """Yield from iterable, observing the total time spent waiting on it (e.g. a paged API list)"""
+        waited, iterator = 0.0, iter(iterable)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    waited += time.perf_counter() - start
+                yield item
+        finally:
+            self.observe(name, waited, **labels)
+
+    def total(self, *names):
+        """Sum of the named counters across all their labels"""
+        with self._lock:
+            return sum(v for (n, _), v in self.counters.items() if n in names)
+
+    def merge(self, counters=None, histograms=None):
+        """Add counters and histograms recorded elsewhere (e.g. by a module run in a worker process)"""
+        with self._lock:
+            for key, value in (counters or {}).items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, other in (histograms or {}).items():
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(other.buckets)
+                histogram.count += other.count
+                histogram.sum += other.sum
+                histogram.counts = [a + b for a, b in zip(histogram.counts, other.counts)]
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    # ---- Output ----
+    def snapshot(self):
+        """All metrics as JSON-ready dicts, plus per-second rates over discovr_run_seconds"""
+        with self._lock:
+            data = {
+                "counters": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.counters.items())],
+                "gauges": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.gauges.items())],
+                "histograms": [
+                    {"name": n, "labels": dict(l), "count": h.count, "sum": round(h.sum, 6),
+                     "mean": round(h.sum / h.count, 6) if h.count else 0.0,
+                     "buckets": {str(bound): count for bound, count in h.cumulative()}}
+                    for (n, l), h in sorted(self.histograms.items())
+                ],
+            }
+            run = sum(v for (n, _), v in self.gauges.items() if n == "discovr_run_seconds")
+            totals = {}
+            for (n, _), v in self.counters.items():
+                totals[n] = totals.get(n, 0) + v
+        rates = {}
+        if run:
+            for name in ("discovr_hosts_probed_total", "discovr_assets_total", "discovr_packets_total"):
+                if name in totals:
+                    rates[name[len("discovr_"):-len("_total")] + "_per_second"] = round(totals[name] / run, 3)
+        data["rates"] = rates
+        return data
+
+    def prometheus(self, **const_labels):
+        """Prometheus text exposition format; const_labels (e.g. feature) are added to every sample"""
+        def fmt(labels, extra=()):
+            pairs = sorted({**const_labels, **dict(labels)}.items()) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+        lines, described = [], set()
+
+        def describe(name, kind):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, (kind, name))[1]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                describe(name, "counter")
+                lines.append(f"{name}{fmt(labels)} {value}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                describe(name, "gauge")
+                lines.append(f"{name}{fmt(labels)} {value}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                describe(name, "histogram")
+                for bound, count in h.cumulative():
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {count}")
+                lines.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {h.count}")
+                lines.append(f"{name}_sum{fmt(labels)} {h.sum}")
+                lines.append(f"{name}_count{fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path, **info):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**info, **self.snapshot()}, f, indent=4)
+
+    def write_prometheus(self, path, **const_labels):
+        """Write atomically (temp file + rename), as the node_exporter textfile collector requires"""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus(**const_labels))
+        os.replace(tmp, path)
+
+
+METRICS = Metrics()
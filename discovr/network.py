@@ -1,6 +1,9 @@
 import logging
 import ipaddress
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from discovr.logs import asset_log
+from discovr.metrics import METRICS
 
 try:
     import nmap
@@ -10,22 +13,32 @@ except ImportError:
 
 
 class NetworkDiscovery:
-    def __init__(self, network_range, ports=None, parallel=1):
+    def __init__(self, network_range, ports=None, parallel=1, scanner_factory=None):
+        """
+        :param scanner_factory: Callable returning an nmap.PortScanner-compatible object, one per host
+            scan (default: nmap.PortScanner; see discovr.simnet for an offline fake)
+        """
         self.network_range = network_range
         self.ports = ports
         self.parallel = max(1, parallel)
+        self.scanner_factory = scanner_factory or (nmap.PortScanner if nmap_available else None)
+        self.total_hosts = 0
 
     def _scan_host(self, host):
         """Scan a single host with Nmap"""
-        nm = nmap.PortScanner()
+        nm = self.scanner_factory()
         arguments = "-O -T4"
         if self.ports:
             arguments = f"-p {self.ports} -T4"
 
+        METRICS.inc("discovr_hosts_probed_total")
+        METRICS.inc("discovr_nmap_processes_total")
         try:
-            nm.scan(hosts=host, arguments=arguments)
+            with METRICS.timer("discovr_nmap_scan_seconds"):
+                nm.scan(hosts=host, arguments=arguments)
         except Exception as e:
-            logging.error(f"[!] Nmap scan failed for {host}: {e}")
+            METRICS.inc("discovr_nmap_failures_total")
+            logging.error("[!] Nmap scan failed for %s: %s", host, e)
             return None
 
         assets = []
@@ -54,34 +67,44 @@ class NetworkDiscovery:
                 "OS": os_name,
                 "Ports": ",".join(open_ports) if open_ports else "None"
             }
-            logging.info(
-                f"    [+] Found: {asset['IP']} ({asset['Hostname']}) | OS: {asset['OS']} | Ports: {asset['Ports']}"
-            )
+            asset_log.info("    [+] Found: %s (%s) | OS: %s | Ports: %s",
+                           asset["IP"], asset["Hostname"], asset["OS"], asset["Ports"])
             assets.append(asset)
         return assets
 
-    def run(self):
-        if not nmap_available:
+    def iter_assets(self):
+        """
+        Yield assets as hosts finish scanning.
+        Only a bounded window of hosts is in flight, so memory does not grow with the range size.
+        """
+        if self.scanner_factory is None:
             print("[!] python-nmap not installed. Run: pip install python-nmap")
-            return [], 0, 0
+            return
 
         print(f"[+] Scanning network: {self.network_range} with {self.parallel} parallel workers")
         print("[+] Running OS detection scan (requires admin privileges)")
 
         try:
-            all_hosts = [str(ip) for ip in ipaddress.IPv4Network(self.network_range, strict=False)]
+            network = ipaddress.IPv4Network(self.network_range, strict=False)
         except Exception as e:
             print(f"[!] Invalid network range: {e}")
-            return [], 0, 0
+            return
 
-        assets = []
-        total_hosts = len(all_hosts)
+        self.total_hosts = network.num_addresses
+        hosts = (str(ip) for ip in network)
+        window = self.parallel * 4
 
         with ThreadPoolExecutor(max_workers=self.parallel) as executor:
-            future_to_host = {executor.submit(self._scan_host, host): host for host in all_hosts}
-            for future in as_completed(future_to_host):
-                result = future.result()
-                if result:
-                    assets.extend(result)
+            pending = set()
+            for host in hosts:
+                pending.add(executor.submit(self._scan_host, host))
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result() or []
+            for future in wait(pending).done:
+                yield from future.result() or []
 
-        return assets, total_hosts, 0
+    def run(self):
+        assets = list(self.iter_assets())
+        return assets, self.total_hosts, 0
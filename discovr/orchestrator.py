@@ -0,0 +1,121 @@
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from discovr import plugins
+from discovr.correlate import Correlator
+from discovr.metrics import METRICS
+
+_DONE = object()
+
+
+class DiscoveryJob:
+    def __init__(self, name, plugin, args=(), kwargs=None, method="iter_assets", process=False):
+        """
+        One discovery module of a combined run: plugins.load(plugin)(*args, **kwargs), then method().
+        :param name: Source name of its assets ("network", "azure", "ad", "passive", ...)
+        :param method: "iter_assets" (streamed) or a method returning a list of assets (e.g. "run" of ad_sync)
+        :param process: Run in a worker process instead of a thread (for CPU-bound modules; args must
+            be picklable and assets arrive when the module finishes)
+        """
+        self.name = name
+        self.plugin = plugin
+        self.args = tuple(args)
+        self.kwargs = kwargs or {}
+        self.method = method
+        self.process = process
+
+    def create(self):
+        return plugins.load(self.plugin)(*self.args, **self.kwargs)
+
+
+def _run_in_process(job):
+    """Worker process entry point: run the whole module, return its assets and the metrics it recorded"""
+    assets = list(getattr(job.create(), job.method)())
+    return assets, METRICS.counters, METRICS.histograms
+
+
+class Orchestrator:
+    def __init__(self, jobs, queue_size=1000):
+        """
+        Run several discovery modules at the same time and merge their output into one asset stream.
+        Modules run in threads (they wait on nmap, LDAP, cloud APIs or the sniffer), or in worker
+        processes when marked process=True; a failing module is reported without stopping the others.
+        :param queue_size: Assets buffered between the modules and the consumer (backpressure)
+        """
+        self.jobs = jobs
+        self.queue_size = queue_size
+        self.stats = {}         # name -> {"assets", "seconds", "error"}
+        self.elapsed = 0.0
+
+    def _worker(self, job, out, executor):
+        start = time.perf_counter()
+        count, error = 0, None
+        try:
+            if job.process:
+                assets, counters, histograms = executor.submit(_run_in_process, job).result()
+                METRICS.merge(counters, histograms)
+            else:
+                assets = getattr(job.create(), job.method)()
+            for asset in assets:
+                out.put((job.name, asset))
+                count += 1
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            logging.error("[!] %s discovery failed: %s", job.name, error)
+        finally:
+            self.stats[job.name] = {"assets": count, "seconds": time.perf_counter() - start, "error": error}
+            out.put((job.name, _DONE))
+
+    def iter_assets(self):
+        """Yield (source name, asset) as soon as any module produces it"""
+        start = time.perf_counter()
+        out = queue.Queue(maxsize=self.queue_size)
+        executor = None
+        if any(job.process for job in self.jobs):
+            executor = ProcessPoolExecutor(max_workers=sum(job.process for job in self.jobs),
+                                           mp_context=multiprocessing.get_context("spawn"))
+        for job in self.jobs:
+            threading.Thread(target=self._worker, args=(job, out, executor),
+                             name=f"discovr-{job.name}", daemon=True).start()
+        running = len(self.jobs)
+        try:
+            while running:
+                name, asset = out.get()
+                if asset is _DONE:
+                    running -= 1
+                    logging.info("[+] %s discovery finished: %d assets in %.2fs",
+                                 name, self.stats[name]["assets"], self.stats[name]["seconds"])
+                    continue
+                yield name, asset
+        finally:
+            if executor:
+                executor.shutdown(wait=not running, cancel_futures=True)
+            self.elapsed = time.perf_counter() - start
+
+    def run(self):
+        """Run every module to completion and correlate their assets into unified records"""
+        by_source = {}
+        for name, asset in self.iter_assets():
+            by_source.setdefault(name, []).append(asset)
+        correlator = Correlator()
+        for name, assets in by_source.items():
+            correlator.add(assets, name)
+        return correlator.assets()
+
+    def print_summary(self):
+        """Per-module results and how the combined run compares with running the modules one by one"""
+        for job in self.jobs:
+            stats = self.stats.get(job.name)
+            if stats is None:
+                print(f"[!] {job.name}: interrupted")
+            elif stats["error"]:
+                print(f"[!] {job.name}: failed after {stats['seconds']:.2f}s (see the log)")
+            else:
+                print(f"[+] {job.name}: {stats['assets']} assets in {stats['seconds']:.2f}s")
+        sequential = sum(s["seconds"] for s in self.stats.values())
+        print(f"[+] Combined run: {len(self.jobs)} modules in {self.elapsed:.2f} seconds "
+              f"(one after another: {sequential:.2f} seconds)")
@@ -1,6 +1,14 @@
-import logging
 import platform
-from scapy.all import sniff, ARP, DNS, DNSQR, BOOTP, DHCP, UDP, get_if_list
+import queue
+import struct
+from scapy.all import AsyncSniffer, ARP, DNS, DNSQR, BOOTP, DHCP, UDP, conf, get_if_list
+
+from discovr.logs import asset_log
+from discovr.metrics import METRICS
+
+# getsockopt(SOL_PACKET, PACKET_STATISTICS) on Linux PF_PACKET sockets: struct tpacket_stats {packets, drops}
+SOL_PACKET = 263
+PACKET_STATISTICS = 6
 
 # Windows-only helper for friendly names
 try:
@@ -10,18 +18,22 @@ except ImportError:
 
 
 class PassiveDiscovery:
-    def __init__(self, iface=None, count=0, timeout=180):
+    def __init__(self, iface=None, count=0, timeout=180, queue_size=1000):
         """
         :param iface: Network interface
             - Linux/Mac: 'eth0', 'wlan0', 'en0'
             - Windows: friendly name (e.g., 'Wi-Fi', 'Ethernet')
         :param count: Number of packets to capture (0 = unlimited until timeout/Ctrl+C)
         :param timeout: Duration in seconds (default: 180 = 3 minutes)
+        :param queue_size: New assets buffered for the consumer of iter_assets()
         """
         self.iface = iface
         self.count = count
         self.timeout = timeout
+        self.queue_size = queue_size
         self.assets = {}
+        self.packets = 0
+        self._emit = None
 
     def _list_interfaces(self):
         """Return list of interfaces cross-platform."""
@@ -59,7 +71,26 @@ class PassiveDiscovery:
         print("[!] Invalid choice.")
         return None
 
+    @staticmethod
+    def _open_capture(iface):
+        """Linux: open the PF_PACKET socket ourselves so its kernel drop counter can be read afterwards"""
+        if platform.system() != "Linux":
+            return None
+        try:
+            return conf.L2listen(iface=iface)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _kernel_drops(sock):
+        try:
+            _, drops = struct.unpack("II", sock.ins.getsockopt(SOL_PACKET, PACKET_STATISTICS, 8))
+            return drops
+        except (AttributeError, OSError, struct.error):
+            return None
+
     def _process_packet(self, packet):
+        self.packets += 1
         ip, hostname = None, None
 
         # ARP packets (discover IP ↔ MAC mappings)
@@ -89,28 +120,59 @@ class PassiveDiscovery:
                     "OS": "Unknown",
                     "Ports": "N/A"
                 }
-                logging.info(
-                    f"    [+] Passive Discovery Found: {self.assets[key]['IP']} ({self.assets[key]['Hostname']})"
-                )
+                asset_log.info("    [+] Passive Discovery Found: %s (%s)", ip or "N/A", hostname or "Unknown")
+                emit = self._emit       # iter_assets() may clear it from another thread
+                if emit:
+                    emit(self.assets[key])
 
-    def run(self):
+    def iter_assets(self):
+        """
+        Yield each newly seen asset while the capture is running.
+        The sniffer thread blocks when the consumer falls queue_size assets behind.
+        """
         if not self.iface:
             self.iface = self._select_iface()
             if not self.iface:
-                return [], 0
+                return
 
         print(f"[+] Starting passive discovery on interface: {self.iface}")
         print(f"[+] Listening for ARP, DNS, DHCP, and mDNS traffic (auto-stop after {self.timeout} seconds or Ctrl+C)...\n")
 
+        found = queue.Queue(maxsize=self.queue_size)
+        self._emit = found.put
+        sock = self._open_capture(self.iface)
+        capture = {"opened_socket": sock} if sock else {"iface": self.iface}
+        sniffer = AsyncSniffer(
+            prn=self._process_packet,
+            count=self.count,
+            timeout=self.timeout,
+            store=0,
+            **capture
+        )
+        sniffer.start()
         try:
-            sniff(
-                prn=self._process_packet,
-                iface=self.iface,
-                count=self.count,
-                timeout=self.timeout,
-                store=0
-            )
+            while sniffer.thread.is_alive() or not found.empty():
+                try:
+                    yield found.get(timeout=0.5)
+                except queue.Empty:
+                    continue
         except KeyboardInterrupt:
             print("\n[+] Stopping passive discovery...")
+        finally:
+            # Unblock a sniffer thread waiting on a full queue before stopping it
+            self._emit = None
+            while not found.empty():
+                found.get_nowait()
+            if sniffer.running:
+                sniffer.stop()
+            METRICS.inc("discovr_packets_total", self.packets)
+            if sock:
+                drops = self._kernel_drops(sock)
+                if drops is not None:
+                    METRICS.inc("discovr_packets_dropped_total", drops)
+                sock.close()
 
+    def run(self):
+        for _ in self.iter_assets():
+            pass
         return list(self.assets.values()), len(self.assets)
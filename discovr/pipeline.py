@@ -0,0 +1,198 @@
+import heapq
+import time
+from collections import Counter
+
+from discovr.asset import Asset
+from discovr.cache import ENRICHED_KEY, mark_enriched
+from discovr.metrics import METRICS
+from discovr.risk import RiskAssessor
+from discovr.tagger import Tagger
+
+# Sort order for "top by risk" views; unscored assets rank last
+RISK_RANK = {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}
+
+
+def tag_stage(assets):
+    """Tag assets one at a time (already enriched assets pass through)"""
+    spent = 0.0
+    try:
+        for asset in assets:
+            if not asset.get(ENRICHED_KEY):
+                start = time.perf_counter()
+                asset["Tag"] = Tagger.assign_tag(asset)
+                spent += time.perf_counter() - start
+            yield asset
+    finally:
+        METRICS.inc("discovr_stage_seconds_total", spent, stage="tag")
+
+
+def risk_stage(assets):
+    """Risk-score assets one at a time and mark them enriched"""
+    spent = 0.0
+    try:
+        for asset in assets:
+            if not asset.get(ENRICHED_KEY):
+                start = time.perf_counter()
+                asset["Risk"] = RiskAssessor.assess(asset)
+                mark_enriched(asset)
+                spent += time.perf_counter() - start
+            yield asset
+    finally:
+        METRICS.inc("discovr_stage_seconds_total", spent, stage="risk")
+
+
+class Summary:
+    def __init__(self):
+        """Aggregates counters only; assets are never retained"""
+        self.total = 0
+        self.risks = Counter()
+        self.tags = Counter()
+        self.types = Counter()
+
+    def update(self, asset):
+        self.total += 1
+        self.risks[asset.get("Risk", "Unknown")] += 1
+        self.tags[asset.get("Tag", "[Unknown]")] += 1
+        self.types[asset.get("Type", "Host")] += 1
+
+    def print(self, context="assets"):
+        print("\n" + "-" * 70)
+        print(f"[+] {self.total} {context} discovered")
+        for level in ["Critical", "High", "Medium", "Low"]:
+            if self.risks.get(level):
+                print(f"- {self.risks[level]} {level} risk")
+        if self.tags:
+            print("- Tags: " + ", ".join(f"{tag} {count}" for tag, count in self.tags.most_common()))
+        print("-" * 70)
+
+
+class ConsoleStage:
+    COLUMNS = [("IP", 16), ("Hostname", 32), ("OS", 28), ("Ports", 20), ("Tag", 14), ("Risk", 8)]
+    CLOUD_COLUMNS = [("Type", 22), ("Name", 32), ("ResourceGroup", 24), ("OS", 12), ("Tag", 14), ("Risk", 8)]
+
+    def __init__(self, cloud=False, out=None, max_rows=None):
+        """
+        Print one fixed-width row per asset as soon as it is enriched.
+        :param max_rows: Stop printing rows after this many (the rest only goes to the export files)
+        """
+        self.columns = self.CLOUD_COLUMNS if cloud else self.COLUMNS
+        self.out = out
+        self.max_rows = max_rows
+        self.rows = 0
+        self.suppressed = 0
+        self.header_printed = False
+
+    @staticmethod
+    def _cell(value, width):
+        if isinstance(value, (list, tuple)):
+            value = ",".join(map(str, value))
+        text = "" if value is None else str(value)
+        return text[:width - 1].ljust(width)
+
+    def header(self):
+        return "\n".join([
+            "".join(self._cell(name, width) for name, width in self.columns).rstrip(),
+            "".join("-" * (width - 1) + " " for _, width in self.columns).rstrip(),
+        ])
+
+    def format_row(self, asset):
+        cell = self._cell
+        ports = asset.get("Ports") or asset.get("OpenPorts")
+        return "".join(
+            cell(ports if name == "Ports" else asset.get(name), width) for name, width in self.columns
+        ).rstrip()
+
+    def _capped(self):
+        if self.max_rows is not None and self.rows >= self.max_rows:
+            self.suppressed += 1
+            return True
+        return False
+
+    def write(self, asset):
+        if self._capped():
+            return
+        if not self.header_printed:
+            print(self.header(), file=self.out)
+            self.header_printed = True
+        print(self.format_row(asset), file=self.out, flush=True)
+        self.rows += 1
+
+    def write_all(self, assets, chunk_size=500):
+        """Render rows in chunks of chunk_size lines per write instead of one print per asset"""
+        chunk = [] if self.header_printed else [self.header()]
+        self.header_printed = True
+        for asset in assets:
+            if self._capped():
+                continue
+            chunk.append(self.format_row(asset))
+            self.rows += 1
+            if len(chunk) >= chunk_size:
+                print("\n".join(chunk), file=self.out)
+                chunk = []
+        if chunk:
+            print("\n".join(chunk), file=self.out, flush=True)
+
+    def close(self):
+        if self.suppressed:
+            print(f"[!] Console output capped at {self.max_rows} rows; "
+                  f"{self.suppressed} more assets are only in the export files", file=self.out)
+
+
+class TopSink:
+    def __init__(self, n):
+        """Keep only the n highest-risk assets seen (first seen wins ties), in O(n) memory"""
+        self.n = n
+        self.seen = 0
+        self._heap = []     # (-rank, -order, asset): the root is the entry to evict next
+
+    def write(self, asset):
+        entry = (-RISK_RANK.get(asset.get("Risk"), len(RISK_RANK)), -self.seen, asset)
+        self.seen += 1
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def close(self):
+        pass
+
+    def assets(self):
+        return [entry[-1] for entry in sorted(self._heap, reverse=True)]
+
+
+def run_pipeline(source, sinks=(), console=None, summary=None):
+    """
+    Pull assets from a discovery generator through tag -> risk -> console -> sinks, one at a time.
+    :param source: iterable of asset dicts (usually a discovery module's iter_assets())
+    :param sinks: objects with write(asset) and close()
+    :param console: optional ConsoleStage
+    :return: Summary with aggregated counters
+    """
+    summary = summary or Summary()
+    try:
+        for asset in risk_stage(tag_stage(source)):
+            summary.update(asset)
+            if console:
+                console.write(asset)
+            for sink in sinks:
+                sink.write(asset)
+    finally:
+        if console:
+            console.close()
+        for sink in sinks:
+            sink.close()
+        METRICS.inc("discovr_assets_total", summary.total)
+    return summary
+
+
+class CollectSink:
+    def __init__(self, compact=True):
+        """Keep assets for the end-of-run Exporter (as compact Asset records unless compact=False)"""
+        self.compact = compact
+        self.assets = []
+
+    def write(self, asset):
+        self.assets.append(Asset.from_dict(asset) if self.compact else asset)
+
+    def close(self):
+        pass
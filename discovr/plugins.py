@@ -0,0 +1,56 @@
+import importlib
+import logging
+import time
+
+# Discovery plugins: name -> "module:attribute". Nothing is imported until a plugin is loaded, so a run
+# only pays for the SDKs of the mode it uses (scapy for passive, the Azure SDK for azure, ...).
+DISCOVERY_PLUGINS = {
+    "network": "discovr.network:NetworkDiscovery",
+    "cloud": "discovr.cloud:CloudDiscovery",
+    "azure": "discovr.azure:AzureDiscovery",
+    "gcp": "discovr.gcp:GCPDiscovery",
+    "ad": "discovr.active_directory:ADDiscovery",
+    "ad_sync": "discovr.ad_sync:ADIncrementalSync",
+    "passive": "discovr.passive:PassiveDiscovery",
+}
+
+# Third-party packages can add or override plugins through this entry point group
+ENTRY_POINT_GROUP = "discovr.plugins"
+
+_loaded = {}
+_entry_points = None
+
+
+def _external_plugins():
+    """Plugins declared by installed packages (read once, only when a name is not built in)"""
+    global _entry_points
+    if _entry_points is None:
+        from importlib.metadata import entry_points
+        _entry_points = {ep.name: ep.value for ep in entry_points(group=ENTRY_POINT_GROUP)}
+    return _entry_points
+
+
+def plugin_names():
+    return sorted(set(DISCOVERY_PLUGINS) | set(_external_plugins()))
+
+
+def load(name):
+    """
+    Import a discovery plugin on first use and return its class.
+    :param name: Registered plugin name, or a "module:attribute" target
+    :raises KeyError: unknown plugin name
+    :raises ImportError: the plugin's dependencies are not installed
+    """
+    if name in _loaded:
+        return _loaded[name]
+    target = DISCOVERY_PLUGINS.get(name) or (name if ":" in name else _external_plugins().get(name))
+    if target is None:
+        raise KeyError(f"Unknown discovery plugin: {name}")
+
+    module_name, _, attribute = target.partition(":")
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    plugin = getattr(module, attribute)
+    logging.info(f"[+] Loaded {name} plugin ({target}) in {time.perf_counter() - start:.2f}s")
+    _loaded[name] = plugin
+    return plugin
@@ -0,0 +1,147 @@
+from bisect import bisect_right
+
+MIN_PORT = 0
+MAX_PORT = 65535
+ANY_PORT = ("*", "any")
+
+
+def parse_port_spec(spec):
+    """
+    Parse a port specification into a list of (low, high) intervals.
+    Accepts "*", "Any", "80", "3000-4000", "80,443,8000-8100" or a list of any of those.
+    Unparseable tokens (e.g. "N/A", "None") are ignored.
+    """
+    if spec is None:
+        return []
+    if isinstance(spec, int):
+        return [(spec, spec)] if MIN_PORT <= spec <= MAX_PORT else []
+    if isinstance(spec, (list, tuple, set, frozenset)):
+        intervals = []
+        for item in spec:
+            intervals.extend(parse_port_spec(item))
+        return intervals
+
+    intervals = []
+    for token in str(spec).split(","):
+        token = token.strip()
+        if not token:
+            continue
+        if token.lower() in ANY_PORT:
+            intervals.append((MIN_PORT, MAX_PORT))
+            continue
+        low, sep, high = token.partition("-")
+        try:
+            low = int(low)
+            high = int(high) if sep else low
+        except ValueError:
+            continue
+        if low > high:
+            low, high = high, low
+        if low < MIN_PORT or high > MAX_PORT:
+            continue
+        intervals.append((low, high))
+    return intervals
+
+
+class PortIntervalIndex:
+    def __init__(self, intervals=()):
+        """
+        Sorted, merged set of port intervals with O(log n) membership queries.
+        :param intervals: iterable of (low, high) tuples (inclusive)
+        """
+        merged = []
+        for low, high in sorted(intervals):
+            if merged and low <= merged[-1][1] + 1:
+                if high > merged[-1][1]:
+                    merged[-1][1] = high
+            else:
+                merged.append([low, high])
+        self.starts = [low for low, _ in merged]
+        self.ends = [high for _, high in merged]
+
+    @classmethod
+    def from_specs(cls, *specs):
+        intervals = []
+        for spec in specs:
+            intervals.extend(parse_port_spec(spec))
+        return cls(intervals)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __bool__(self):
+        return bool(self.starts)
+
+    def intervals(self):
+        return list(zip(self.starts, self.ends))
+
+    def contains(self, port):
+        i = bisect_right(self.starts, port) - 1
+        return i >= 0 and port <= self.ends[i]
+
+    def any_of(self, ports):
+        """True if any of the given ports is inside the index"""
+        return any(self.contains(p) for p in ports)
+
+    def overlaps(self, low, high):
+        i = bisect_right(self.starts, high) - 1
+        return i >= 0 and self.ends[i] >= low
+
+    def difference(self, other):
+        """Port intervals of this index that other does not cover, as a new index"""
+        result, others, j = [], other.intervals(), 0
+        for low, high in self.intervals():
+            while j < len(others) and others[j][1] < low:
+                j += 1
+            k = j
+            while k < len(others) and others[k][0] <= high and low <= high:
+                if others[k][0] > low:
+                    result.append((low, others[k][0] - 1))
+                low = max(low, others[k][1] + 1)
+                k += 1
+            if low <= high:
+                result.append((low, high))
+        return PortIntervalIndex(result)
+
+    def covers_all(self):
+        return len(self.starts) == 1 and self.starts[0] <= MIN_PORT and self.ends[0] >= MAX_PORT
+
+    def to_strings(self):
+        """Render intervals as ["22", "3000-4000"]; the full port range renders as "*" """
+        if self.covers_all():
+            return ["*"]
+        return [str(low) if low == high else f"{low}-{high}" for low, high in zip(self.starts, self.ends)]
+
+
+class NSGRuleIndex:
+    # Rule sources treated as "from anywhere"
+    ANY_SOURCE = ("*", "Any")
+
+    def __init__(self, rules):
+        """
+        Parse an NSG's security rules once into interval indexes of inbound-allowed ports.
+        :param rules: list of rule dicts (Direction, Access, Source, Ports, optional PortRanges);
+            Source may list several prefixes separated by commas
+        """
+        inbound, from_any = [], []
+        self.ports = set()      # inbound-allowed port tokens as written in the rules ("22", "3000-4000", "*")
+        self.any_source = False
+        for rule in rules:
+            if str(rule.get("Direction", "")).lower() != "inbound" or str(rule.get("Access", "")).lower() != "allow":
+                continue
+            ports = rule.get("PortRanges") or rule.get("Ports")
+            intervals = parse_port_spec(ports)
+            inbound.extend(intervals)
+            if isinstance(ports, str):
+                ports = ports.split(",")
+            self.ports.update(str(p).strip() for p in ports or () if parse_port_spec(p))
+            if any(prefix.strip() in self.ANY_SOURCE for prefix in str(rule.get("Source") or "").split(",")):
+                from_any.extend(intervals)
+                self.any_source = True
+        self.inbound = PortIntervalIndex(inbound)
+        self.from_any = PortIntervalIndex(from_any)
+
+    def exposes(self, ports, from_any=False):
+        """Is any of the given ports allowed inbound (optionally: from Any source)?"""
+        index = self.from_any if from_any else self.inbound
+        return index.any_of(ports)
@@ -0,0 +1,163 @@
+import cProfile
+import contextlib
+import functools
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+_NULL = contextlib.nullcontext()
+_profiler = None
+
+
+class PhaseProfiler:
+    def __init__(self, interval=0.005):
+        """
+        Per-phase profiling: cProfile (calling thread, exact call counts) plus a stack sampler over
+        every thread (worker pools and the sniffer included) for collapsed-stack flame graphs.
+        Phases nest; each one only accounts for time not spent in the phases nested inside it.
+        :param interval: Seconds between stack samples
+        """
+        self.interval = interval
+        self.profiles = {}          # phase -> cProfile.Profile
+        self.samples = {}           # phase -> Counter of collapsed stacks
+        self.wall = Counter()       # phase -> exclusive seconds
+        self._stack = []            # active phases, innermost last
+        self._since = None
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name="discovr-profiler", daemon=True)
+        self._sampler.start()
+
+    # ---- Phases ----
+    def _pause(self):
+        if self._stack:
+            name = self._stack[-1]
+            self.profiles[name].disable()
+            self.wall[name] += time.perf_counter() - self._since
+
+    def _resume(self):
+        if self._stack:
+            self._since = time.perf_counter()
+            self.profiles[self._stack[-1]].enable()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        self._pause()
+        self._stack.append(name)
+        self.profiles.setdefault(name, cProfile.Profile())
+        self._resume()
+        try:
+            yield
+        finally:
+            self._pause()
+            self._stack.pop()
+            self._resume()
+
+    # ---- Sampling ----
+    @staticmethod
+    def _frame_label(code):
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            phase = self._stack[-1] if self._stack else None
+            if phase is None:
+                continue
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            counter = self.samples.setdefault(phase, Counter())
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                counter[";".join(reversed(stack))] += 1
+
+    # ---- Output ----
+    def stop(self):
+        while self._stack:
+            self._pause()
+            self._stack.pop()
+        self._stop.set()
+        self._sampler.join()
+
+    def write(self, out_dir, prefix):
+        """Write <prefix>_<phase>.pstats and <prefix>_<phase>.collapsed files; return their paths"""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        for name, profile in self.profiles.items():
+            path = out_dir / f"{prefix}_{name}.pstats"
+            profile.dump_stats(str(path))
+            written.append(path)
+            if self.samples.get(name):
+                path = out_dir / f"{prefix}_{name}.collapsed"
+                with open(path, "w", encoding="utf-8") as f:
+                    for stack, count in self.samples[name].most_common():
+                        f.write(f"{stack} {count}\n")
+                written.append(path)
+        return written
+
+    def summary(self, top=10):
+        """Lines with each phase's time and its top functions by own (self) time"""
+        lines = []
+        for name, profile in self.profiles.items():
+            lines.append(f"[+] Profile {name}: {self.wall[name]:.2f}s")
+            try:
+                stats = pstats.Stats(profile).stats
+            except TypeError:
+                continue        # nothing was recorded in this phase
+            ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+            for (filename, line, func), (_, calls, own, cumulative, _) in ranked:
+                where = f"{os.path.basename(filename)}:{line}" if line else filename
+                lines.append(f"    {own:8.3f}s self {cumulative:8.3f}s cum {calls:>9} calls  {func} ({where})")
+        return lines
+
+
+def enable(interval=0.005):
+    """Turn profiling on for the rest of the run"""
+    global _profiler
+    if _profiler is None:
+        _profiler = PhaseProfiler(interval)
+    return _profiler
+
+
+def phase(name):
+    """Context manager profiling one phase; a shared no-op when profiling is off"""
+    return _profiler.phase(name) if _profiler is not None else _NULL
+
+
+def profiled(name):
+    """Decorator: run the function as phase name when profiling is on (a None check otherwise)"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return func(*args, **kwargs)
+            with _profiler.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def finish(out_dir, prefix, top=10):
+    """Stop profiling, write the per-phase files and print the hot-function summary"""
+    global _profiler
+    if _profiler is None:
+        return []
+    profiler, _profiler = _profiler, None
+    profiler.stop()
+    written = profiler.write(out_dir, prefix)
+    print()
+    for line in profiler.summary(top):
+        print(line)
+    print(f"[+] Profiles saved in {out_dir} ({len(written)} files)")
+    return written
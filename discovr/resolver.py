@@ -0,0 +1,141 @@
+import json
+import logging
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+
+class DNSResolver:
+    def __init__(self, workers=32, timeout=2.0, ttl=3600, negative_ttl=300, cache_file=None):
+        """
+        Concurrent forward resolver with an in-memory (optionally persistent) TTL cache.
+        :param workers: Maximum concurrent lookups
+        :param timeout: Seconds a single lookup may take before it is abandoned
+        :param ttl: Seconds a successful answer stays cached
+        :param negative_ttl: Seconds a failed/timed-out lookup stays cached
+        :param cache_file: Optional JSON file used to persist the cache between runs
+        """
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.cache = {}
+        self.stats = {}
+        self.reset_stats()
+        self._executor = None
+        self._load_cache()
+
+    def reset_stats(self):
+        """Start counting anew, e.g. at the start of each run of a long-lived resolver"""
+        self.stats = {"lookups": 0, "cache_hits": 0, "negative_hits": 0, "failures": 0, "timeouts": 0, "elapsed": 0.0}
+
+    @staticmethod
+    def default_cache_file():
+        return Path.home() / "Documents" / "discovr_reports" / "cache" / "dns_cache.json"
+
+    @staticmethod
+    def _lookup(name):
+        return socket.gethostbyname(name)
+
+    # --------------------------
+    # Cache
+    # --------------------------
+    def _load_cache(self):
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            now = time.time()
+            self.cache = {name: (ip, expires) for name, (ip, expires) in data.items() if expires > now}
+        except Exception as e:
+            logging.error(f"[!] Failed to load DNS cache {self.cache_file}: {e}")
+
+    def save_cache(self):
+        if not self.cache_file:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            now = time.time()
+            live = {name: [ip, expires] for name, (ip, expires) in self.cache.items() if expires > now}
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(live, f)
+        except Exception as e:
+            logging.error(f"[!] Failed to save DNS cache {self.cache_file}: {e}")
+
+    def _cached(self, name):
+        hit = self.cache.get(name)
+        if hit is None:
+            return False, None
+        ip, expires = hit
+        if expires <= time.time():
+            del self.cache[name]
+            return False, None
+        return True, ip
+
+    def _store(self, name, ip):
+        ttl = self.ttl if ip else self.negative_ttl
+        self.cache[name] = (ip, time.time() + ttl)
+
+    # --------------------------
+    # Resolution
+    # --------------------------
+    def _timed_lookup(self, name, started):
+        started[name] = time.monotonic()
+        return self._lookup(name)
+
+    def resolve_many(self, names):
+        """
+        Resolve hostnames concurrently.
+        :return: dict of name -> IPv4 string, or None when unresolvable / timed out
+        """
+        begin = time.monotonic()
+        results = {}
+        todo = []
+        for name in dict.fromkeys(names):
+            found, ip = self._cached(name)
+            if found:
+                results[name] = ip
+                self.stats["cache_hits" if ip else "negative_hits"] += 1
+            else:
+                todo.append(name)
+
+        if todo:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="dns")
+            started = {}
+            pending = {self._executor.submit(self._timed_lookup, name, started): name for name in todo}
+            self.stats["lookups"] += len(todo)
+
+            while pending:
+                done, _ = wait(pending, timeout=min(self.timeout, 0.1), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        ip = future.result()
+                    except Exception:
+                        ip = None
+                        self.stats["failures"] += 1
+                    results[name] = ip
+                    self._store(name, ip)
+
+                # Abandon lookups that have been running longer than the per-query timeout
+                now = time.monotonic()
+                for future, name in list(pending.items()):
+                    if name in started and now - started[name] > self.timeout:
+                        del pending[future]
+                        future.cancel()
+                        results[name] = None
+                        self._store(name, None)
+                        self.stats["timeouts"] += 1
+
+        self.stats["elapsed"] += time.monotonic() - begin
+        return results
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.save_cache()
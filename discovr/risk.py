@@ -1,4 +1,62 @@
+import importlib.util
+from functools import lru_cache
+
+from discovr.asset import Asset
+from discovr.cache import CLASSIFIER_CACHE, ENRICHED_KEY, mark_enriched
+from discovr.ports import PortIntervalIndex, NSGRuleIndex, parse_port_spec
+
+# numpy/pandas cost ~0.4s to import, so they are only loaded when a batch is large enough to use them
+pandas_available = importlib.util.find_spec("pandas") is not None and importlib.util.find_spec("numpy") is not None
+
+
+def _normalize_ports(ports_field):
+    """Normalize a Ports/OpenPorts value into a list of strings"""
+    if isinstance(ports_field, str):
+        return [p.strip() for p in ports_field.split(",") if p.strip()]
+    elif isinstance(ports_field, (list, tuple)):
+        return [str(p).strip() for p in ports_field if p]
+    return []
+
+
+def _ports_of(asset):
+    """Ports/OpenPorts value of an asset; Assets hand over their already parsed intervals"""
+    if isinstance(asset, Asset):
+        return asset.intervals
+    return asset.get("Ports") or asset.get("OpenPorts") or []
+
+
+def _port_flags(ports_field):
+    """Return (exposes a risky port, exposes a medium port) for a Ports/OpenPorts value (ranges included)"""
+    if isinstance(ports_field, list):
+        ports_field = tuple(ports_field)
+    try:
+        return _cached_port_flags(ports_field)
+    except TypeError:
+        return _compute_port_flags(ports_field)
+
+
+def _compute_port_flags(ports_field):
+    if ports_field and isinstance(ports_field[0], tuple):
+        index = PortIntervalIndex(ports_field)
+    else:
+        index = PortIntervalIndex(parse_port_spec(_normalize_ports(ports_field)))
+    if not index:
+        return False, False
+    return index.any_of(RiskAssessor.RISKY_PORTS), index.any_of(RiskAssessor.MEDIUM_PORTS)
+
+
+_cached_port_flags = lru_cache(maxsize=4096)(_compute_port_flags)
+
+
 class RiskAssessor:
+    # --- Helper categories ---
+    RISKY_PORTS = (3389, 23, 445, 21)   # RDP, Telnet, SMB, FTP
+    MEDIUM_PORTS = (80, 443, 3306)      # HTTP, HTTPS, MySQL
+    CRITICAL_OS = ("windows xp", "windows vista", "windows 7", "server 2003", "server 2008")
+
+    # Below this many assets the per-asset path is cheaper than building the columnar view
+    BATCH_THRESHOLD = 5000
+
     @staticmethod
     def assess(asset: dict) -> str:
         """
@@ -7,47 +65,52 @@ class RiskAssessor:
         - Open ports (Ports or OpenPorts)
         - Tag
         - NSG rules (for NetworkSecurityGroup assets)
+        Results for non-NSG assets are cached by (Type, OS, Tag, Ports) signature.
         """
+        asset_type = str(asset.get("Type", "")).lower()
+        if asset_type in ["networksecuritygroup", "nsg"]:
+            return RiskAssessor._assess(asset)
+
+        ports_field = _ports_of(asset)
+        sig = ("risk", asset_type, asset.get("OS", ""), asset.get("Tag", "[Unknown]"),
+               tuple(ports_field) if isinstance(ports_field, list) else ports_field)
+        try:
+            risk = CLASSIFIER_CACHE.get(sig)
+        except TypeError:
+            return RiskAssessor._assess(asset)
+        if risk is None:
+            risk = RiskAssessor._assess(asset)
+            CLASSIFIER_CACHE.put(sig, risk)
+        return risk
 
-        asset_type = asset.get("Type", "").lower()
+    @staticmethod
+    def _assess(asset: dict) -> str:
+        asset_type = str(asset.get("Type", "")).lower()
         os_name = str(asset.get("OS", "")).lower()
         tag = asset.get("Tag", "[Unknown]")
-        ports_field = asset.get("Ports") or asset.get("OpenPorts") or []
-
-        # Normalize ports into a list of strings
-        if isinstance(ports_field, str):
-            ports = [p.strip() for p in ports_field.split(",") if p.strip()]
-        elif isinstance(ports_field, list):
-            ports = [str(p).strip() for p in ports_field if p]
-        else:
-            ports = []
-
-        # --- Helper categories ---
-        risky_ports = ["3389", "23", "445", "21"]   # RDP, Telnet, SMB, FTP
-        medium_ports = ["80", "443", "3306"]        # HTTP, HTTPS, MySQL
 
         # --------------------------
         # Network Security Group assessment
         # --------------------------
         if asset_type in ["networksecuritygroup", "nsg"]:
-            rules = asset.get("SecurityRules", [])
-            for rule in rules:
-                if rule.get("Direction", "").lower() == "inbound" and rule.get("Access", "").lower() == "allow":
-                    rule_ports = str(rule.get("Ports", ""))
-                    if rule_ports == "*" or rule.get("Source") in ["*", "Any"]:
-                        return "Critical"
-                    elif any(p in rule_ports for p in risky_ports):
-                        return "High"
-                    elif any(p in rule_ports for p in medium_ports):
-                        return "Medium"
+            # Rules limited to known sources rank below the same ports open to Any
+            index = NSGRuleIndex(asset.get("SecurityRules", []))
+            if index.from_any.covers_all() or index.exposes(RiskAssessor.RISKY_PORTS, from_any=True):
+                return "Critical"
+            if index.any_source or index.inbound.covers_all():
+                return "High"
+            if index.exposes(RiskAssessor.RISKY_PORTS) or index.exposes(RiskAssessor.MEDIUM_PORTS):
+                return "Medium"
             return "Low"
 
+        has_risky, has_medium = _port_flags(_ports_of(asset))
+
         # --------------------------
         # VM / Host / Workstation / Server assessment
         # --------------------------
 
         # --- Critical OS versions ---
-        if any(old in os_name for old in ["windows xp", "windows vista", "windows 7", "server 2003", "server 2008"]):
+        if any(old in os_name for old in RiskAssessor.CRITICAL_OS):
             return "Critical"
 
         # --- IoT / Printer ---
@@ -56,7 +119,7 @@ class RiskAssessor:
 
         # --- Mobile / Tablet ---
         if tag in ["[Mobile]", "[Tablet]"]:
-            if any(p in ports for p in risky_ports):
+            if has_risky:
                 return "High"
             return "Medium"
 
@@ -68,26 +131,26 @@ class RiskAssessor:
                 return "Medium"
             if "windows 11" in os_name or "macos" in os_name or "darwin" in os_name:
                 return "Low"
-            if any(p in ports for p in risky_ports):
+            if has_risky:
                 return "High"
 
         # --- Servers ---
         if tag == "[Server]":
             if "server 2008" in os_name or "server 2003" in os_name:
                 return "Critical"
-            if any(p in ports for p in risky_ports):
+            if has_risky:
                 return "High"
             return "Medium"
 
         # --- Network devices ---
         if tag == "[Network]":
-            if any(p in ports for p in risky_ports):
+            if has_risky:
                 return "High"
             return "Medium"
 
         # --- Web hosts ---
         if tag == "[WebHost]":
-            if any(p in ports for p in medium_ports):
+            if has_medium:
                 return "Medium"
 
         # --- Unknown assets ---
@@ -95,17 +158,98 @@ class RiskAssessor:
             return "Medium"
 
         # --- Escalate risk for ports if no other rule matched ---
-        if any(p in ports for p in risky_ports):
+        if has_risky:
             return "High"
-        elif any(p in ports for p in medium_ports):
+        elif has_medium:
             return "Medium"
 
         # --- Default fallback ---
         return "Low"
 
     @staticmethod
-    def add_risks(assets: list) -> list:
-        """Add Risk field to all assets"""
-        for asset in assets:
-            asset["Risk"] = RiskAssessor.assess(asset)
+    def assess_batch(assets: list) -> list:
+        """
+        Vectorized equivalent of assess() over a columnar view of the assets.
+        OS/Tag/Ports columns are factorized so each rule becomes a boolean mask; masks are combined
+        in assess() priority order. Returns the list of risk levels in input order.
+        """
+        if not pandas_available or not assets:
+            return [RiskAssessor.assess(a) for a in assets]
+        import numpy as np
+        import pandas as pd
+
+        def column(values):
+            """Factorize a column: per-row codes into the (few) distinct values"""
+            codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+            return codes, list(uniques)
+
+        ports_raw, nsg_rows = [], []
+        for i, a in enumerate(assets):
+            p = _ports_of(a)
+            ports_raw.append(tuple(p) if isinstance(p, list) else p if isinstance(p, (str, tuple)) else "")
+            if str(a.get("Type", "")).lower() in ["networksecuritygroup", "nsg"]:
+                nsg_rows.append(i)
+
+        # String predicates are evaluated once per distinct value, then broadcast through the codes
+        os_codes, os_uniques = column([a.get("OS", "") for a in assets])
+        os_uniques = [str(o).lower() for o in os_uniques]
+        tag_codes, tag_uniques = column([a.get("Tag", "[Unknown]") for a in assets])
+        port_codes, port_uniques = column(ports_raw)
+
+        port_flags = np.array([_port_flags(p) for p in port_uniques], dtype=bool).reshape(-1, 2)
+        risky = port_flags[port_codes, 0]
+        medium = port_flags[port_codes, 1]
+
+        def os_has(*needles):
+            return np.array([any(n in o for n in needles) for o in os_uniques], dtype=bool)[os_codes]
+
+        def tag_is(*tags):
+            return np.array([t in tags for t in tag_uniques], dtype=bool)[tag_codes]
+
+        mobile = tag_is("[Mobile]", "[Tablet]")
+        workstation = tag_is("[Workstation]")
+        server = tag_is("[Server]")
+        network = tag_is("[Network]")
+
+        # Same priority order as assess(): first matching condition wins
+        conditions = [
+            (os_has(*RiskAssessor.CRITICAL_OS), "Critical"),
+            (tag_is("[IoT]", "[Printer]"), "High"),
+            (mobile & risky, "High"),
+            (mobile, "Medium"),
+            (workstation & os_has("windows 7", "vista"), "Critical"),
+            (workstation & os_has("windows 10"), "Medium"),
+            (workstation & os_has("windows 11", "macos", "darwin"), "Low"),
+            (workstation & risky, "High"),
+            (server & os_has("server 2008", "server 2003"), "Critical"),
+            (server & risky, "High"),
+            (server, "Medium"),
+            (network & risky, "High"),
+            (network, "Medium"),
+            (tag_is("[WebHost]") & medium, "Medium"),
+            (np.array([o == "unknown" for o in os_uniques], dtype=bool)[os_codes] | tag_is("[Unknown]"), "Medium"),
+            (risky, "High"),
+            (medium, "Medium"),
+        ]
+        risks = np.select([c for c, _ in conditions], [r for _, r in conditions], default="Low").tolist()
+
+        # NSGs are scored from their rule lists
+        for i in nsg_rows:
+            risks[i] = RiskAssessor.assess(assets[i])
+        return risks
+
+    @staticmethod
+    def add_risks(assets: list, batch=None) -> list:
+        """
+        Add Risk field to all assets and mark tagged ones as enriched (already enriched assets are skipped).
+        :param batch: Force (True) or disable (False) the vectorized path; default picks by inventory size
+        """
+        pending = [a for a in assets if not a.get(ENRICHED_KEY)]
+        if batch is None:
+            batch = pandas_available and len(pending) >= RiskAssessor.BATCH_THRESHOLD
+        risks = RiskAssessor.assess_batch(pending) if batch else map(RiskAssessor.assess, pending)
+        for asset, risk in zip(pending, risks):
+            asset["Risk"] = risk
+            if "Tag" in asset:
+                mark_enriched(asset)
         return assets
@@ -0,0 +1,292 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from discovr.core import Exporter
+from discovr.metrics import METRICS
+from discovr.pipeline import risk_stage, tag_stage
+from discovr.serve import MODES, ClientPool
+
+DURATION_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([smhd]?)$")
+UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Export feature name per mode (same report names as the one-shot CLI runs, so --diff pairs them up)
+FEATURES = {"network": "network", "azure": "cloud", "gcp": "cloud", "ad": "ad", "passive": "passive"}
+
+OVERLAP = ("coalesce", "skip")
+
+
+def parse_duration(value):
+    """Seconds from 90, "90s", "15m", "6h" or "1d" """
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = DURATION_RE.match(str(value).strip().lower())
+    if not match:
+        raise ValueError(f"invalid duration '{value}' (e.g. 90s, 15m, 6h, 1d)")
+    return float(match.group(1)) * UNITS[match.group(2)]
+
+
+class Budget:
+    def __init__(self, concurrent=None, per_hour=None):
+        """
+        Limits shared by the jobs of one target (a scanner host, an Azure subscription, a domain controller).
+        :param concurrent: Runs of the target's jobs at the same time (None = no limit)
+        :param per_hour: Runs started in any 60 minutes, e.g. to stay inside an API throttling budget
+        """
+        self.concurrent = concurrent
+        self.per_hour = per_hour
+        self.running = 0
+        self.starts = deque()
+
+    def available(self, now):
+        while self.starts and now - self.starts[0] >= 3600:
+            self.starts.popleft()
+        if self.concurrent is not None and self.running >= self.concurrent:
+            return False
+        return self.per_hour is None or len(self.starts) < self.per_hour
+
+    def acquire(self, now):
+        self.running += 1
+        self.starts.append(now)
+
+    def release(self):
+        self.running -= 1
+
+
+class ScheduledJob:
+    def __init__(self, name, mode, params=None, every=3600, jitter=0, target=None, overlap="coalesce", formats=None):
+        """
+        A scan run every `every` seconds, started up to `jitter` seconds after its slot.
+        :param mode: Scan mode, as in the scan service (network, azure, gcp, ad, passive)
+        :param target: Budget the job counts against (default: its mode)
+        :param overlap: When a run is due while the previous one is still going: "coalesce" (run once
+            more as soon as it finishes, however many slots were missed) or "skip" (drop the slot)
+        :param formats: Export formats (default: the scheduler's)
+        """
+        if overlap not in OVERLAP:
+            raise ValueError(f"job '{name}': overlap must be one of {', '.join(OVERLAP)}")
+        self.name = name
+        self.mode = mode
+        self.params = params or {}
+        self.every = parse_duration(every)
+        self.jitter = parse_duration(jitter)
+        if self.every <= 0:
+            raise ValueError(f"job '{name}': interval must be positive")
+        self.target = target or mode
+        self.overlap = overlap
+        self.formats = formats
+        # State
+        self.slot = None            # nominal start of the next run
+        self.next_run = None        # slot plus this run's jitter
+        self.running = False
+        self.pending = False        # a coalesced run waits for the current one
+        self.waiting = False        # due but held back by a budget
+        self.stats = {"runs": 0, "failed": 0, "skipped": 0, "coalesced": 0, "delayed": 0,
+                      "assets": 0, "seconds": 0.0, "error": None}
+
+    def plan(self, slot, rng):
+        self.slot = slot
+        self.next_run = slot + rng.uniform(0, self.jitter)
+
+    def due(self, now):
+        return self.pending or (self.next_run is not None and now >= self.next_run)
+
+
+class Scheduler:
+    def __init__(self, jobs, max_concurrent=4, budgets=None, formats=("jsonl",), inventory=None, modes=None,
+                 seed=None):
+        """
+        Run scan jobs on their intervals inside global and per-target budgets, exporting each run's
+        assets like a one-shot CLI run would. Start times are spread with jitter so jobs sharing an
+        interval do not all fire together, and runs that would overlap are skipped or coalesced.
+        :param max_concurrent: Runs at the same time across all jobs
+        :param budgets: Target name -> Budget (targets without one are only bound by max_concurrent)
+        :param inventory: Also record every run in the SQLite inventory ("" = default path, None = off)
+        :param modes: Extra or replacement modes, name -> context manager factory (scheduler, params) -> scanner
+        """
+        self.modes = {**MODES, **(modes or {})}
+        for job in jobs:
+            if job.mode not in self.modes:
+                raise ValueError(f"job '{job.name}': unknown mode '{job.mode}' "
+                                 f"(available: {', '.join(sorted(self.modes))})")
+        names = [job.name for job in jobs]
+        if len(set(names)) != len(names):
+            raise ValueError("job names must be unique")
+        self.jobs = jobs
+        self.max_concurrent = max(1, max_concurrent)
+        self.budgets = budgets or {}
+        self.formats = list(formats)
+        self.inventory = inventory
+        self.clients = ClientPool()     # warm clients between runs, as in the scan service
+        self.running = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._threads = {}
+        self._stamps = set()
+
+    @classmethod
+    def load(cls, path, **overrides):
+        """
+        Build a scheduler from a JSON schedule file:
+            {"max_concurrent": 4, "jitter": "5m", "formats": ["jsonl"],
+             "budgets": {"azure-prod": {"concurrent": 1, "per_hour": 20}},
+             "jobs": [{"name": "dc-subnet", "mode": "network", "every": "1h",
+                       "params": {"range": "10.0.0.0/24", "parallel": 8}},
+                      {"name": "prod", "mode": "azure", "every": "6h", "target": "azure-prod",
+                       "params": {"subscription": "..."}}]}
+        A top-level "jitter" or "overlap" is the default for jobs that do not set one.
+        :param overrides: Constructor arguments that replace the file's (e.g. formats from --format)
+        """
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+        defaults = {k: spec[k] for k in ("jitter", "overlap") if k in spec}
+        jobs = []
+        for entry in spec.get("jobs", []):
+            if "name" not in entry or "mode" not in entry:
+                raise ValueError(f"schedule job needs a name and a mode: {entry}")
+            jobs.append(ScheduledJob(**{**defaults, **entry}))
+        budgets = {name: Budget(b.get("concurrent"), b.get("per_hour")) for name, b in spec.get("budgets", {}).items()}
+        options = {"max_concurrent": spec.get("max_concurrent", 4), "budgets": budgets}
+        if "formats" in spec:
+            options["formats"] = spec["formats"]
+        options.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(jobs, **options)
+
+    # ---- Scheduling ----
+    def start(self, now):
+        """Plan every job's first run somewhere inside its first jitter window"""
+        for job in self.jobs:
+            job.plan(now, self._rng)
+
+    def _advance(self, job, now):
+        """Move the job to its first slot after now (missed slots collapse into the run being started or dropped)"""
+        slot = job.slot + job.every
+        if slot <= now:
+            slot += job.every * ((now - slot) // job.every + 1)
+        job.plan(slot, self._rng)
+
+    def tick(self, now):
+        """Start every due job the budgets allow; returns the jobs started"""
+        started = []
+        with self._lock:
+            for job in sorted((j for j in self.jobs if j.due(now)), key=lambda j: (not j.pending, j.next_run)):
+                if job.running:
+                    if not job.pending and now >= job.next_run:
+                        if job.overlap == "skip":
+                            job.stats["skipped"] += 1
+                            METRICS.inc("discovr_schedule_skipped_total", job=job.name)
+                            logging.info("[!] %s is still running; skipped its %s run",
+                                         job.name, datetime.fromtimestamp(job.slot).strftime("%H:%M:%S"))
+                        else:
+                            job.pending = True
+                            job.stats["coalesced"] += 1
+                        self._advance(job, now)
+                    continue
+                budget = self.budgets.get(job.target)
+                if self.running >= self.max_concurrent or (budget and not budget.available(now)):
+                    if not job.waiting:
+                        job.waiting = True
+                        job.stats["delayed"] += 1
+                        METRICS.inc("discovr_schedule_delayed_total", job=job.name, target=job.target)
+                    continue
+                if budget:
+                    budget.acquire(now)
+                self.running += 1
+                job.running, job.pending, job.waiting = True, False, False
+                if now >= job.next_run:
+                    self._advance(job, now)
+                thread = threading.Thread(target=self._execute, args=(job,), name=f"discovr-schedule-{job.name}",
+                                          daemon=True)
+                self._threads[job.name] = thread
+                thread.start()
+                started.append(job)
+            METRICS.set("discovr_schedule_running", self.running)
+        return started
+
+    def next_wakeup(self, now):
+        """
+        Earliest planned run still ahead. Jobs held back by a budget are retried when a run finishes
+        (which wakes the loop) or at the next poll (per-hour budgets free up with time).
+        """
+        planned = [job.next_run for job in self.jobs if job.next_run is not None and job.next_run > now]
+        return min(planned) if planned else None
+
+    # ---- Runs ----
+    def _timestamp(self, feature):
+        """Report timestamp, bumped a second at a time so two runs of one feature never share a file"""
+        moment = datetime.now()
+        while (feature, stamp := moment.strftime("%Y%m%d_%H%M%S")) in self._stamps:
+            moment += timedelta(seconds=1)
+        self._stamps.add((feature, stamp))
+        return stamp
+
+    def _execute(self, job):
+        start = time.perf_counter()
+        status = "done"
+        try:
+            with self.modes[job.mode](self, job.params) as scanner:
+                assets = list(risk_stage(tag_stage(scanner.iter_assets())))
+            feature = FEATURES.get(job.mode, job.mode)
+            with self._lock:
+                timestamp = self._timestamp(feature)
+            if assets:
+                Exporter.save_results(assets, job.formats or self.formats, feature, timestamp)
+                if self.inventory is not None:
+                    Exporter.save_inventory(assets, feature, timestamp, self.inventory or None)
+            job.stats["assets"] += len(assets)
+            job.stats["error"] = None
+            logging.info("[+] %s finished: %d assets in %.2fs", job.name, len(assets), time.perf_counter() - start)
+        except Exception as e:
+            status = "failed"
+            job.stats["error"] = str(e) or e.__class__.__name__
+            logging.error("[!] Scheduled job %s (%s) failed: %s", job.name, job.mode, job.stats["error"])
+        seconds = time.perf_counter() - start
+        METRICS.inc("discovr_schedule_runs_total", job=job.name, status=status)
+        METRICS.observe("discovr_schedule_run_seconds", seconds, job=job.name)
+        with self._lock:
+            job.stats["runs" if status == "done" else "failed"] += 1
+            job.stats["seconds"] += seconds
+            job.running = False
+            self.running -= 1
+            budget = self.budgets.get(job.target)
+            if budget:
+                budget.release()
+        self._wake.set()
+
+    def wait(self, timeout=None):
+        """Wait for the runs in progress to finish"""
+        for thread in list(self._threads.values()):
+            thread.join(timeout)
+
+    def run(self, stop=None, poll=60):
+        """
+        Schedule jobs until stop is set (or Ctrl+C), then let the runs in progress finish.
+        :param poll: Longest sleep between checks (budgets free up without a wake-up)
+        """
+        stop = stop or threading.Event()
+        self.start(time.time())
+        print(f"[+] Scheduler: {len(self.jobs)} jobs, up to {self.max_concurrent} at once")
+        try:
+            while not stop.is_set():
+                now = time.time()
+                for job in self.tick(now):
+                    print(f"[+] Started {job.name} ({job.mode}); next run {datetime.fromtimestamp(job.next_run):%H:%M:%S}")
+                wakeup = self.next_wakeup(now)
+                self._wake.wait(min(poll, max(0.0, wakeup - now)) if wakeup is not None else poll)
+                self._wake.clear()
+        except KeyboardInterrupt:
+            print("\n[!] Stopping; waiting for running scans to finish (Ctrl+C again to abort)")
+        self.wait()
+
+    def print_summary(self):
+        for job in self.jobs:
+            s = job.stats
+            line = (f"{job.name}: {s['runs']} runs, {s['assets']} assets in {s['seconds']:.1f}s | "
+                    f"failed {s['failed']}, skipped {s['skipped']}, coalesced {s['coalesced']}, delayed {s['delayed']}")
+            print(f"[!] {line} (last error: {s['error']})" if s["error"] else f"[+] {line}")
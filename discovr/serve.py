@@ -0,0 +1,422 @@
+import hashlib
+import hmac
+import ipaddress
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from discovr import plugins
+from discovr.metrics import METRICS
+from discovr.pipeline import risk_stage, tag_stage
+from discovr.ports import parse_port_spec
+from discovr.resolver import DNSResolver
+
+
+class QueueFull(Exception):
+    """The job queue is at capacity; the client should retry later"""
+
+
+class ClientPool:
+    def __init__(self, max_age=600, max_idle=4):
+        """
+        Discovery clients kept warm between jobs (credentials, SDK clients, LDAP binds), pooled by
+        connection parameters. A leased client is used by one job at a time; clients older than
+        max_age seconds are dropped instead of reused.
+        :param max_idle: Idle clients kept per key
+        """
+        self.max_age = max_age
+        self.max_idle = max_idle
+        self._idle = {}         # key -> [(created, client)]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _close(client):
+        close = getattr(client, "close", None)
+        if close:
+            close()
+
+    @contextmanager
+    def lease(self, key, create):
+        client, created = None, None
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle and client is None:
+                created, candidate = idle.pop()
+                if time.monotonic() - created < self.max_age:
+                    client = candidate
+                else:
+                    self._close(candidate)
+        if client is None:
+            client, created = create(), time.monotonic()
+        else:
+            METRICS.inc("discovr_serve_client_reuse_total", mode=key[0])
+        healthy = False
+        try:
+            yield client
+            healthy = True
+        finally:
+            # A client whose run failed (expired bind, revoked credentials) is closed, not pooled
+            if healthy:
+                with self._lock:
+                    idle = self._idle.setdefault(key, [])
+                    if len(idle) < self.max_idle:
+                        idle.append((created, client))
+                        client = None
+            if client is not None:
+                self._close(client)
+
+
+def _secret(value):
+    """Stand-in for a password in cache keys and job listings"""
+    return hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).hexdigest() if value else None
+
+
+def _error_count():
+    """API and nmap errors recorded so far (process-wide)"""
+    return METRICS.total("discovr_api_errors_total", "discovr_nmap_failures_total")
+
+
+def _require(params, *names):
+    missing = [n for n in names if not params.get(n)]
+    if missing:
+        raise ValueError(f"missing parameter(s): {', '.join(missing)}")
+
+
+# Upper bound on a request's nmap workers
+MAX_PARALLEL = 64
+
+
+def _port_list(value):
+    """
+    Normalised nmap port list ("22,80,8000-8100") from a request's ports; anything else is refused,
+    since the value ends up on the nmap command line
+    """
+    if isinstance(value, int):
+        value = str(value)
+    if not isinstance(value, str):
+        raise ValueError("ports must be a port list like 22,80,8000-8100")
+    ports = []
+    for token in value.split(","):
+        token = token.strip()
+        if not token.replace("-", "").isdigit() or not parse_port_spec(token):
+            raise ValueError(f"invalid port '{token}' (expected a port list like 22,80,8000-8100)")
+        ports.extend(f"{low}-{high}" if low != high else str(low) for low, high in parse_port_spec(token))
+    return ",".join(ports)
+
+
+def _network_options(params):
+    """
+    Validated (range, ports, parallel) of a network scan request
+    :raises ValueError: missing or invalid range, ports or parallel
+    """
+    _require(params, "range")
+    try:
+        network_range = str(ipaddress.IPv4Network(str(params["range"]), strict=False))
+    except ValueError as e:
+        raise ValueError(f"invalid range: {e}")
+    ports = _port_list(params["ports"]) if params.get("ports") not in (None, "") else None
+    try:
+        parallel = int(params.get("parallel", 8))
+    except (TypeError, ValueError):
+        raise ValueError("parallel must be an integer")
+    if not 1 <= parallel <= MAX_PARALLEL:
+        raise ValueError(f"parallel must be between 1 and {MAX_PARALLEL}")
+    return network_range, ports, parallel
+
+
+# ---- Modes: context managers (service, params) -> scanner with iter_assets() ----
+@contextmanager
+def _network_scanner(service, params):
+    yield plugins.load("network")(*_network_options(params))
+
+
+@contextmanager
+def _azure_scanner(service, params):
+    _require(params, "subscription")
+    with service.clients.lease(("azure", params["subscription"]),
+                               lambda: plugins.load("azure")(params["subscription"])) as scanner:
+        yield scanner
+
+
+@contextmanager
+def _gcp_scanner(service, params):
+    _require(params, "project", "zone")
+    yield plugins.load("gcp")(params["project"], params["zone"], raise_errors=True)
+
+
+@contextmanager
+def _ad_scanner(service, params):
+    _require(params, "domain", "username", "password")
+    page_size = int(params.get("page_size", 1000))
+    key = ("ad", params["domain"], params["username"], _secret(params["password"]), page_size)
+    create = lambda: plugins.load("ad")(params["domain"], params["username"], params["password"],
+                                        page_size=page_size, resolver=DNSResolver(), keep_bound=True,
+                                        raise_errors=True)
+    with service.clients.lease(key, create) as scanner:
+        yield scanner
+
+
+@contextmanager
+def _passive_scanner(service, params):
+    _require(params, "iface")
+    yield plugins.load("passive")(iface=params["iface"], timeout=int(params.get("timeout", 60)))
+
+
+MODES = {
+    "network": _network_scanner,
+    "azure": _azure_scanner,
+    "gcp": _gcp_scanner,
+    "ad": _ad_scanner,
+    "passive": _passive_scanner,
+}
+
+# Mode -> request check run by submit(), so a bad request is refused before it is queued
+CHECKS = {
+    "network": _network_options,
+}
+
+
+class Job:
+    def __init__(self, job_id, mode, params, key):
+        self.id = job_id
+        self.mode = mode
+        self.params = params
+        self.key = key
+        self.status = "queued"
+        self.error = None
+        self.assets = []
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.changed = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed")
+
+    def to_dict(self):
+        params = {k: ("***" if k == "password" else v) for k, v in self.params.items()}
+        return {"id": self.id, "mode": self.mode, "params": params, "status": self.status, "error": self.error,
+                "assets": len(self.assets), "created": self.created, "started": self.started,
+                "finished": self.finished}
+
+    def follow(self, poll=1.0):
+        """Yield the job's assets, waiting for new ones until the job finishes"""
+        sent = 0
+        while True:
+            with self.changed:
+                while sent == len(self.assets) and not self.done:
+                    self.changed.wait(poll)
+                batch = self.assets[sent:]
+                finished = self.done
+            yield from batch
+            sent += len(batch)
+            if finished and sent == len(self.assets):
+                return
+
+
+class ScanService:
+    def __init__(self, workers=4, max_queue=100, cache_ttl=300, max_jobs=1000, modes=None):
+        """
+        Resident scan service: a bounded job queue served by a fixed pool of worker threads.
+        Discovery clients stay warm between jobs (ClientPool: credentials, LDAP binds, DNS caches), and finished
+        results are reused for identical requests made within cache_ttl seconds.
+        :param workers: Jobs running at the same time
+        :param max_queue: Jobs waiting for a worker before submit() raises QueueFull
+        :param max_jobs: Finished jobs kept for lookups (oldest dropped first)
+        :param modes: Extra or replacement modes, name -> context manager factory (service, params) -> scanner
+        """
+        self.modes = {**MODES, **(modes or {})}
+        self.cache_ttl = cache_ttl
+        self.max_jobs = max_jobs
+        self.clients = ClientPool()
+        self.jobs = OrderedDict()
+        self._results = {}          # cache key -> latest job (queued, running or done)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.busy = 0
+        self._workers = [threading.Thread(target=self._work, name=f"discovr-serve-{i}", daemon=True)
+                         for i in range(max(1, workers))]
+        for worker in self._workers:
+            worker.start()
+
+    # ---- Jobs ----
+    @staticmethod
+    def cache_key(mode, params):
+        safe = {k: (_secret(v) if k == "password" else v) for k, v in params.items()}
+        return mode, json.dumps(safe, sort_keys=True, default=str)
+
+    def submit(self, mode, params=None, refresh=False):
+        """
+        Queue a scan, or return the job of an identical request that is still running or finished
+        less than cache_ttl seconds ago (concurrent identical requests share one scan).
+        :raises ValueError: unknown mode or invalid parameters
+        :raises QueueFull: too many jobs waiting
+        :return: (job, whether it came from the cache)
+        """
+        if mode not in self.modes:
+            raise ValueError(f"unknown mode '{mode}' (available: {', '.join(sorted(self.modes))})")
+        params = params or {}
+        if mode in CHECKS:
+            CHECKS[mode](params)
+        key = self.cache_key(mode, params)
+        with self._lock:
+            cached = self._results.get(key) if self.cache_ttl and not refresh else None
+            if cached and (not cached.done or time.time() - cached.finished < self.cache_ttl):
+                METRICS.inc("discovr_serve_cache_hits_total", mode=mode)
+                return cached, True
+            job = Job(f"{next(self._ids):06d}", mode, params, key)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                METRICS.inc("discovr_serve_rejected_total", mode=mode)
+                raise QueueFull(f"{self._queue.qsize()} jobs already queued")
+            self.jobs[job.id] = job
+            self._results[key] = job
+            self._evict()
+        METRICS.inc("discovr_serve_jobs_total", mode=mode)
+        return job, False
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+            job = self.jobs.pop(job_id)
+            if self._results.get(job.key) is job:
+                del self._results[job.key]
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self.busy += 1
+            self._run(job)
+            with self._lock:
+                self.busy -= 1
+
+    def _run(self, job):
+        with job.changed:
+            job.status, job.started = "running", time.time()
+        errors = _error_count()
+        try:
+            with self.modes[job.mode](self, job.params) as scanner:
+                for asset in risk_stage(tag_stage(scanner.iter_assets())):
+                    with job.changed:
+                        job.assets.append(asset)
+                        job.changed.notify_all()
+            status = "done"
+        except Exception as e:
+            job.error = str(e) or e.__class__.__name__
+            logging.error("[!] Scan job %s (%s) failed: %s", job.id, job.mode, job.error)
+            status = "failed"
+        with job.changed:
+            job.status, job.finished = status, time.time()
+            job.changed.notify_all()
+        METRICS.observe("discovr_serve_job_seconds", job.finished - job.started, mode=job.mode)
+        # An empty result that came with errors (e.g. every nmap scan failed) is not worth reusing
+        if status == "failed" or (not job.assets and _error_count() > errors):
+            with self._lock:
+                if self._results.get(job.key) is job:
+                    del self._results[job.key]
+
+    def health(self):
+        return {"workers": len(self._workers), "busy": self.busy, "queued": self._queue.qsize(),
+                "jobs": len(self.jobs), "cached_results": len(self._results)}
+
+
+def create_app(service, token=None):
+    """
+    FastAPI app exposing a ScanService
+    :param token: Require "Authorization: Bearer <token>" on every endpoint
+    """
+    from fastapi import Body, Depends, FastAPI, Header, HTTPException
+    from fastapi.responses import PlainTextResponse, StreamingResponse
+
+    def authorize(authorization: str = Header(None)):
+        if token and not hmac.compare_digest((authorization or "").encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+            raise HTTPException(status_code=401, detail="missing or invalid bearer token",
+                                headers={"WWW-Authenticate": "Bearer"})
+
+    app = FastAPI(title="Discovr scan service", dependencies=[Depends(authorize)])
+
+    def lookup(job_id):
+        job = service.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"no job {job_id}")
+        return job
+
+    @app.post("/scans", status_code=202)
+    def submit(mode: str = Body(...), params: dict = Body(default_factory=dict), refresh: bool = Body(False)):
+        try:
+            job, cached = service.submit(mode, params, refresh)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except QueueFull as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+        return {**job.to_dict(), "cached": cached}
+
+    @app.get("/scans")
+    def jobs():
+        with service._lock:         # submit() adds jobs from other request threads
+            jobs = list(service.jobs.values())
+        return [job.to_dict() for job in reversed(jobs)]
+
+    @app.get("/scans/{job_id}")
+    def status(job_id: str):
+        return lookup(job_id).to_dict()
+
+    @app.get("/scans/{job_id}/assets")
+    def assets(job_id: str):
+        """Assets as JSON Lines, streamed while the scan runs"""
+        job = lookup(job_id)
+        lines = (json.dumps({k: v for k, v in a.items() if not k.startswith("_")}, default=str) + "\n"
+                 for a in job.follow())
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    @app.get("/health")
+    def health():
+        return service.health()
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics():
+        health = service.health()
+        METRICS.set("discovr_serve_queue_depth", health["queued"])
+        METRICS.set("discovr_serve_busy_workers", health["busy"])
+        return METRICS.prometheus()
+
+    return app
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+def serve(address="127.0.0.1:8080", workers=4, max_queue=100, cache_ttl=300, token=None):
+    """
+    Run the scan service until interrupted
+    :param token: Bearer token clients must send; required to listen beyond loopback
+    :raises ValueError: non-loopback address without a token
+    """
+    host, _, port = address.rpartition(":")
+    host = host or "127.0.0.1"
+    if not token and not is_loopback(host):
+        raise ValueError(f"refusing to listen on {host} without a token (set DISCOVR_SERVE_TOKEN or --serve-token)")
+    import uvicorn
+
+    service = ScanService(workers=workers, max_queue=max_queue, cache_ttl=cache_ttl)
+    print(f"[+] Discovr scan service on http://{host}:{port} ({workers} workers, "
+          f"queue {max_queue}, result cache {cache_ttl}s{', token required' if token else ''})")
+    uvicorn.run(create_app(service, token), host=host, port=int(port), log_level="warning")
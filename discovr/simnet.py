@@ -0,0 +1,224 @@
+import ipaddress
+import random
+import socket
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from xml.sax.saxutils import quoteattr
+
+import nmap
+
+from discovr.ports import PortIntervalIndex
+
+# Host profiles: (hostname prefix, nmap OS match or None, open TCP ports)
+PROFILES = [
+    ("ws", "Microsoft Windows 10 1809 - 21H2", [135, 139, 445, 3389]),
+    ("dc", "Microsoft Windows Server 2019", [53, 88, 135, 389, 445, 636, 3389]),
+    ("web", "Linux 5.0 - 5.14", [22, 80, 443]),
+    ("srv", "Linux 4.15 - 5.8", [22]),
+    ("printer", "HP LaserJet M479fdw printer", [80, 443, 631, 9100]),
+    ("router", "Cisco IOS 15.X", [22, 23, 80]),
+    ("camera", None, [80, 554]),
+    ("db", "Linux 5.0 - 5.14", [22, 1433, 5432]),
+]
+
+
+class SimulatedNetwork:
+    def __init__(self, network_range="10.99.0.0/24", hosts=None, profiles=None,
+                 latency=0.0, jitter=0.0, loss=0.0, seed=42):
+        """
+        A fake subnet for running the scan engines offline: live hosts with a hostname, an OS and
+        open ports, picked deterministically from seed. NetworkDiscovery scans it through
+        scanner(), which replays nmap XML through python-nmap's own parser.
+        :param hosts: Number of live hosts (default: every address in the range)
+        :param profiles: Host profiles to draw from (default: PROFILES)
+        :param latency: Seconds one nmap run takes, plus up to jitter seconds
+        :param loss: Probability that a scan misses a live host (reported down, as nmap does)
+        """
+        self.network = ipaddress.IPv4Network(network_range, strict=False)
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.seed = seed
+        rnd = random.Random(seed)
+        addresses = [str(ip) for ip in self.network]
+        live = sorted(rnd.sample(range(len(addresses)), min(hosts, len(addresses)))) if hosts else range(len(addresses))
+        self.hosts = {}
+        for i in live:
+            prefix, os_name, ports = rnd.choice(profiles or PROFILES)
+            self.hosts[addresses[i]] = {
+                "hostname": f"{prefix}{i:05d}.sim.local" if rnd.random() < 0.8 else "",
+                "os": os_name,
+                "ports": sorted(ports),
+            }
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    # ---- Expected results ----
+    def expected(self, ports=None):
+        """What a lossless scan should find: IP -> (hostname, open ports), optionally limited to a port spec"""
+        wanted = PortIntervalIndex.from_specs(ports) if ports else None
+        return {
+            ip: (host["hostname"] or "Unknown",
+                 [p for p in host["ports"] if wanted is None or wanted.contains(p)])
+            for ip, host in self.hosts.items()
+        }
+
+    def check(self, assets, ports=None):
+        """
+        Compare NetworkDiscovery results with expected().
+        :return: dict of missing, unexpected and wrong (hostname or ports differ) host counts
+        """
+        expected = self.expected(ports)
+        found = {a["IP"]: a for a in assets}
+        wrong = 0
+        for ip, asset in found.items():
+            if ip in expected:
+                hostname, open_ports = expected[ip]
+                reported = [] if asset["Ports"] == "None" else [int(p) for p in asset["Ports"].split(",")]
+                if asset["Hostname"] != hostname or sorted(reported) != open_ports:
+                    wrong += 1
+        return {
+            "missing": len(expected.keys() - found.keys()),
+            "unexpected": len(found.keys() - expected.keys()),
+            "wrong": wrong,
+        }
+
+    # ---- nmap XML ----
+    def _dropped(self, ip):
+        """Deterministic per (seed, host, attempt), so reruns lose the same probes"""
+        if not self.loss:
+            return False
+        with self._lock:
+            attempt = self._attempts[ip] = self._attempts.get(ip, 0) + 1
+        return random.Random(f"{self.seed}/{ip}/{attempt}").random() < self.loss
+
+    def _host_xml(self, ip, wanted, os_detection):
+        host = self.hosts[ip]
+        lines = ['<host><status state="up" reason="syn-ack"/>', f'<address addr="{ip}" addrtype="ipv4"/>']
+        if host["hostname"]:
+            lines.append(f'<hostnames><hostname name={quoteattr(host["hostname"])} type="PTR"/></hostnames>')
+        else:
+            lines.append("<hostnames/>")
+        lines.append("<ports>")
+        # Open ports in the scanned set; ports asked for one by one are also listed when closed, as nmap does
+        shown = {p for p in host["ports"] if wanted is None or wanted[0].contains(p)}
+        if wanted is not None:
+            shown.update(wanted[1])
+        for port in sorted(shown):
+            state = "open" if port in host["ports"] else "closed"
+            lines.append(f'<port protocol="tcp" portid="{port}"><state state="{state}" reason="syn-ack"/></port>')
+        lines.append("</ports>")
+        if os_detection and host["os"]:
+            lines.append(f'<os><osmatch name={quoteattr(host["os"])} accuracy="96" line="1"/></os>')
+        lines.append("</host>")
+        return "".join(lines)
+
+    def xml(self, targets, arguments="-O -T4", drop=True):
+        """nmap -oX style output for a scan of targets (an address or CIDR range) with the given arguments"""
+        args = arguments.split()
+        wanted = None       # (port index, single ports named in -p)
+        if "-p" in args:
+            spec = args[args.index("-p") + 1]
+            wanted = (PortIntervalIndex.from_specs(spec), {int(p) for p in spec.split(",") if p.isdigit()})
+        scanned = [str(ip) for ip in ipaddress.IPv4Network(targets, strict=False)]
+        up = [ip for ip in scanned if ip in self.hosts and not (drop and self._dropped(ip))]
+        hosts = "".join(self._host_xml(ip, wanted, "-O" in args) for ip in up)
+        return (
+            f'<?xml version="1.0"?><nmaprun scanner="nmap" args={quoteattr("nmap -oX - " + arguments + " " + targets)}>'
+            f'<scaninfo type="syn" protocol="tcp" numservices="1000" services="1-1000"/>{hosts}'
+            f'<runstats><finished time="0" timestr="simulated" elapsed="{self.latency:.2f}"/>'
+            f'<hosts up="{len(up)}" down="{len(scanned) - len(up)}" total="{len(scanned)}"/></runstats></nmaprun>'
+        )
+
+    def record(self, path, arguments="-O -T4"):
+        """Write a recording of a lossless scan of the whole range (replay it with FakePortScanner)"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.xml(str(self.network), arguments, drop=False))
+        return path
+
+    def scanner(self):
+        """scanner_factory for NetworkDiscovery"""
+        return FakePortScanner(network=self)
+
+    @staticmethod
+    def replay(path):
+        """
+        scanner_factory replaying a recorded `nmap -oX` file (see record()). The file is parsed once
+        here and shared by every scanner the factory builds; each scan picks out its own hosts.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            recorded = FakePortScanner().analyse_nmap_xml_scan(f.read())
+        return lambda: FakePortScanner(recorded=recorded)
+
+    # ---- Live hosts on loopback ----
+    @contextmanager
+    def serve(self, backlog=64):
+        """
+        Listen on every open port of every host, for engines that open real connections.
+        The range must be inside 127.0.0.0/8 (Linux routes all of it to lo); ports below 1024 need root.
+        """
+        if not self.network.subnet_of(ipaddress.IPv4Network("127.0.0.0/8")):
+            raise ValueError("live hosts need a range inside 127.0.0.0/8")
+        sockets = []
+        try:
+            for ip, host in self.hosts.items():
+                for port in host["ports"]:
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                    sock.bind((ip, port))
+                    sock.listen(backlog)
+                    sockets.append(sock)
+            yield sockets
+        finally:
+            for sock in sockets:
+                sock.close()
+
+    @contextmanager
+    def netem(self, dev="lo"):
+        """
+        Apply latency and loss to real traffic on dev with tc netem (root only; affects all traffic on dev).
+        """
+        command = ["tc", "qdisc", "add", "dev", dev, "root", "netem",
+                   "delay", f"{self.latency * 1000:.0f}ms", f"{self.jitter * 1000:.0f}ms", "loss", f"{self.loss:.2%}"]
+        subprocess.run(command, check=True)
+        try:
+            yield
+        finally:
+            subprocess.run(["tc", "qdisc", "del", "dev", dev, "root"], check=False)
+
+
+class FakePortScanner(nmap.PortScanner):
+    def __init__(self, network=None, recorded=None):
+        """
+        Drop-in nmap.PortScanner that never starts nmap. Results are nmap XML parsed by python-nmap
+        itself: generated from a SimulatedNetwork (with its latency and loss), or taken from a parsed
+        recording (SimulatedNetwork.replay()), one host at a time.
+        """
+        # nmap.PortScanner.__init__ looks for the nmap binary; skip it
+        self._nmap_path = "nmap"
+        self._scan_result = {}
+        self._nmap_version_number = 7
+        self._nmap_subversion_number = 0
+        self._nmap_last_output = ""
+        self._network = network
+        self._recorded = recorded
+
+    def scan(self, hosts="127.0.0.1", ports=None, arguments="-sV", sudo=False, timeout=0):
+        if ports:
+            arguments = f"-p {ports} {arguments}"
+        if self._recorded is not None:
+            recorded = self._recorded["scan"]
+            scanned = ipaddress.IPv4Network(hosts, strict=False)
+            if scanned.num_addresses <= len(recorded):
+                found = {ip: recorded[ip] for ip in map(str, scanned) if ip in recorded}
+            else:
+                found = {ip: result for ip, result in recorded.items() if ipaddress.IPv4Address(ip) in scanned}
+            self._scan_result = {"nmap": self._recorded["nmap"], "scan": found}
+            return self._scan_result
+
+        network = self._network
+        if network.latency or network.jitter:
+            time.sleep(network.latency + random.uniform(0, network.jitter))
+        return self.analyse_nmap_xml_scan(network.xml(hosts, arguments))
@@ -0,0 +1,329 @@
+import csv
+import importlib.util
+import json
+import logging
+import os
+import textwrap
+import time
+
+from discovr.cache import public_view
+from discovr.metrics import METRICS
+
+# pyarrow is imported by ParquetSink on first use; it adds ~0.2s to every start otherwise
+parquet_available = importlib.util.find_spec("pyarrow") is not None
+
+try:
+    import zstandard
+    zstd_available = True
+except ImportError:
+    zstd_available = False
+
+
+def flatten_dict(d, parent_key="", sep="."):
+    """Flatten nested dicts into dotted keys; lists become ';'-joined strings"""
+    items = []
+    for k, v in d.items():
+        new_key = f"{parent_key}{sep}{k}" if parent_key else k
+        if isinstance(v, dict):
+            items.extend(flatten_dict(v, new_key, sep=sep).items())
+        elif isinstance(v, list):
+            items.append((new_key, ";".join(map(str, v))))
+        else:
+            items.append((new_key, v))
+    return dict(items)
+
+
+class FileSink:
+    label = "File"
+    available = True
+    missing_hint = ""
+
+    def __init__(self, path, flush_every=500, flush_interval=2.0):
+        """
+        Base for exporters that write assets to disk as they arrive.
+        Data is flushed every flush_every assets or flush_interval seconds, so a crash loses little.
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.count = 0
+        self.write_time = 0.0
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self.f = self._open()
+
+    def _open(self):
+        return open(self.path, "w", newline="", encoding="utf-8")
+
+    def write(self, asset):
+        start = time.perf_counter()
+        self._write(public_view(asset))
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        self.write_time += time.perf_counter() - start
+
+    def _write(self, asset):
+        raise NotImplementedError
+
+    def flush(self):
+        self.f.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def _finish(self):
+        pass
+
+    def close(self):
+        if self.f.closed:
+            return
+        start = time.perf_counter()
+        self._finish()
+        self.f.close()
+        self.write_time += time.perf_counter() - start
+        size = os.path.getsize(self.path)
+        METRICS.inc("discovr_stage_seconds_total", self.write_time, stage="export", format=self.label)
+        logging.info(
+            f"[+] {self.label} export: {self.count} assets, {size / 1024:,.1f} KiB, "
+            f"{self.write_time:.2f}s writing ({self.path})"
+        )
+        print(f"[+] {self.label} saved: {self.path}")
+
+
+class JSONLSink(FileSink):
+    label = "JSON Lines"
+
+    def _write(self, asset):
+        self.f.write(json.dumps(asset, default=str))
+        self.f.write("\n")
+
+
+class ZstdJSONLSink(FileSink):
+    label = "JSON Lines (zstd)"
+    available = zstd_available
+    missing_hint = "zstandard library not installed. Run: pip install zstandard"
+
+    def __init__(self, path, level=3, **kwargs):
+        """
+        zstd-compressed JSON Lines. Records are encoded into a batch that is compressed in one call
+        at every flush; each flush ends a zstd block, so everything flushed so far stays decodable.
+        """
+        self.level = level
+        self._lines = []
+        super().__init__(path, **kwargs)
+
+    def _open(self):
+        self.raw = open(self.path, "wb")
+        return zstandard.ZstdCompressor(level=self.level).stream_writer(self.raw, closefd=True)
+
+    def _write(self, asset):
+        self._lines.append(json.dumps(asset, default=str))
+
+    def flush(self):
+        if self._lines:
+            self._lines.append("")
+            self.f.write("\n".join(self._lines).encode("utf-8"))
+            self._lines = []
+        self.f.flush(zstandard.FLUSH_BLOCK)
+        self.raw.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def _finish(self):
+        self.flush()
+
+
+class JSONArraySink(FileSink):
+    label = "JSON"
+
+    def __init__(self, path, **kwargs):
+        """Writes the same indented JSON array as json.dump(assets, indent=4), one element at a time"""
+        super().__init__(path, **kwargs)
+        self.f.write("[")
+
+    def _write(self, asset):
+        self.f.write(",\n" if self.count else "\n")
+        self.f.write(textwrap.indent(json.dumps(asset, indent=4, default=str), "    "))
+
+    def _finish(self):
+        self.f.write("\n]" if self.count else "]")
+
+
+class CSVSink(FileSink):
+    label = "CSV"
+    # Column holding (as JSON) keys that appear after the header was written
+    EXTRA_COLUMN = "_extra"
+
+    def __init__(self, path, fieldnames=None, sample_size=200, **kwargs):
+        """
+        Flat CSV written row by row.
+        :param fieldnames: Declared columns; otherwise they are discovered from the first sample_size assets
+        """
+        super().__init__(path, **kwargs)
+        self.sample_size = sample_size
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.writer = None
+        self.extra_rows = 0
+        self._sample = []
+        if self.fieldnames:
+            self._start(extra_column=True)
+
+    def _start(self, extra_column):
+        self.writer = csv.writer(self.f)
+        self.extra_column = extra_column
+        self.writer.writerow(self.fieldnames + [self.EXTRA_COLUMN] if extra_column else self.fieldnames)
+        self._columns = set(self.fieldnames)
+        for row in self._sample:
+            self._write_row(row)
+        self._sample = []
+
+    def _write_row(self, row):
+        values = [row.get(k) for k in self.fieldnames]
+        if self.extra_column:
+            extra = {k: v for k, v in row.items() if k not in self._columns}
+            if extra:
+                self.extra_rows += 1
+            values.append(json.dumps(extra, default=str) if extra else "")
+        self.writer.writerow(values)
+
+    def _write(self, asset):
+        row = flatten_dict(asset)
+        if self.writer:
+            self._write_row(row)
+            return
+        self._sample.append(row)
+        if len(self._sample) >= self.sample_size:
+            self.fieldnames = sorted({k for r in self._sample for k in r})
+            self._start(extra_column=True)
+
+    def flush(self):
+        # Rows still held for schema discovery are not on disk yet; keep them until the header is known
+        if self.writer:
+            super().flush()
+
+    def _finish(self):
+        if self.writer is None and self._sample:
+            # Everything fit in the sample: exact header, no extra column
+            self.fieldnames = sorted({k for r in self._sample for k in r})
+            self._start(extra_column=False)
+
+
+class ParquetSink(FileSink):
+    label = "Parquet"
+    available = parquet_available
+    missing_hint = "pyarrow library not installed. Run: pip install pyarrow"
+    EXTRA_COLUMN = "_extra"
+    # Free-form key/value fields stored as map<string, string> instead of a struct per distinct key set
+    MAP_FIELDS = ("Tags", "Provenance")
+
+    def __init__(self, path, row_group_size=100_000, compression="zstd", **kwargs):
+        """
+        Typed columnar export. Assets are buffered and written one row group at a time; the schema is
+        inferred from the first row group (nested dicts become structs). Keys or values that do not fit
+        it later are kept as JSON in the _extra column; a nested dict with a key its struct lacks goes
+        there whole.
+        """
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.schema = None
+        self.writer = None
+        self._rows = []
+        super().__init__(path, flush_every=row_group_size, flush_interval=float("inf"), **kwargs)
+
+    def _open(self):
+        return open(self.path, "wb")
+
+    def _write(self, asset):
+        row = dict(asset)
+        for key in self.MAP_FIELDS:
+            value = row.get(key)
+            if isinstance(value, dict):
+                row[key] = [(str(k), None if v is None else str(v)) for k, v in value.items()]
+        self._rows.append(row)
+
+    def _infer_schema(self, rows):
+        import pyarrow as pa
+        names = list(dict.fromkeys(key for row in rows for key in row))
+        fields = []
+        for name in names:
+            if name in self.MAP_FIELDS:
+                fields.append(pa.field(name, pa.map_(pa.string(), pa.string())))
+                continue
+            try:
+                dtype = pa.array([row.get(name) for row in rows]).type
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                dtype = pa.string()     # mixed types: the odd ones out go to _extra
+            fields.append(pa.field(name, pa.string() if pa.types.is_null(dtype) else dtype))
+        fields.append(pa.field(self.EXTRA_COLUMN, pa.string()))
+        return pa.schema(fields)
+
+    @classmethod
+    def _fits_struct(cls, value, dtype):
+        """False when a nested dict carries keys the schema's struct does not have (Arrow would drop them)"""
+        import pyarrow as pa
+        if value is None:
+            return True
+        if pa.types.is_struct(dtype):
+            if not isinstance(value, dict):
+                return True     # not a dict at all: the type check below catches it
+            fields = {dtype.field(i).name: dtype.field(i).type for i in range(dtype.num_fields)}
+            return all(k in fields and cls._fits_struct(v, fields[k]) for k, v in value.items())
+        if pa.types.is_list(dtype) and isinstance(value, (list, tuple)):
+            return all(cls._fits_struct(v, dtype.value_type) for v in value)
+        return True
+
+    def _to_table(self, rows):
+        import pyarrow as pa
+        columns, extras = {}, [{} for _ in rows]
+        for field in self.schema:
+            if field.name == self.EXTRA_COLUMN:
+                continue
+            values = [row.get(field.name) for row in rows]
+            if pa.types.is_struct(field.type) or pa.types.is_list(field.type):
+                for i, (extra, value) in enumerate(zip(extras, values)):
+                    if not self._fits_struct(value, field.type):
+                        extra[field.name] = value
+                        values[i] = None
+            try:
+                columns[field.name] = pa.array(values, type=field.type)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Values of another type than the schema's: keep them as JSON instead
+                kept = []
+                for extra, value in zip(extras, values):
+                    try:
+                        pa.array([value], type=field.type)
+                        kept.append(value)
+                    except (pa.ArrowInvalid, pa.ArrowTypeError):
+                        extra[field.name] = value
+                        kept.append(None)
+                columns[field.name] = pa.array(kept, type=field.type)
+
+        names = set(columns)
+        for extra, row in zip(extras, rows):
+            for key, value in row.items():
+                if key not in names:
+                    extra[key] = value
+        columns[self.EXTRA_COLUMN] = pa.array(
+            [json.dumps(e, default=str) if e else None for e in extras], type=pa.string()
+        )
+        return pa.Table.from_pydict(columns, schema=self.schema)
+
+    def flush(self):
+        import pyarrow.parquet as pq
+        if self._rows:
+            if self.schema is None:
+                self.schema = self._infer_schema(self._rows)
+                self.writer = pq.ParquetWriter(self.f, self.schema, compression=self.compression)
+            self.writer.write_table(self._to_table(self._rows), row_group_size=self.row_group_size)
+            self._rows = []
+        self._pending = 0
+
+    def _finish(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.flush()
+        if self.writer:
+            self.writer.close()
+        else:
+            pq.write_table(pa.table({self.EXTRA_COLUMN: pa.array([], type=pa.string())}), self.f)
@@ -1,58 +1,188 @@
+import itertools
+import json
+import re
+from pathlib import Path
+
+from discovr.cache import CLASSIFIER_CACHE, ENRICHED_KEY
+
+DEFAULT_RULES_FILE = Path(__file__).parent / "rules" / "tag_rules.json"
+DIGIT_RUNS = re.compile(r"[0-9]+")
+
+# Distinct id per compiled rule set, part of its classifier cache keys
+_RULESET_IDS = itertools.count(1)
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple, set)):
+        return ",".join(map(str, value)).lower()
+    return str(value).lower()
+
+
+class TagRuleSet:
+    # Per-field memo of raw value -> feature mask; reset when it grows past this many entries
+    MEMO_LIMIT = 200_000
+
+    def __init__(self, rules, default="[Unknown]"):
+        """
+        Compile an ordered list of tag rules (first match wins).
+        Each rule: {"tag": str, "when": {field: [substrings]}, "unless": {field: [substrings]}}
+        A rule matches when every "when" field contains any of its substrings
+        and no "unless" substring is present.
+        """
+        self.default = default
+        self.bits = {}          # (field, token) -> bit
+        self.compiled = []      # (tag, [required masks], forbidden mask)
+
+        for rule in rules:
+            required = [self._mask(field, tokens) for field, tokens in rule.get("when", {}).items()]
+            forbidden = 0
+            for field, tokens in rule.get("unless", {}).items():
+                forbidden |= self._mask(field, tokens)
+            self.compiled.append((rule["tag"], required, forbidden))
+
+        # One combined matcher per field. A lookahead at every position reports the longest token
+        # starting there; shorter tokens starting at the same position are its prefixes, so each
+        # match also sets the bits of all token prefixes.
+        self.fields = {}
+        for field in sorted({f for f, _ in self.bits}):
+            tokens = sorted((t for f, t in self.bits if f == field), key=len, reverse=True)
+            pattern = re.compile("(?=(" + "|".join(re.escape(t) for t in tokens) + "))")
+            closure = {
+                t: sum(self.bits[(field, p)] for p in tokens if t.startswith(p))
+                for t in tokens
+            }
+            self.fields[field] = (pattern, closure, {})
+
+        # Digit runs can be collapsed in a field's signature when none of its tokens contain digits
+        self.collapse_items = [
+            (field, not any(ch.isdigit() or ch == "#" for f, t in self.bits if f == field for ch in t))
+            for field in self.fields
+        ]
+        self._tags = {}
+        self.id = next(_RULESET_IDS)
+
+    def _mask(self, field, tokens):
+        mask = 0
+        for token in tokens:
+            token = token.lower()
+            if not token:
+                continue
+            bit = self.bits.setdefault((field, token), 1 << len(self.bits))
+            mask |= bit
+        return mask
+
+    @classmethod
+    def load(cls, path=None):
+        with open(path or DEFAULT_RULES_FILE, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(config.get("rules", []), config.get("default", "[Unknown]"))
+
+    def _compute_mask(self, field, value):
+        """Slow path: lowercase the raw field value, run the field matcher and memoize by raw value"""
+        pattern, closure, memo = self.fields[field]
+        text = _text(value)
+        mask = 0
+        for token in pattern.findall(text):
+            mask |= closure[token]
+        if isinstance(value, str):
+            if len(memo) >= self.MEMO_LIMIT:
+                memo.clear()
+            memo[value] = mask
+        return mask
+
+    def tag_for_mask(self, mask):
+        tag = self._tags.get(mask)
+        if tag is None:
+            tag = self.default
+            for rule_tag, required, forbidden in self.compiled:
+                if mask & forbidden:
+                    continue
+                if all(mask & r for r in required):
+                    tag = rule_tag
+                    break
+            self._tags[mask] = tag
+        return tag
+
+    def assign(self, asset):
+        mask = 0
+        for field, (_, _, memo) in self.fields.items():
+            value = asset.get(field)
+            m = memo.get(value) if value.__class__ is str else None
+            mask |= self._compute_mask(field, value) if m is None else m
+        return self.tag_for_mask(mask)
+
+    def signature(self, asset):
+        """
+        Normalized tuple of the fields the rules look at; assets with equal signatures get the same tag.
+        Fields whose tokens contain no digits (e.g. Hostname) are lowercased with digit runs collapsed,
+        so HR-PC01 and HR-PC02 share the pattern "hr-pc#".
+        """
+        sig = []
+        for field, collapse in self.collapse_items:
+            value = asset.get(field)
+            if collapse:
+                value = DIGIT_RUNS.sub("#", value.lower() if value.__class__ is str else _text(value))
+            elif value.__class__ is not str:
+                value = _text(value)
+            sig.append(value)
+        return tuple(sig)
+
+    def tag_all(self, assets, key="Tag", cache=CLASSIFIER_CACHE):
+        """Batch path of assign(): same result, with the per-asset work inlined"""
+        specs = [(field, memo) for field, (_, _, memo) in self.fields.items()]
+        compute = self._compute_mask
+        tags = self._tags
+        tag_for_mask = self.tag_for_mask
+        signature = self.signature
+        for asset in assets:
+            if asset.get(ENRICHED_KEY):
+                continue
+            sig = ("tag", self.id, signature(asset))
+            tag = cache.get(sig)
+            if tag is None:
+                mask = 0
+                for field, memo in specs:
+                    value = asset.get(field)
+                    m = memo.get(value) if value.__class__ is str else None
+                    mask |= compute(field, value) if m is None else m
+                tag = tags.get(mask)
+                if tag is None:
+                    tag = tag_for_mask(mask)
+                cache.put(sig, tag)
+            asset[key] = tag
+        return assets
+
+
 class Tagger:
+    rules = None
+
+    @staticmethod
+    def load_rules(path=None):
+        """Load and compile tag rules from a JSON file (default: bundled rules/tag_rules.json)"""
+        Tagger.rules = TagRuleSet.load(path)
+        CLASSIFIER_CACHE.clear()
+        return Tagger.rules
+
+    @staticmethod
+    def get_rules():
+        if Tagger.rules is None:
+            Tagger.load_rules()
+        return Tagger.rules
+
     @staticmethod
     def assign_tag(asset: dict) -> str:
-        """Assigns a role tag to an asset based on hostname, OS, or IP clues"""
-        hostname = asset.get("Hostname", "").lower()
-        os_name = asset.get("OS", "").lower()
-        ports = asset.get("Ports", "").lower()
-
-        # --- Mobile ---
-        if any(mobile in hostname for mobile in ["iphone", "android", "pixel", "galaxy"]):
-            return "[Mobile]"
-        if "ios" in os_name and "macos" not in os_name:
-            return "[Mobile]"
-        if "android" in os_name:
-            return "[Mobile]"
-
-        # --- Tablet ---
-        if "ipad" in hostname or "tablet" in hostname:
-            return "[Tablet]"
-        if "ipad" in os_name or "ipad os" in os_name:
-            return "[Tablet]"
-
-        # --- macOS ---
-        if "macos" in os_name or "os x" in os_name or ("darwin" in os_name and "ios" not in os_name):
-            return "[Workstation]"
-
-        # --- Windows Workstation ---
-        if "windows 10" in os_name or "windows 11" in os_name:
-            return "[Workstation]"
-
-        # --- Servers ---
-        if "server" in os_name or "linux" in os_name:
-            return "[Server]"
-
-        # --- Printers ---
-        if "printer" in hostname:
-            return "[Printer]"
-
-        # --- IoT ---
-        if "camera" in hostname or "iot" in hostname or "chromecast" in hostname:
-            return "[IoT]"
-
-        # --- Network Devices ---
-        if "router" in hostname or "switch" in hostname or "firewall" in hostname:
-            return "[Network]"
-
-        # --- Web Hosts ---
-        if "80" in ports or "443" in ports:
-            return "[WebHost]"
-
-        return "[Unknown]"
+        """Assigns a role tag to an asset based on hostname, OS, or port clues"""
+        rules = Tagger.get_rules()
+        sig = ("tag", rules.id, rules.signature(asset))
+        tag = CLASSIFIER_CACHE.get(sig)
+        if tag is None:
+            tag = rules.assign(asset)
+            CLASSIFIER_CACHE.put(sig, tag)
+        return tag
 
     @staticmethod
     def tag_assets(assets: list) -> list:
-        """Tag a list of assets and add 'Tag' key"""
-        for asset in assets:
-            asset["Tag"] = Tagger.assign_tag(asset)
-        return assets
+        """Tag a list of assets and add 'Tag' key (assets already enriched are left as they are)"""
+        return Tagger.get_rules().tag_all(assets)
@@ -1,6 +1,109 @@
 from discovr.core import Reporter
 from discovr.tagger import Tagger
 from discovr.risk import RiskAssessor
+from discovr import active_directory
+from discovr.active_directory import ADDiscovery, PAGED_RESULTS_OID
+
+
+class MockConnection:
+    """Minimal stand-in for ldap3.Connection serving computer objects in pages"""
+
+    def __init__(self, computers):
+        self.computers = computers
+        self.response = []
+        self.result = {}
+        self.searches = []
+        self.unbound = False
+
+    def search(self, search_base, search_filter, attributes=None, paged_size=None, paged_cookie=None, controls=None):
+        self.searches.append({"filter": search_filter, "paged_size": paged_size, "cookie": paged_cookie})
+        start = int(paged_cookie or 0)
+        end = start + paged_size
+        self.response = [
+            {"type": "searchResEntry", "dn": f"CN={c['cn']}", "attributes": c}
+            for c in self.computers[start:end]
+        ]
+        cookie = str(end).encode() if end < len(self.computers) else b""
+        self.result = {"controls": {PAGED_RESULTS_OID: {"value": {"cookie": cookie}}}}
+        return True
+
+    def unbind(self):
+        self.unbound = True
+
+
+def _mock_scanner(monkeypatch, computers, page_size):
+    conn = MockConnection(computers)
+    scanner = ADDiscovery("mydomain.local", "admin", "secret", page_size=page_size)
+    monkeypatch.setattr(active_directory, "ad_available", True)
+    monkeypatch.setattr(scanner, "_connect", lambda: conn)
+    monkeypatch.setattr(scanner.resolver, "_lookup", lambda name: "10.0.0.1")
+    return scanner, conn
+
+
+def test_paged_search_streams_all_pages(monkeypatch):
+    computers = [
+        {"cn": f"PC{i}", "dNSHostName": f"pc{i}.mydomain.local",
+         "operatingSystem": "Windows 10 Pro", "operatingSystemVersion": []}
+        for i in range(25)
+    ]
+    scanner, conn = _mock_scanner(monkeypatch, computers, page_size=10)
+
+    pages = list(scanner.iter_pages())
+
+    assert [len(p) for p in pages] == [10, 10, 5]
+    assert [s["paged_size"] for s in conn.searches] == [10, 10, 10]
+    assert pages[0][0] == {"IP": "10.0.0.1", "Hostname": "pc0.mydomain.local", "OS": "Windows 10 Pro", "Ports": "N/A"}
+    assert conn.unbound
+
+
+def test_missing_dns_hostname_falls_back_to_cn(monkeypatch):
+    computers = [{"cn": "LEGACY01", "dNSHostName": [], "operatingSystem": [], "operatingSystemVersion": []}]
+    scanner, _ = _mock_scanner(monkeypatch, computers, page_size=1000)
+
+    assets = scanner.run()
+
+    assert assets == [{"IP": "10.0.0.1", "Hostname": "LEGACY01", "OS": "Unknown", "Ports": "N/A"}]
+
+
+def test_address_attribute_skips_dns_lookup(monkeypatch):
+    computers = [
+        {"cn": "SRV01", "dNSHostName": "srv01.mydomain.local", "operatingSystem": "Windows Server 2019",
+         "operatingSystemVersion": "10.0", "ipHostNumber": ["192.168.1.30"], "networkAddress": []},
+        {"cn": "SRV02", "dNSHostName": "srv02.mydomain.local", "operatingSystem": "Windows Server 2019",
+         "operatingSystemVersion": "10.0", "ipHostNumber": [], "networkAddress": []},
+    ]
+    scanner, _ = _mock_scanner(monkeypatch, computers, page_size=1000)
+
+    assets = scanner.run()
+
+    assert [a["IP"] for a in assets] == ["192.168.1.30", "10.0.0.1"]
+    assert scanner.resolver.stats["lookups"] == 1
+
+    # Stats cover one run only; the second run is answered from the resolver's cache
+    scanner.run()
+    assert scanner.resolver.stats["lookups"] == 0 and scanner.resolver.stats["cache_hits"] == 1
+
+
+def test_kept_connection_is_dropped_and_error_raised_when_asked(monkeypatch):
+    import pytest
+
+    class DroppedConnection(MockConnection):
+        bound = True        # ldap3 keeps reporting bound after a server-side idle drop
+
+        def search(self, *args, **kwargs):
+            raise ConnectionError("socket closed")
+
+    scanner = ADDiscovery("mydomain.local", "admin", "secret", keep_bound=True, raise_errors=True)
+    monkeypatch.setattr(active_directory, "ad_available", True)
+    scanner._conn = DroppedConnection([])
+    with pytest.raises(ConnectionError):
+        list(scanner.iter_assets())
+    assert scanner._conn is None        # the next run binds again
+
+    quiet, _ = _mock_scanner(monkeypatch, [], page_size=10)
+    monkeypatch.setattr(quiet, "_connect", lambda: DroppedConnection([]))
+    assert quiet.run() == []            # CLI runs still log and carry on
+
 
 def run_mock_ad_test():
     print("[+] Running Active Directory Discovery Test (Simulated)")
@@ -0,0 +1,92 @@
+import re
+from types import SimpleNamespace
+
+from discovr import active_directory
+from discovr.active_directory import ADDiscovery, PAGED_RESULTS_OID
+from discovr.ad_sync import ADIncrementalSync, ADInventoryStore, SHOW_DELETED_OID
+
+
+class MockDirectory:
+    """ldap3.Connection stand-in that honours uSNChanged/isDeleted filters and the show-deleted control"""
+
+    def __init__(self):
+        self.usn = 0
+        self.objects = {}
+        self.server = SimpleNamespace(host="dc01", info=SimpleNamespace(other={}))
+        self.response, self.result, self.returned = [], {}, 0
+
+    def commit(self, guid, **attributes):
+        self.usn += 1
+        obj = self.objects.setdefault(guid, {"objectGUID": guid, "isDeleted": False})
+        obj.update(attributes, uSNChanged=self.usn)
+        self.server.info.other = {"dnsHostName": ["dc01.corp.local"], "highestCommittedUSN": [str(self.usn)]}
+
+    def delete(self, guid):
+        self.commit(guid, isDeleted=True)
+
+    def search(self, search_base, search_filter, attributes=None, paged_size=None, paged_cookie=None, controls=None):
+        since = re.search(r"uSNChanged>=(\d+)", search_filter)
+        since = int(since.group(1)) if since else 0
+        want_deleted = "isDeleted=TRUE" in search_filter
+        show_deleted = any(c[0] == SHOW_DELETED_OID for c in controls or [])
+        matches = [
+            o for o in self.objects.values()
+            if o["uSNChanged"] >= since and o["isDeleted"] == want_deleted and (show_deleted or not o["isDeleted"])
+        ]
+        self.returned += len(matches)
+        self.response = [{"type": "searchResEntry", "attributes": dict(o)} for o in matches]
+        self.result = {"controls": {PAGED_RESULTS_OID: {"value": {"cookie": b""}}}}
+
+    def unbind(self):
+        pass
+
+
+def _sync(monkeypatch, directory, state_file, **kwargs):
+    scanner = ADDiscovery("corp.local", "admin", "secret")
+    monkeypatch.setattr(active_directory, "ad_available", True)
+    monkeypatch.setattr(scanner, "_connect", lambda: directory)
+    monkeypatch.setattr(scanner.resolver, "_lookup", lambda name: "10.0.0.1")
+    return ADIncrementalSync(scanner, store=ADInventoryStore(state_file), **kwargs)
+
+
+def test_incremental_sync_fetches_only_changes(monkeypatch, tmp_path):
+    directory = MockDirectory()
+    for i in range(50):
+        directory.commit(f"guid-{i}", cn=f"PC{i}", dNSHostName=f"pc{i}.corp.local", operatingSystem="Windows 10 Pro")
+    state_file = tmp_path / "corp.json"
+
+    first = _sync(monkeypatch, directory, state_file)
+    assert len(first.run()) == 50
+    assert first.changes["mode"] == "full"
+
+    directory.commit("guid-3", operatingSystem="Windows 11 Pro")
+    directory.commit("guid-new", cn="PCNEW", dNSHostName="pcnew.corp.local", operatingSystem="Windows 11 Pro")
+    directory.delete("guid-7")
+    directory.returned = 0
+
+    second = _sync(monkeypatch, directory, state_file)
+    assets = second.run()
+
+    assert second.changes == {"mode": "incremental", "added": 1, "updated": 1, "deleted": 1}
+    assert directory.returned == 3
+    assert len(assets) == 50
+    by_host = {a["Hostname"]: a for a in assets}
+    assert by_host["pc3.corp.local"]["OS"] == "Windows 11 Pro"
+    assert "pc7.corp.local" not in by_host
+
+
+def test_full_reconcile_drops_objects_without_tombstones(monkeypatch, tmp_path):
+    directory = MockDirectory()
+    for i in range(5):
+        directory.commit(f"guid-{i}", cn=f"PC{i}", operatingSystem="Windows 10 Pro")
+    state_file = tmp_path / "corp.json"
+    _sync(monkeypatch, directory, state_file).run()
+
+    # Tombstone already garbage-collected: only a full reconcile notices the deletion
+    del directory.objects["guid-2"]
+    sync = _sync(monkeypatch, directory, state_file, full_sync_interval=0)
+    assets = sync.run()
+
+    assert sync.changes["mode"] == "full"
+    assert sync.changes["deleted"] == 1
+    assert len(assets) == 4
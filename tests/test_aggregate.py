@@ -0,0 +1,48 @@
+import csv
+
+from discovr.aggregate import Aggregation
+from discovr.core import Exporter, Reporter
+
+
+def azure_inventory(groups=3):
+    assets = []
+    for g in range(groups):
+        rg = f"RG-{g}"
+        assets.append({"Type": "ResourceGroup", "Name": rg, "Location": "westeurope", "Tags": None})
+        for v in range(g + 1):
+            assets.append({"Type": "VirtualMachine", "Name": f"vm{g}{v}", "ResourceGroup": rg.lower(),
+                           "Risk": "High" if v == 0 else "Low", "_enriched": True})
+        assets.append({"Type": "VirtualNetwork", "Name": f"vnet{g}", "ResourceGroup": rg, "Risk": "Low"})
+        assets.append({"Type": "NetworkSecurityGroup", "Name": f"nsg{g}", "ResourceGroup": rg, "Risk": "Critical",
+                       "SecurityRules": [], "_enriched": True})
+    return assets
+
+
+def test_single_pass_buckets():
+    aggregation = Aggregation(azure_inventory())
+    assert list(aggregation.groups) == ["rg-0", "rg-1", "rg-2"]
+    bucket = aggregation.groups["rg-2"]
+    assert bucket.name == "RG-2"
+    assert (len(bucket.vms), bucket.high_risk_vms, len(bucket.vnets), len(bucket.nsgs), bucket.high_risk_nsgs) == (3, 1, 1, 1, 1)
+    assert len(aggregation.by_type["VirtualMachine"]) == 6
+    assert aggregation.risks["Critical"] == 3
+
+
+def test_host_assets_fall_into_unknown_group():
+    aggregation = Aggregation([{"IP": "10.0.0.1", "Risk": "Low"}, {"IP": "10.0.0.2", "ResourceGroup": None}])
+    assert list(aggregation.groups) == ["unknownrg"]
+    assert len(aggregation.groups["unknownrg"].others) == 2
+
+
+def test_azure_summary_csv_matches_rg_names_case_insensitively(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assets = azure_inventory()
+    Reporter.print_results(assets, len(assets), "cloud assets")
+    assert "Summary for Resource Group 'rg-1'" in capsys.readouterr().out
+
+    Exporter.save_azure_csv(assets, "20250101_000000")
+    summary = tmp_path / "Documents" / "discovr_reports" / "csv" / "azure_20250101_000000" / "azure_summary_20250101_000000.csv"
+    with open(summary, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["ResourceGroup"], r["VMCount"], r["VMHighRisk"], r["NSGHighRisk"]) for r in rows] == [
+        ("RG-0", "1", "1", "1"), ("RG-1", "2", "1", "1"), ("RG-2", "3", "1", "1")]
@@ -0,0 +1,48 @@
+import ipaddress
+import pickle
+
+from discovr.asset import Asset, compact
+from discovr.cache import ENRICHED_KEY, public_view
+from discovr.risk import RiskAssessor
+from discovr.tagger import Tagger
+
+SHAPES = [
+    {"IP": "192.168.1.10", "Hostname": "laptop01", "OS": "Windows 10 Pro", "Ports": "135,445"},
+    {"IP": "192.168.1.11", "Hostname": "Unknown", "OS": "Unknown", "Ports": "None"},
+    {"IP": "N/A", "Hostname": "MAC-aa:bb:cc:dd:ee:ff", "OS": "Unknown", "Ports": "N/A"},
+    {"IP": "fe80::1", "Hostname": "pc0.mydomain.local", "OS": "Windows 11 Pro", "Ports": "N/A"},
+    {"Type": "VirtualMachine", "Name": "web-vm", "ResourceGroup": "rg1", "OS": "Linux",
+     "Networking": {"PrivateIP": "10.1.0.4", "PublicIP": None}, "OpenPorts": ["22", "3000-4000"], "Tags": None},
+    {"Type": "NetworkSecurityGroup", "Name": "nsg1", "SecurityRules": [{"Ports": "*", "Source": "*"}]},
+    {"OpenPorts": ["*"], "Ports": "80, 443"},
+    {"IP": None, "Ports": [22, 80], "Tag": "[Server]", "Risk": "High", ENRICHED_KEY: True},
+]
+
+
+def test_round_trip_is_lossless():
+    for shape in SHAPES:
+        asset = Asset.from_dict(shape)
+        assert asset.to_dict() == shape
+        assert list(asset.to_dict()) == list(shape)
+        assert pickle.loads(pickle.dumps(asset)) == shape
+
+
+def test_fields_are_parsed_once():
+    host, vm = Asset.from_dict(SHAPES[0]), Asset.from_dict(SHAPES[4])
+    assert host.ip == ipaddress.ip_address("192.168.1.10")
+    assert host.intervals == ((135, 135), (445, 445))
+    assert vm.intervals == ((22, 22), (3000, 4000))
+    assert vm.port_index().contains(3389)
+    assert Asset.from_dict(SHAPES[2]).ip is None
+    assert Asset.from_dict(SHAPES[1]).intervals is Asset.from_dict(SHAPES[2]).intervals
+
+
+def test_assets_work_with_enrichment_and_export():
+    dicts = [dict(s) for s in SHAPES[:4]]
+    assets = compact(dict(s) for s in SHAPES[:4])
+    RiskAssessor.add_risks(Tagger.tag_assets(dicts), batch=False)
+    RiskAssessor.add_risks(Tagger.tag_assets(assets), batch=False)
+
+    assert [public_view(a) for a in assets] == [public_view(d) for d in dicts]
+    assert all(a.enriched for a in assets)
+    assert ENRICHED_KEY not in public_view(assets[0])
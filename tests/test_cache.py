@@ -0,0 +1,54 @@
+from discovr.cache import LRUCache, CLASSIFIER_CACHE, ENRICHED_KEY, public_view
+from discovr.risk import RiskAssessor
+from discovr.tagger import Tagger
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+    assert len(cache) == 2
+
+
+def test_hostname_pattern_signature_shares_results():
+    CLASSIFIER_CACHE.clear()
+    assets = [{"Hostname": f"HR-PC{i:02d}.corp.local", "OS": "Windows 10 Pro", "Ports": "135,445"} for i in range(50)]
+
+    Tagger.tag_assets(assets)
+    RiskAssessor.add_risks(assets, batch=False)
+
+    assert {a["Tag"] for a in assets} == {"[Workstation]"}
+    assert {a["Risk"] for a in assets} == {"Medium"}
+    stats = CLASSIFIER_CACHE.stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 98
+
+
+def test_digit_tokens_disable_collapsing(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text('{"rules": [{"tag": "[Lab]", "when": {"Hostname": ["lab1"]}}]}')
+    try:
+        Tagger.load_rules(rules_file)
+        assert Tagger.assign_tag({"Hostname": "lab1-pc"}) == "[Lab]"
+        assert Tagger.assign_tag({"Hostname": "lab2-pc"}) == "[Unknown]"
+    finally:
+        Tagger.load_rules()
+
+
+def test_enriched_assets_are_skipped_and_not_exported():
+    assets = Tagger.tag_assets([{"Hostname": "printer01", "OS": "Unknown", "Ports": "9100"}])
+    RiskAssessor.add_risks(assets)
+    assert assets[0][ENRICHED_KEY] is True
+
+    assets[0]["Risk"] = "Low"  # a later re-run must not recompute enriched assets
+    Tagger.tag_assets(assets)
+    RiskAssessor.add_risks(assets)
+    assert assets[0]["Risk"] == "Low"
+    assert ENRICHED_KEY not in public_view(assets[0])
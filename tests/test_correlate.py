@@ -0,0 +1,85 @@
+import json
+
+from discovr.correlate import Correlator, asset_identity, correlate_reports
+from discovr.risk import RiskAssessor
+from discovr.tagger import Tagger
+
+NETWORK = [{"IP": "10.0.0.5", "Hostname": "Unknown", "OS": "Unknown", "Ports": "135,445,3389"}]
+PASSIVE = [
+    {"IP": "10.0.0.5", "Hostname": "MAC-aa:bb:cc:dd:ee:01", "OS": "Unknown", "Ports": "N/A"},
+    {"IP": "N/A", "Hostname": "DHCP-aabbccddee010000000000000000000000", "OS": "Unknown", "Ports": "N/A"},
+]
+AD = [{"IP": "N/A", "Hostname": "hr-pc01.corp.local", "OS": "Windows 7 Professional", "Ports": "N/A"}]
+AZURE = [
+    {"Type": "VirtualMachine", "Name": "hr-pc01", "ResourceId": "/subscriptions/1/vm/hr-pc01",
+     "Networking": {"PrivateIP": "10.0.0.5", "PublicIP": None}, "OpenPorts": ["3389"]},
+    {"Type": "ResourceGroup", "Name": "rg1"},
+]
+
+
+def test_identity_keys():
+    assert asset_identity(PASSIVE[1])["macs"] == {"aa:bb:cc:dd:ee:01"}
+    ident = asset_identity(AD[0])
+    assert ident["fqdn"] == "hr-pc01.corp.local" and ident["short"] == "hr-pc01"
+    assert asset_identity(AZURE[0])["ips"] == {"10.0.0.5"}
+
+
+def test_merges_sources_with_provenance():
+    correlator = Correlator()
+    for source, assets in [("network", NETWORK), ("passive", PASSIVE), ("ad", AD), ("azure", AZURE)]:
+        correlator.add(assets, source)
+    merged = correlator.assets()
+
+    assert len(merged) == 2     # one machine + the resource group
+    host = merged[0]
+    assert host["Sources"] == ["ad", "azure", "network", "passive"]
+    assert host["Hostname"] == "hr-pc01.corp.local" and host["Provenance"]["Hostname"] == "ad"
+    assert host["IP"] == "10.0.0.5" and host["Provenance"]["IP"] == "network"
+    assert host["Ports"] == "135,445,3389"
+    assert host["MAC"] == "aa:bb:cc:dd:ee:01"
+
+    RiskAssessor.add_risks(Tagger.tag_assets(merged), batch=False)
+    assert host["Risk"] == "Critical"      # Windows 7 from AD, not the "Unknown" nmap guess
+
+
+def test_short_names_do_not_merge_different_domains(tmp_path):
+    report = tmp_path / "discovr_ad_20250101_000000.json"
+    report.write_text(json.dumps([
+        {"IP": "N/A", "Hostname": "web.a.local", "OS": "Linux", "Ports": "N/A"},
+        {"IP": "N/A", "Hostname": "web.b.local", "OS": "Linux", "Ports": "N/A"},
+    ]))
+    other = tmp_path / "scan.json"
+    other.write_text(json.dumps([{"IP": "10.0.0.9", "Hostname": "web", "OS": "Linux", "Ports": "80"}]))
+
+    merged = correlate_reports([str(report), f"network={other}"])
+    assert len(merged) == 3
+    assert merged[0]["Sources"] == ["ad"]
+
+
+def test_distinct_cloud_resources_sharing_addresses_stay_apart():
+    def vm(name, vnet, private, public=None):
+        return {"Type": "VirtualMachine", "Name": name, "ResourceId": f"/subscriptions/1/vm/{name}",
+                "Networking": {"PrivateIP": private, "PublicIP": public, "VNet": vnet}}
+
+    azure = [vm("app1", "vnet-a", "10.0.0.4", "20.1.1.1"), vm("app2", "vnet-b", "10.0.0.4", "20.1.1.1"),
+             vm("db1", "vnet-a", "10.0.0.5", "20.1.1.9")]
+    network = [{"IP": "10.0.0.4", "Hostname": "Unknown", "OS": "Linux", "Ports": "22"},
+               {"IP": "10.0.0.5", "Hostname": "Unknown", "OS": "Linux", "Ports": "5432"},
+               {"IP": "20.1.1.9", "Hostname": "Unknown", "OS": "Linux", "Ports": "443"}]
+    assert asset_identity(azure[0])["private_ips"] == {(("1", "vnet-a"), "10.0.0.4")}
+
+    correlator = Correlator()
+    correlator.add(azure, "azure")
+    correlator.add(network, "network")
+    merged = {a.get("Name") or a["IP"]: a for a in correlator.assets()}
+
+    # 10.0.0.4 is used in two VNets and 20.1.1.1 is shared: neither links anything
+    assert merged["app1"]["Sources"] == merged["app2"]["Sources"] == ["azure"]
+    assert merged["10.0.0.4"]["Sources"] == ["network"]
+    # db1's private and public addresses are its own: both scans of it join the VM
+    assert merged["db1"]["Sources"] == ["azure", "network"] and len(merged) == 4
+
+    same_name = [dict(vm("web", "vnet-a", "10.0.1.4"), ResourceId=f"/subscriptions/1/rg{i}/vm/web") for i in (1, 2)]
+    correlator = Correlator()
+    correlator.add(same_name, "azure")
+    assert len(correlator.assets()) == 2        # linked by name, kept apart by resource ID
@@ -0,0 +1,53 @@
+import io
+import json
+
+from discovr.diff import _iter_json_array, diff_reports, iter_report, previous_report
+
+OLD = [
+    {"IP": "10.0.0.1", "Hostname": "web01", "OS": "Linux", "Ports": "22,80", "Risk": "Low"},
+    {"IP": "10.0.0.2", "Hostname": "db01", "OS": "Linux", "Ports": "5432", "Risk": "Medium"},
+    {"IP": "10.0.0.3", "Hostname": "old01", "OS": "Linux", "Ports": "22", "Risk": "Low"},
+]
+NEW = [
+    {"IP": "10.0.0.1", "Hostname": "web01", "OS": "Linux", "Ports": "22,80,3389", "Risk": "Critical"},
+    {"IP": "10.0.0.2", "Hostname": "db01", "OS": "Linux", "Ports": "5432", "Risk": "Medium", "_enriched": True},
+    {"IP": "10.0.0.4", "Hostname": "new01", "OS": "Windows 11", "Ports": "N/A", "Risk": "Low"},
+]
+
+
+def test_json_array_streams_across_chunk_boundaries():
+    text = json.dumps(OLD, indent=4)
+    assert list(_iter_json_array(io.StringIO(text), chunk_size=7)) == OLD
+    assert list(_iter_json_array(io.StringIO("[]"), chunk_size=1)) == []
+
+
+def test_diff_reports_new_removed_and_field_changes(tmp_path):
+    old = tmp_path / "old.json"
+    old.write_text(json.dumps(OLD, indent=4))
+    new = tmp_path / "new.jsonl"
+    new.write_text("".join(json.dumps(a) + "\n" for a in NEW))
+    assert list(iter_report(new)) == NEW
+
+    report = diff_reports(old, new, chunk_size=64)
+    assert [key for key, _ in report.new] == ["ip:10.0.0.4"]
+    assert [key for key, _ in report.removed] == ["ip:10.0.0.3"]
+    assert report.unchanged == 1
+    (key, asset, changes), = report.changed
+    assert key == "ip:10.0.0.1"
+    assert changes["Ports"]["opened"] == ["3389"] and changes["Ports"]["closed"] == []
+    assert changes["Risk"]["escalated"] is True
+    assert report.ports_opened == 1 and report.risk_escalations == 1
+
+    # An in-memory scan gives the same answer
+    assert len(diff_reports(old, NEW).changed) == 1
+
+
+def test_previous_report_picks_newest_older_export(tmp_path):
+    (tmp_path / "json").mkdir()
+    (tmp_path / "parquet").mkdir()
+    for name in ("json/discovr_network_20250101_000000.json", "parquet/discovr_network_20250102_000000.parquet",
+                 "json/discovr_network_20250103_000000.json", "json/discovr_ad_20250102_120000.json"):
+        (tmp_path / name).write_text("[]")
+    found = previous_report("network", "20250103_000000", tmp_path)
+    assert found.name == "discovr_network_20250102_000000.parquet"
+    assert previous_report("network", "20250101_000000", tmp_path) is None
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+from discovr.inventory import InventoryStore, asset_key, parse_port, parse_since
+
+
+def scan(ports_pc, risk_pc="Medium"):
+    return [
+        {"IP": "10.0.0.5", "Hostname": "hr-pc01", "OS": "Windows 10 Pro", "Ports": ports_pc,
+         "Tag": "[Workstation]", "Risk": risk_pc, "_enriched": True},
+        {"IP": "N/A", "Hostname": "MAC-aa:bb:cc:dd:ee:01", "OS": "Unknown", "Ports": "N/A", "Risk": "Medium"},
+        {"Type": "VirtualMachine", "Name": "web", "ResourceId": "/subs/1/vm/web",
+         "Networking": {"PrivateIP": "10.1.0.4"}, "OpenPorts": ["3000-4000"], "Risk": "High"},
+    ]
+
+
+def test_asset_keys():
+    first = scan("135")
+    assert [asset_key(a) for a in first] == ["ip:10.0.0.5", "mac:aa:bb:cc:dd:ee:01", "rid:/subs/1/vm/web"]
+
+
+def test_history_and_port_first_seen(tmp_path):
+    store = InventoryStore(tmp_path / "inventory.db")
+    store.record_scan(scan("135,445"), "network", "20250101_120000")
+    store.record_scan(scan("135,445,3389", risk_pc="High"), "network", "20250108_120000")
+
+    rows = store.query(ip="10.0.0.5")
+    assert len(rows) == 1
+    assert rows[0]["first_seen"] == "2025-01-01 12:00:00"
+    assert rows[0]["last_seen"] == "2025-01-08 12:00:00"
+    assert rows[0]["risk"] == "High"
+    assert [h["risk"] for h in store.history(rows[0]["id"])] == ["Medium", "High"]
+
+    since = parse_since("3d", now=datetime(2025, 1, 9))
+    opened = store.query(port=3389, since=since)
+    assert [r["hostname"] for r in opened] == ["hr-pc01"]
+    assert store.query(port=445, since=since) == []
+    assert [r["hostname"] for r in store.query(port=3500)] == ["web"]
+
+    assert len(store.query(hostname="HR-*")) == 1
+    assert len(store.query(mac="AA-BB-CC-DD-EE-01")) == 1
+    assert len(store.query(risk="high")) == 2
+    assert store.conn.execute("SELECT COUNT(*) FROM scans").fetchone()[0] == 2
+    store.close()
+
+
+def test_malformed_query_filters(tmp_path, capsys):
+    from discovr.cli import run_query
+    for bad in ("since=yesterday", "port=ssh", "port=70000"):
+        with pytest.raises(SystemExit):
+            run_query([bad], tmp_path / "inventory.db")
+        assert "[!] Invalid query filter: invalid" in capsys.readouterr().out
+    with pytest.raises(ValueError):
+        InventoryStore(tmp_path / "inventory.db").query(port="ssh")
+    assert parse_port(" 443 ") == 443
@@ -0,0 +1,35 @@
+import io
+import json
+import logging
+
+from discovr import logs
+from discovr.logs import RateLimitedConsoleHandler, asset_log
+
+
+def test_queued_logging_writes_json_lines(tmp_path):
+    log_file = tmp_path / "run.jsonl"
+    logs.start(log_file, json_logs=True, console_rate=0)
+    try:
+        asset_log.info("    [+] Found: %s (%s)", "10.0.0.1", "web01")
+        logging.error("[!] scan failed for %s", "10.0.0.2")
+    finally:
+        logs.stop()
+        logging.getLogger().handlers.clear()
+    entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [e["message"] for e in entries] == ["    [+] Found: 10.0.0.1 (web01)", "[!] scan failed for 10.0.0.2"]
+    assert entries[0]["logger"] == "discovr.assets" and entries[1]["level"] == "ERROR"
+
+
+def test_console_rate_limit_summarizes_asset_lines(monkeypatch):
+    monkeypatch.setattr(logs.time, "monotonic", lambda: 100.0)
+    out = io.StringIO()
+    handler = RateLimitedConsoleHandler(stream=out, per_second=3)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for i in range(10):
+        handler.handle(logging.LogRecord("discovr.assets", logging.INFO, __file__, 0, "asset %d", (i,), None))
+    handler.handle(logging.LogRecord("root", logging.INFO, __file__, 0, "[+] done", None, None))
+    handler.close()
+    lines = out.getvalue().splitlines()
+    assert lines[:3] == ["asset 0", "asset 1", "asset 2"]
+    assert "[+] done" in lines
+    assert "7 more assets found" in lines[-1]
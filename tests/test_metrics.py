@@ -0,0 +1,36 @@
+import json
+
+from discovr.core import Exporter
+from discovr.metrics import METRICS, Metrics
+
+
+def test_counters_histograms_and_prometheus_text():
+    metrics = Metrics()
+    metrics.inc("discovr_hosts_probed_total", 3)
+    metrics.inc("discovr_hosts_probed_total")
+    metrics.observe("discovr_api_call_seconds", 0.02, provider="azure", call="nics.get")
+    metrics.observe("discovr_api_call_seconds", 400, provider="azure", call="nics.get")
+    assert list(metrics.timed_iter(iter([1, 2, 3]), "discovr_api_call_seconds", provider="gcp", call="list")) == [1, 2, 3]
+    metrics.set("discovr_run_seconds", 2.0)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["rates"] == {"hosts_probed_per_second": 2.0}
+    azure = next(h for h in snapshot["histograms"] if h["labels"]["provider"] == "azure")
+    assert azure["count"] == 2 and azure["buckets"]["0.025"] == 1 and azure["buckets"]["300"] == 1
+
+    text = metrics.prometheus(feature="network")
+    assert "# TYPE discovr_api_call_seconds histogram" in text
+    assert 'discovr_hosts_probed_total{feature="network"} 4' in text
+    assert 'discovr_api_call_seconds_bucket{call="nics.get",feature="network",provider="azure",le="+Inf"} 2' in text
+
+
+def test_save_metrics_writes_json_and_textfile(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    METRICS.reset()
+    METRICS.inc("discovr_assets_total", 10)
+    json_path, prom_path = Exporter.save_metrics("network", "20250101_000000", 5.0, tmp_path / "textfile")
+    data = json.loads(json_path.read_text())
+    assert data["feature"] == "network" and data["rates"]["assets_per_second"] == 2.0
+    assert prom_path.parent.name == "textfile"
+    assert 'discovr_run_seconds{feature="network"} 5.0' in prom_path.read_text()
+    METRICS.reset()
@@ -1,6 +1,8 @@
 from discovr.core import Reporter
 from discovr.tagger import Tagger
 from discovr.risk import RiskAssessor
+from discovr.network import NetworkDiscovery
+from discovr.simnet import FakePortScanner, SimulatedNetwork
 
 def run_mock_network_test():
     print("[+] Running Network Discovery Test (Simulated)")
@@ -13,5 +15,33 @@ def run_mock_network_test():
     risked_assets = RiskAssessor.add_risks(tagged_assets)
     Reporter.print_results(risked_assets, len(risked_assets), "active assets")
 
+
+def test_scan_of_simulated_network_finds_every_host():
+    net = SimulatedNetwork("10.99.0.0/26", hosts=20)
+    scan = NetworkDiscovery("10.99.0.0/26", parallel=4, scanner_factory=net.scanner)
+    assets = list(scan.iter_assets())
+    assert scan.total_hosts == 64
+    assert net.check(assets) == {"missing": 0, "unexpected": 0, "wrong": 0}
+
+    limited = list(NetworkDiscovery("10.99.0.0/26", ports="22,3389", scanner_factory=net.scanner).iter_assets())
+    assert net.check(limited, "22,3389") == {"missing": 0, "unexpected": 0, "wrong": 0}
+    assert all(set(a["Ports"].split(",")) <= {"22", "3389", "None"} for a in limited)
+
+
+def test_loss_and_recorded_replay(tmp_path, monkeypatch):
+    net = SimulatedNetwork("10.99.0.0/26", hosts=40, loss=0.5)
+    lossy = list(NetworkDiscovery("10.99.0.0/26", scanner_factory=net.scanner).iter_assets())
+    assert 0 < net.check(lossy)["missing"] < 40
+
+    recording = net.record(tmp_path / "scan.xml")
+    parses = []
+    parse = FakePortScanner.analyse_nmap_xml_scan
+    monkeypatch.setattr(FakePortScanner, "analyse_nmap_xml_scan", lambda self, xml: parses.append(1) or parse(self, xml))
+    replayed = list(NetworkDiscovery(
+        "10.99.0.0/26", scanner_factory=SimulatedNetwork.replay(recording)).iter_assets())
+    assert net.check(replayed) == {"missing": 0, "unexpected": 0, "wrong": 0}
+    assert len(parses) == 1         # parsed once for the 64 per-host scans
+
+
 if __name__ == "__main__":
     run_mock_network_test()
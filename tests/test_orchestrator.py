@@ -0,0 +1,64 @@
+import time
+
+from discovr.metrics import METRICS
+from discovr.orchestrator import DiscoveryJob, Orchestrator
+
+
+# (start, end) of each scanner's run, to check that modules overlapped
+SPANS = []
+
+
+class SlowScanner:
+    def __init__(self, assets, delay=0.0):
+        self.assets = assets
+        self.delay = delay
+
+    def iter_assets(self):
+        start = time.perf_counter()
+        for asset in self.assets:
+            time.sleep(self.delay)
+            METRICS.inc("discovr_hosts_probed_total")
+            yield dict(asset)
+        SPANS.append((start, time.perf_counter()))
+
+
+class BrokenScanner:
+    def iter_assets(self):
+        raise RuntimeError("LDAP bind failed")
+
+
+def job(name, cls, *args, **kwargs):
+    return DiscoveryJob(name, f"tests.test_orchestrator:{cls}", args, **kwargs)
+
+
+def test_modules_run_concurrently_and_are_correlated():
+    network = [{"IP": "10.0.0.5", "Hostname": "Unknown", "Ports": "22"}, {"IP": "10.0.0.6", "Ports": "80"}]
+    ad = [{"IP": "10.0.0.5", "Hostname": "srv05.corp.local", "OS": "Windows Server 2019"}]
+    orchestrator = Orchestrator([
+        job("network", "SlowScanner", network, 0.1),
+        job("ad", "SlowScanner", ad, 0.1),
+        job("passive", "BrokenScanner"),
+    ])
+    SPANS.clear()
+    assets = orchestrator.run()
+
+    (a_start, a_end), (b_start, b_end) = SPANS
+    assert max(a_start, b_start) < min(a_end, b_end)        # each started before the other finished
+    assert orchestrator.stats["passive"]["error"] == "LDAP bind failed"
+    assert orchestrator.stats["network"]["assets"] == 2
+    merged = next(a for a in assets if a["IP"] == "10.0.0.5")
+    assert merged["Sources"] == ["ad", "network"]
+    assert merged["Hostname"] == "srv05.corp.local" and merged["Ports"] == "22"
+    assert len(assets) == 2
+
+
+def test_process_module_streams_assets_and_metrics_back():
+    METRICS.reset()
+    orchestrator = Orchestrator([
+        job("network", "SlowScanner", [{"IP": "10.0.0.7"}], process=True),
+        job("ad", "SlowScanner", [{"IP": "10.0.0.8"}]),
+    ])
+    found = sorted((name, asset["IP"]) for name, asset in orchestrator.iter_assets())
+    assert found == [("ad", "10.0.0.8"), ("network", "10.0.0.7")]
+    assert METRICS.snapshot()["counters"][0]["value"] == 2
+    METRICS.reset()
@@ -0,0 +1,66 @@
+import io
+
+from discovr.cache import ENRICHED_KEY
+from discovr.core import Reporter
+from discovr.pipeline import run_pipeline, ConsoleStage, CollectSink, Summary, TopSink
+
+
+def sample_assets():
+    yield {"IP": "10.0.0.5", "Hostname": "HR-PC01", "OS": "Windows 10 Pro", "Ports": "135,445"}
+    yield {"IP": "10.0.0.9", "Hostname": "printer-2f", "OS": "Unknown", "Ports": "9100"}
+    yield {"IP": "10.0.0.7", "Hostname": "db01", "OS": "Linux", "Ports": "22", "Tag": "[Server]",
+           "Risk": "Low", ENRICHED_KEY: True}
+
+
+def test_pipeline_enriches_and_summarizes():
+    out = io.StringIO()
+    sink = CollectSink()
+    summary = run_pipeline(sample_assets(), sinks=[sink], console=ConsoleStage(out=out))
+
+    tags = [a["Tag"] for a in sink.assets]
+    assert tags == ["[Workstation]", "[Printer]", "[Server]"]
+    assert sink.assets[2]["Risk"] == "Low"      # already enriched: left untouched
+    assert all(a.get(ENRICHED_KEY) for a in sink.assets)
+    assert summary.total == 3
+    assert summary.tags["[Printer]"] == 1
+
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("IP")
+    assert len(lines) == 2 + 3
+    assert lines[3].startswith("10.0.0.9")
+
+
+def test_summary_counts_without_retaining_assets():
+    summary = Summary()
+    for asset in [{"Risk": "High", "Tag": "[IoT]"}, {"Risk": "High", "Tag": "[IoT]"}, {"Risk": "Low"}]:
+        summary.update(asset)
+    assert summary.total == 3
+    assert summary.risks == {"High": 2, "Low": 1}
+
+
+def test_top_sink_keeps_highest_risk_in_order():
+    top = TopSink(3)
+    risks = ["Low", "High", "Medium", "Critical", "Low", "High", None]
+    for i, risk in enumerate(risks):
+        top.write({"IP": f"10.0.0.{i}", "Risk": risk})
+    assert [a["IP"] for a in top.assets()] == ["10.0.0.3", "10.0.0.1", "10.0.0.5"]
+
+
+def test_console_row_cap_and_large_report_fallback(monkeypatch, capsys):
+    out = io.StringIO()
+    console = ConsoleStage(out=out, max_rows=5)
+    console.write_all([{"IP": f"10.0.0.{i}", "Risk": "Low"} for i in range(12)], chunk_size=2)
+    console.close()
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 2 + 5 + 1
+    assert "7 more assets" in lines[-1]
+
+    monkeypatch.setattr(Reporter, "max_rows", 10)
+    monkeypatch.setattr(Reporter, "top", 3)
+    assets = [{"IP": f"10.0.1.{i}", "Risk": "Critical" if i == 7 else "Low", ENRICHED_KEY: True} for i in range(50)]
+    Reporter.print_results(assets, len(assets), "active assets")
+    printed = capsys.readouterr().out
+    assert "exceed the 10 row console limit" in printed
+    assert "Top 3 active assets by risk" in printed
+    assert printed.index("10.0.1.7") < printed.index("10.0.1.0")
+    assert "[+] 50 active assets discovered" in printed
@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+import pytest
+
+from discovr import plugins
+from discovr.network import NetworkDiscovery
+
+
+def test_load_resolves_and_caches_plugins():
+    assert plugins.load("network") is NetworkDiscovery
+    assert plugins.load("network") is plugins.load("network")
+    assert {"network", "cloud", "ad", "passive"} <= set(plugins.plugin_names())
+    with pytest.raises(KeyError):
+        plugins.load("nope")
+
+
+def test_cli_import_does_not_load_discovery_sdks():
+    code = ("import sys, discovr.cli; "
+            "print(sorted(m for m in ('scapy', 'azure', 'google.cloud', 'nmap', 'ldap3', 'pandas', 'pyarrow') "
+            "if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
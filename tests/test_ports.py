@@ -0,0 +1,78 @@
+from discovr.ports import PortIntervalIndex, NSGRuleIndex, parse_port_spec
+from discovr.risk import RiskAssessor
+
+
+def rule(ports, source="10.0.0.0/8", direction="Inbound", access="Allow"):
+    return {"Name": f"r-{ports}", "Direction": direction, "Access": access, "Source": source, "Ports": ports}
+
+
+def test_parse_port_spec():
+    assert parse_port_spec("*") == [(0, 65535)]
+    assert parse_port_spec("80") == [(80, 80)]
+    assert parse_port_spec("3000-4000") == [(3000, 4000)]
+    assert parse_port_spec("22, 80,8000-8100") == [(22, 22), (80, 80), (8000, 8100)]
+    assert parse_port_spec(["443", "1000-2000", 8080]) == [(443, 443), (1000, 2000), (8080, 8080)]
+    assert parse_port_spec("N/A") == []
+    assert parse_port_spec(None) == []
+
+
+def test_interval_index_merges_and_queries():
+    index = PortIntervalIndex.from_specs("3000-4000", "3500-4500", "22", "23", "8080")
+    assert index.intervals() == [(22, 23), (3000, 4500), (8080, 8080)]
+    assert index.contains(3389)
+    assert not index.contains(80)
+    assert index.overlaps(4400, 5000)
+    assert not index.overlaps(24, 2999)
+    assert index.to_strings() == ["22-23", "3000-4500", "8080"]
+    assert PortIntervalIndex.from_specs("*").to_strings() == ["*"]
+
+
+def test_nsg_ranges_are_scored():
+    nsg = {"Type": "NetworkSecurityGroup", "SecurityRules": [rule("3000-4000", source="*")]}
+    assert RiskAssessor.assess(nsg) == "Critical"
+
+    nsg = {"Type": "NetworkSecurityGroup", "SecurityRules": [{**rule(None), "PortRanges": ["8000-8100", "440-450"]}]}
+    assert RiskAssessor.assess(nsg) == "Medium"
+
+    # Single-port substring matches no longer count: 4433 is not 443
+    nsg = {"Type": "NetworkSecurityGroup", "SecurityRules": [rule("4433")]}
+    assert RiskAssessor.assess(nsg) == "Low"
+
+    # Rule order no longer hides a riskier rule further down the list
+    nsg = {"Type": "NetworkSecurityGroup", "SecurityRules": [rule("443", source="*"), rule("3389", source="*")]}
+    assert RiskAssessor.assess(nsg) == "Critical"
+
+    nsg = {"Type": "NetworkSecurityGroup", "SecurityRules": [rule("3389", direction="Outbound"), rule("80")]}
+    assert RiskAssessor.assess(nsg) == "Medium"
+
+
+def test_nsg_sources_are_scored():
+    def level(*rules):
+        return RiskAssessor.assess({"Type": "NetworkSecurityGroup", "SecurityRules": list(rules)})
+
+    assert level(rule("3389", source="203.0.113.7/32")) == "Medium"      # RDP for one admin host only
+    assert level(rule("3389", source="203.0.113.7/32"), rule("443", source="*")) == "High"
+    assert level(rule("3389", source="203.0.113.7/32"), rule("3389", source="Any")) == "Critical"
+    assert level(rule("*", source="10.0.0.0/8")) == "High"
+    assert level(rule("*", source="*")) == "Critical"
+
+
+def test_vm_open_port_ranges():
+    vm = {"Type": "VirtualMachine", "OS": "Linux", "Tag": "[Server]", "OpenPorts": ["22", "3000-4000"]}
+    assert RiskAssessor.assess(vm) == "High"
+    assert RiskAssessor.assess_batch([vm]) == ["High"]
+
+    # VM OpenPorts keep the rules' own tokens: adjacent ports are not merged into a range
+    index = NSGRuleIndex([rule("22"), rule("23"), {**rule(None), "PortRanges": ["3000-4000", "443"]},
+                          rule("80", direction="Outbound"), rule("3389", source="VirtualNetwork,*")])
+    assert sorted(index.ports) == ["22", "23", "3000-4000", "3389", "443"]
+    assert index.any_source and index.exposes([3389], from_any=True) and not index.exposes([22], from_any=True)
+
+
+def test_large_nsg_scales():
+    rules = [rule(f"{10000 + i * 3}-{10001 + i * 3}") for i in range(5000)] + [rule("443")]
+    index = NSGRuleIndex(rules)
+    assert len(index.inbound) == 5001
+    assert index.inbound.contains(10000) and index.inbound.contains(24998) and not index.inbound.contains(10002)
+    assert not index.exposes(RiskAssessor.RISKY_PORTS) and index.exposes(RiskAssessor.MEDIUM_PORTS)
+    assert RiskAssessor.assess({"Type": "NetworkSecurityGroup", "SecurityRules": rules}) == "Medium"
@@ -0,0 +1,41 @@
+import contextlib
+import pstats
+import time
+
+from discovr import profiling
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_phases_are_noops_when_disabled():
+    assert isinstance(profiling.phase("tag"), contextlib.nullcontext)
+    assert profiling.profiled("report")(lambda x: x * 2)(21) == 42
+    assert profiling.finish("/nonexistent", "x") == []
+
+
+def test_nested_phases_write_pstats_and_collapsed_stacks(tmp_path, capsys):
+    profiling.enable(interval=0.001)
+
+    @profiling.profiled("report")
+    def report():
+        with profiling.phase("tag"):
+            busy(0.05)
+        busy(0.02)
+
+    with profiling.phase("discovery"):
+        busy(0.02)
+        report()
+    written = profiling.finish(tmp_path, "discovr_test", top=3)
+
+    names = {p.name for p in written}
+    assert {"discovr_test_discovery.pstats", "discovr_test_report.pstats", "discovr_test_tag.pstats"} <= names
+    assert "discovr_test_tag.collapsed" in names
+    tag_stats = pstats.Stats(str(tmp_path / "discovr_test_tag.pstats"))
+    assert any(func == "busy" for _, _, func in tag_stats.stats)
+    stack, count = (tmp_path / "discovr_test_tag.collapsed").read_text().splitlines()[0].rsplit(" ", 1)
+    assert stack.startswith("MainThread;") and int(count) > 0
+    assert "[+] Profile tag:" in capsys.readouterr().out
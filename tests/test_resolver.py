@@ -0,0 +1,63 @@
+import threading
+import time
+
+from discovr.resolver import DNSResolver
+
+
+def test_resolves_concurrently_and_caches():
+    resolver = DNSResolver(workers=8, timeout=2.0)
+    calls = []
+    lock = threading.Lock()
+
+    def lookup(name):
+        with lock:
+            calls.append(name)
+        time.sleep(0.05)
+        return f"10.0.0.{len(name)}"
+
+    resolver._lookup = lookup
+    names = [f"host{i}.corp.local" for i in range(16)]
+
+    start = time.monotonic()
+    first = resolver.resolve_many(names + names[:4])
+    elapsed = time.monotonic() - start
+    second = resolver.resolve_many(names)
+    resolver.close()
+
+    assert first == second
+    assert len(calls) == 16
+    assert elapsed < 16 * 0.05
+    assert resolver.stats["cache_hits"] == 16
+
+
+def test_failures_and_timeouts_are_negative_cached():
+    resolver = DNSResolver(workers=4, timeout=0.2)
+
+    def lookup(name):
+        if name == "slow.corp.local":
+            time.sleep(1)
+        raise OSError("NXDOMAIN")
+
+    resolver._lookup = lookup
+    results = resolver.resolve_many(["stale.corp.local", "slow.corp.local"])
+    again = resolver.resolve_many(["stale.corp.local", "slow.corp.local"])
+    resolver.close()
+
+    assert results == {"stale.corp.local": None, "slow.corp.local": None}
+    assert again == results
+    assert resolver.stats["failures"] == 1
+    assert resolver.stats["timeouts"] == 1
+    assert resolver.stats["negative_hits"] == 2
+
+
+def test_persistent_cache_round_trip(tmp_path):
+    cache_file = tmp_path / "dns_cache.json"
+    resolver = DNSResolver(cache_file=cache_file)
+    resolver._lookup = lambda name: "192.168.1.10"
+    resolver.resolve_many(["pc01.corp.local"])
+    resolver.close()
+
+    warm = DNSResolver(cache_file=cache_file)
+    warm._lookup = lambda name: (_ for _ in ()).throw(AssertionError("should be cached"))
+    assert warm.resolve_many(["pc01.corp.local"]) == {"pc01.corp.local": "192.168.1.10"}
+    warm.close()
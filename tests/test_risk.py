@@ -0,0 +1,51 @@
+import itertools
+
+from discovr.risk import RiskAssessor
+
+OS_NAMES = ["", "Unknown", "Windows XP", "Windows 7 Pro", "Windows Vista", "Windows 10 Pro", "Windows 11 Pro",
+            "Windows Server 2008 R2", "Windows Server 2003", "Windows Server 2019", "Linux 5.x kernel",
+            "macOS 14", "Darwin 23", "iOS 17", None]
+TAGS = ["[Mobile]", "[Tablet]", "[Workstation]", "[Server]", "[Printer]", "[IoT]", "[Network]",
+        "[WebHost]", "[Unknown]", None]
+PORTS = ["", "N/A", "None", "22", "80,443", "135,445", " 3389 , 22", "8080", "3306", "21,23", "3000-4000",
+         ["3389"], ["80", "443"], [22, 445], [], ["80,443"], ["3000-4000"], ["*"], None]
+
+NSGS = [
+    {"Type": "NetworkSecurityGroup", "SecurityRules": []},
+    {"Type": "NetworkSecurityGroup", "SecurityRules": [
+        {"Direction": "Inbound", "Access": "Allow", "Ports": "3389", "Source": "10.0.0.0/8"}]},
+    {"Type": "NetworkSecurityGroup", "SecurityRules": [
+        {"Direction": "Inbound", "Access": "Allow", "Ports": "443", "Source": "10.0.0.0/8"}]},
+    {"Type": "NetworkSecurityGroup", "SecurityRules": [
+        {"Direction": "Inbound", "Access": "Allow", "Ports": "22", "Source": "Any"}]},
+]
+
+
+def corpus():
+    assets = []
+    for os_name, tag, ports in itertools.product(OS_NAMES, TAGS, PORTS):
+        asset = {"OS": os_name, "Ports": ports}
+        if tag is not None:
+            asset["Tag"] = tag
+        assets.append(asset)
+        assets.append({"Type": "VirtualMachine", "OS": os_name, "Tag": tag, "OpenPorts": ports})
+    return assets + NSGS
+
+
+def test_batch_matches_per_asset_assessment():
+    assets = corpus()
+    assert RiskAssessor.assess_batch(assets) == [RiskAssessor.assess(a) for a in assets]
+
+
+def test_add_risks_paths_agree():
+    scalar = RiskAssessor.add_risks([dict(a) for a in corpus()], batch=False)
+    batch = RiskAssessor.add_risks([dict(a) for a in corpus()], batch=True)
+    assert [a["Risk"] for a in scalar] == [a["Risk"] for a in batch]
+
+
+def test_known_levels():
+    assert RiskAssessor.assess({"OS": "Windows 7", "Tag": "[Workstation]", "Ports": "3389"}) == "Critical"
+    assert RiskAssessor.assess({"OS": "Linux", "Tag": "[Server]", "Ports": "22,3389"}) == "High"
+    assert RiskAssessor.assess({"OS": "Unknown", "Tag": "[IoT]", "Ports": "80"}) == "High"
+    assert RiskAssessor.assess(NSGS[1]) == "Medium"
+    assert RiskAssessor.assess(NSGS[3]) == "High"
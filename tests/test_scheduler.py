@@ -0,0 +1,72 @@
+import json
+import threading
+from contextlib import contextmanager
+
+from discovr.scheduler import Budget, ScheduledJob, Scheduler
+
+
+class ListScanner:
+    def __init__(self, assets, gate=None):
+        self.assets = assets
+        self.gate = gate
+
+    def iter_assets(self):
+        if self.gate:
+            self.gate.wait(5)
+        yield from (dict(a) for a in self.assets)
+
+
+def list_mode(gate=None):
+    @contextmanager
+    def mode(scheduler, params):
+        yield ListScanner([{"IP": f"10.0.0.{i}", "Ports": "22"} for i in range(params.get("count", 2))], gate)
+    return mode
+
+
+def test_budgets_hold_back_runs_and_overlaps_are_skipped_or_coalesced(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    gate = threading.Event()
+    jobs = [ScheduledJob("a", "list", every="10m", overlap="skip"),
+            ScheduledJob("b", "list", every="10m", target="azure-prod"),
+            ScheduledJob("c", "list", every="10m", target="azure-prod")]
+    scheduler = Scheduler(jobs, max_concurrent=2, budgets={"azure-prod": Budget(concurrent=1, per_hour=2)},
+                          modes={"list": list_mode(gate)}, seed=1)
+    scheduler.start(0)
+    started = scheduler.tick(0)
+    assert [j.name for j in started] == ["a", "b"]              # c shares b's target budget
+    assert jobs[2].stats["delayed"] == 1
+
+    scheduler.tick(1200)                                        # two slots missed while a and b run
+    assert jobs[0].stats["skipped"] == 1 and jobs[1].pending and jobs[0].slot == jobs[1].slot == 1800
+    gate.set()
+    scheduler.wait()
+    assert jobs[0].stats["runs"] == jobs[1].stats["runs"] == 1 and jobs[0].stats["assets"] == 2
+
+    # b's coalesced run goes first, then the per-hour budget (2 starts) holds c until the hour is up
+    assert [j.name for j in scheduler.tick(1201)] == ["b"]
+    scheduler.wait()
+    assert scheduler.tick(1202) == [] and jobs[2].waiting
+    assert [j.name for j in scheduler.tick(3600)] == ["c", "a"]     # the longest-waiting first; b is over budget
+    scheduler.wait()
+    assert len(list((tmp_path / "Documents" / "discovr_reports").rglob("discovr_list_*.jsonl"))) == 5
+
+
+def test_schedule_file_defaults_and_jitter_spread(tmp_path):
+    path = tmp_path / "schedule.json"
+    path.write_text(json.dumps({
+        "max_concurrent": 3, "jitter": "5m", "formats": ["json"],
+        "budgets": {"azure": {"per_hour": 20}},
+        "jobs": [{"name": f"subnet-{i}", "mode": "network", "every": "1h", "params": {"range": f"10.{i}.0.0/24"}}
+                 for i in range(20)] + [{"name": "prod", "mode": "azure", "every": "6h", "jitter": 0,
+                                         "overlap": "skip", "params": {"subscription": "x"}}],
+    }))
+    scheduler = Scheduler.load(path, max_concurrent=None, formats=["jsonl"], seed=7)
+    assert scheduler.max_concurrent == 3 and scheduler.formats == ["jsonl"]
+    assert scheduler.budgets["azure"].per_hour == 20 and scheduler.budgets["azure"].concurrent is None
+    prod = scheduler.jobs[-1]
+    assert prod.every == 6 * 3600 and prod.overlap == "skip" and prod.target == "azure"
+
+    scheduler.start(0)
+    starts = [job.next_run for job in scheduler.jobs[:-1]]
+    assert all(0 <= s <= 300 for s in starts) and len(set(starts)) == 20
+    assert prod.next_run == 0
@@ -0,0 +1,153 @@
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from discovr.metrics import METRICS
+from discovr.serve import ClientPool, QueueFull, ScanService, _network_options, is_loopback, serve
+
+
+class ListScanner:
+    def __init__(self, assets, gate=None):
+        self.assets = assets
+        self.gate = gate
+
+    def iter_assets(self):
+        if self.gate:
+            self.gate.wait(5)
+        for asset in self.assets:
+            yield dict(asset)
+
+
+def list_mode(gate=None):
+    @contextmanager
+    def mode(service, params):
+        if params.get("fail"):
+            raise ValueError("bind failed")
+        yield ListScanner([{"IP": f"10.0.0.{i}", "Ports": "22"} for i in range(params.get("count", 3))], gate)
+    return mode
+
+
+def test_jobs_stream_enriched_assets_and_identical_requests_share_results():
+    service = ScanService(workers=2, modes={"list": list_mode()})
+    job, cached = service.submit("list", {"count": 3, "password": "s3cret"})
+    assets = list(job.follow())
+    assert not cached and job.status == "done"
+    assert [a["IP"] for a in assets] == ["10.0.0.0", "10.0.0.1", "10.0.0.2"]
+    assert all("Tag" in a and "Risk" in a for a in assets)
+    assert job.to_dict()["params"]["password"] == "***"
+
+    again, cached = service.submit("list", {"password": "s3cret", "count": 3})
+    assert cached and again is job
+    assert service.submit("list", {"count": 3, "password": "other"})[0] is not job
+    assert service.submit("list", {"count": 3, "password": "s3cret"}, refresh=True)[0] is not job
+
+    failed, _ = service.submit("list", {"fail": True})
+    list(failed.follow())
+    assert failed.status == "failed" and failed.error == "bind failed"
+    assert service.submit("list", {"fail": True})[0] is not failed     # failures are not cached
+
+
+def test_full_queue_is_refused_and_clients_are_reused():
+    gate = threading.Event()
+    service = ScanService(workers=1, max_queue=1, modes={"list": list_mode(gate)})
+    running, _ = service.submit("list", {"count": 1})
+    while running.status == "queued":
+        pass
+    service.submit("list", {"count": 2})
+    with pytest.raises(QueueFull):
+        service.submit("list", {"count": 3})
+    gate.set()
+    assert len(list(running.follow())) == 1
+
+    pool, created = ClientPool(), []
+    for _ in range(3):
+        with pool.lease(("ad", "corp"), lambda: created.append(object()) or created[-1]) as client:
+            assert client is created[0]
+    assert len(created) == 1
+
+
+def test_network_requests_are_validated_and_remote_binds_need_a_token():
+    service = ScanService(workers=1)
+    for params in ({"range": "10.0.0.0/30", "ports": "22 --script=exploit -oN /tmp/x"},
+                   {"range": "10.0.0.0/30", "ports": "22,-"}, {"range": "10.0.0.0/30", "parallel": 10000},
+                   {"range": "10.0.0.1 -oN /tmp/x"}):
+        with pytest.raises(ValueError):
+            service.submit("network", params)
+    assert _network_options({"range": "10.0.0.1/30", "ports": " 443, 22-23,22 ", "parallel": "4"}) == \
+        ("10.0.0.0/30", "443,22-23,22", 4)
+
+    with pytest.raises(ValueError, match="without a token"):
+        serve("0.0.0.0:8080")
+    assert is_loopback("127.0.0.1") and is_loopback("[::1]") and not is_loopback("10.0.0.5")
+
+
+def test_failed_runs_drop_pooled_clients_and_empty_runs_with_errors_are_not_cached():
+    class Client:
+        closed = False
+
+        def iter_assets(self):
+            if fail:
+                raise ConnectionError("bind expired")
+            METRICS.inc("discovr_api_errors_total", provider="test")
+            return iter(())
+
+        def close(self):
+            self.closed = True
+
+    created = []
+
+    @contextmanager
+    def pooled(service, params):
+        with service.clients.lease(("pooled",), lambda: created.append(Client()) or created[-1]) as client:
+            yield client
+
+    service = ScanService(workers=1, modes={"pooled": pooled})
+    fail = True
+    job, _ = service.submit("pooled")
+    list(job.follow())
+    assert job.status == "failed" and created[0].closed
+
+    fail = False
+    job, _ = service.submit("pooled")
+    assert list(job.follow()) == [] and job.status == "done"
+    assert len(created) == 2 and not created[1].closed
+    assert service.submit("pooled")[0] is not job       # empty and errored: runs again
+
+
+def test_pooled_azure_client_sees_nsg_changes(monkeypatch):
+    azure = pytest.importorskip("discovr.azure")
+    from types import SimpleNamespace as NS
+
+    def rule(port):
+        return NS(name=f"allow-{port}", priority=100, direction="Inbound", access="Allow", protocol="Tcp",
+                  source_address_prefix="*", source_address_prefixes=[], destination_address_prefix="*",
+                  destination_port_range=port, destination_port_ranges=[])
+
+    nsg_id = "/subscriptions/1/resourceGroups/rg/providers/Microsoft.Network/networkSecurityGroups/nsg1"
+    rules = [rule("22")]
+    vm = NS(id="/subscriptions/1/resourceGroups/rg/providers/Microsoft.Compute/virtualMachines/vm1", name="vm1",
+            location="westeurope", tags={}, hardware_profile=NS(vm_size="B2s"),
+            storage_profile=NS(os_disk=NS(os_type="Linux", name="disk"), data_disks=[]),
+            network_profile=NS(network_interfaces=[NS(id="/x/nic1")]))
+    nic = NS(ip_configurations=[NS(private_ip_address="10.0.0.4", public_ip_address=None, subnet=None)],
+             network_security_group=NS(id=nsg_id))
+    network = NS(network_interfaces=NS(get=lambda rg, name: nic),
+                 network_security_groups=NS(get=lambda rg, name: NS(security_rules=list(rules)), list_all=lambda: []),
+                 virtual_networks=NS(list_all=lambda: []))
+    compute = NS(virtual_machines=NS(list_all=lambda: [vm], instance_view=lambda rg, name: NS(statuses=[], vm_agent=None)))
+    monkeypatch.setattr(azure, "ResourceManagementClient", lambda *a: NS(resource_groups=NS(list=lambda: [])))
+    monkeypatch.setattr(azure, "ComputeManagementClient", lambda *a: compute)
+
+    def create():
+        scanner = azure.AzureDiscovery.__new__(azure.AzureDiscovery)
+        scanner.subscription_id, scanner.credential, scanner.network_client = "1", None, network
+        scanner._nsg_indexes = {}
+        return scanner
+
+    pool = ClientPool()
+    for expected in (["22"], ["22", "3389"]):
+        with pool.lease(("azure", "1"), create) as scanner:
+            vms = [a for a in scanner.iter_assets() if a["Type"] == "VirtualMachine"]
+        assert vms[0]["OpenPorts"] == expected
+        rules.append(rule("3389"))      # the NSG changes between the two jobs
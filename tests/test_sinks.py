@@ -0,0 +1,99 @@
+import csv
+import json
+
+import pytest
+
+from discovr.asset import Asset
+from discovr.sinks import CSVSink, JSONArraySink, JSONLSink, ParquetSink, ZstdJSONLSink, flatten_dict
+
+ASSETS = [
+    {"IP": "10.0.0.5", "Hostname": "hr-pc01", "OS": "Windows 10 Pro", "Ports": "135,445", "Tag": "[Workstation]",
+     "_enriched": True},
+    {"Type": "VirtualMachine", "Name": "web", "Networking": {"PrivateIP": "10.1.0.4"}, "OpenPorts": ["22", "80"]},
+]
+
+
+def write_all(sink, assets):
+    for asset in assets:
+        sink.write(asset)
+    sink.close()
+
+
+def test_json_array_matches_json_dump(tmp_path):
+    path = tmp_path / "out.json"
+    write_all(JSONArraySink(path), ASSETS + [Asset.from_dict(ASSETS[0])])
+    expected = [{k: v for k, v in a.items() if k != "_enriched"} for a in ASSETS + [ASSETS[0]]]
+    assert path.read_text() == json.dumps(expected, indent=4)
+
+    empty = tmp_path / "empty.json"
+    write_all(JSONArraySink(empty), [])
+    assert json.loads(empty.read_text()) == []
+
+
+def test_jsonl_is_readable_before_close(tmp_path):
+    path = tmp_path / "out.jsonl"
+    sink = JSONLSink(path, flush_every=1)
+    sink.write(ASSETS[0])
+    assert json.loads(path.read_text().splitlines()[0])["Hostname"] == "hr-pc01"
+    sink.write(ASSETS[1])
+    sink.close()
+    assert len(path.read_text().splitlines()) == 2
+
+
+def test_csv_small_inventory_has_exact_header(tmp_path):
+    path = tmp_path / "out.csv"
+    write_all(CSVSink(path), ASSETS)
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == sorted({k for a in ASSETS for k in flatten_dict({k: v for k, v in a.items() if k != "_enriched"})})
+    assert rows[1]["Networking.PrivateIP"] == "10.1.0.4" and rows[1]["OpenPorts"] == "22;80"
+
+
+def test_csv_late_keys_spill_into_extra_column(tmp_path):
+    path = tmp_path / "out.csv"
+    assets = [{"IP": f"10.0.0.{i}", "Hostname": f"pc{i}"} for i in range(3)] + [{"IP": "10.0.0.9", "MAC": "aa"}]
+    sink = CSVSink(path, sample_size=2)
+    write_all(sink, assets)
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ["Hostname", "IP", "_extra"]
+    assert json.loads(rows[3]["_extra"]) == {"MAC": "aa"}
+    assert sink.extra_rows == 1 and sink.count == 4
+
+
+def test_zstd_jsonl_round_trip(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "out.jsonl.zst"
+    write_all(ZstdJSONLSink(path, flush_every=1), ASSETS)
+    with open(path, "rb") as f:
+        lines = zstandard.ZstdDecompressor().stream_reader(f).read().decode().splitlines()
+    assert [json.loads(line) for line in lines] == [{k: v for k, v in a.items() if k != "_enriched"} for a in ASSETS]
+
+
+def test_parquet_typed_columns_and_structs(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "out.parquet"
+    vms = [{"Type": "VirtualMachine", "Name": f"vm{i}", "AgentCompatible": True, "Tags": {"env": "prod"},
+            "Networking": {"PrivateIP": f"10.1.0.{i}", "PublicIP": None}, "OpenPorts": ["22"]} for i in range(3)]
+    late = {"Type": "VirtualMachine", "Name": "odd", "AgentCompatible": "unknown", "Tags": {"team": "x"}, "Zone": "1"}
+    write_all(ParquetSink(path, row_group_size=2), vms + [late])
+
+    table = pq.read_table(path)
+    assert pq.ParquetFile(path).metadata.num_row_groups == 2
+    assert str(table.schema.field("AgentCompatible").type) == "bool"
+    assert table.schema.field("Networking").type.num_fields == 2
+    rows = table.to_pylist()
+    assert rows[0]["Networking"]["PrivateIP"] == "10.1.0.0" and rows[0]["Tags"] == [("env", "prod")]
+    assert rows[3]["Tags"] == [("team", "x")]
+    assert json.loads(rows[3]["_extra"]) == {"AgentCompatible": "unknown", "Zone": "1"}
+
+    # A nested key first seen after the first row group is kept in _extra, not dropped
+    path = tmp_path / "late.parquet"
+    nics = [{"Name": f"vm{i}", "Networking": {"NIC": f"n{i}"}, "Provenance": {"Name": "azure"}} for i in (1, 2)]
+    late = {"Name": "vm3", "Networking": {"NIC": "n3", "PublicIP": "1.2.3.4"}, "Provenance": {"Name": "ad", "IP": "network"}}
+    write_all(ParquetSink(path, row_group_size=2), nics + [late])
+    rows = pq.read_table(path).to_pylist()
+    assert rows[0]["Networking"] == {"NIC": "n1"} and rows[0]["_extra"] is None
+    assert rows[2]["Networking"] is None
+    assert json.loads(rows[2]["_extra"]) == {"Networking": {"NIC": "n3", "PublicIP": "1.2.3.4"}}
+    assert rows[2]["Provenance"] == [("Name", "ad"), ("IP", "network")]
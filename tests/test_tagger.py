@@ -0,0 +1,84 @@
+import itertools
+import json
+
+from discovr.tagger import Tagger, TagRuleSet
+
+
+def legacy_assign_tag(asset):
+    """The original hard-coded Tagger.assign_tag, kept as the reference for the default rule set"""
+    hostname = asset.get("Hostname", "").lower()
+    os_name = asset.get("OS", "").lower()
+    ports = asset.get("Ports", "").lower()
+
+    if any(mobile in hostname for mobile in ["iphone", "android", "pixel", "galaxy"]):
+        return "[Mobile]"
+    if "ios" in os_name and "macos" not in os_name:
+        return "[Mobile]"
+    if "android" in os_name:
+        return "[Mobile]"
+    if "ipad" in hostname or "tablet" in hostname:
+        return "[Tablet]"
+    if "ipad" in os_name or "ipad os" in os_name:
+        return "[Tablet]"
+    if "macos" in os_name or "os x" in os_name or ("darwin" in os_name and "ios" not in os_name):
+        return "[Workstation]"
+    if "windows 10" in os_name or "windows 11" in os_name:
+        return "[Workstation]"
+    if "server" in os_name or "linux" in os_name:
+        return "[Server]"
+    if "printer" in hostname:
+        return "[Printer]"
+    if "camera" in hostname or "iot" in hostname or "chromecast" in hostname:
+        return "[IoT]"
+    if "router" in hostname or "switch" in hostname or "firewall" in hostname:
+        return "[Network]"
+    if "80" in ports or "443" in ports:
+        return "[WebHost]"
+    return "[Unknown]"
+
+
+HOSTNAMES = ["", "Unknown", "iPhone-Anna", "pixel7", "HR-PC01.corp.local", "iPad-kiosk", "tablet01",
+             "printer.local", "iot-camera.local", "chromecast-lounge", "core-router", "SwitchA",
+             "fw-firewall", "web01", "MAC-aa:bb:cc:dd:ee:ff", "ipadprinter", "routeriot"]
+OS_NAMES = ["", "Unknown", "iOS 17", "iPadOS 17", "ipad os 16", "macOS 14", "Mac OS X 10.15", "Darwin 23",
+            "darwinios", "Android 14", "Windows 10 Pro", "Windows 11 Pro", "Windows Server 2019",
+            "Linux 5.x kernel", "Windows 7", "Linux/Unix (guessed)", "Amazon Linux"]
+PORTS = ["", "N/A", "None", "22", "80,443", "135,445", "8080", "22,3389", "4430"]
+
+
+def test_default_rules_match_legacy_tagger():
+    for hostname, os_name, ports in itertools.product(HOSTNAMES, OS_NAMES, PORTS):
+        asset = {"Hostname": hostname, "OS": os_name, "Ports": ports}
+        assert Tagger.assign_tag(asset) == legacy_assign_tag(asset), asset
+
+
+def test_tag_assets_batch_matches_single():
+    assets = [{"Hostname": h, "OS": o, "Ports": p} for h, o, p in itertools.product(HOSTNAMES, OS_NAMES, PORTS)]
+    tagged = Tagger.tag_assets([dict(a) for a in assets])
+    assert [a["Tag"] for a in tagged] == [legacy_assign_tag(a) for a in assets]
+
+
+def test_custom_rules_from_config(tmp_path):
+    config = tmp_path / "rules.json"
+    config.write_text(json.dumps({
+        "default": "[Other]",
+        "rules": [
+            {"tag": "[DomainController]", "when": {"Hostname": ["dc0"], "OS": ["server"]}},
+            {"tag": "[Hypervisor]", "when": {"Vendor": ["vmware", "xen"]}},
+        ],
+    }))
+    rules = TagRuleSet.load(config)
+
+    assert rules.assign({"Hostname": "DC01.corp.local", "OS": "Windows Server 2022"}) == "[DomainController]"
+    assert rules.assign({"Hostname": "DC01.corp.local", "OS": "Windows 10"}) == "[Other]"
+    assert rules.assign({"Hostname": "esx01", "Vendor": "VMware, Inc."}) == "[Hypervisor]"
+    assert rules.assign({"Hostname": "esx01"}) == "[Other]"
+
+
+    # Rule sets over the same fields share the classifier cache without reading each other's tags
+    asset = {"Hostname": "esx01", "Vendor": "VMware, Inc."}
+    other = TagRuleSet([{"tag": "[DomainController]", "when": {"Hostname": ["dc0"], "OS": ["server"]}},
+                        {"tag": "[VM host]", "when": {"Vendor": ["vmware", "xen"]}}])
+    assert rules.signature(asset) == other.signature(asset)
+    assert rules.tag_all([dict(asset)])[0]["Tag"] == "[Hypervisor]"
+    assert other.tag_all([dict(asset)])[0]["Tag"] == "[VM host]"